@@ -0,0 +1,81 @@
+"""Time to build a structured quad mesh one element at a time and in bulk.
+
+Builds the nodes, edges and Q hyperedges of a square mesh with about
+--elements quadrilaterals, first with add_node/add_edge/add_hyperedge
+calls and then with add_nodes/add_edges/add_hyperedges, for each backend.
+
+Usage:
+    python benchmarks/bulk_construction.py [--elements 100000]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from hypergraph.hypergraph import HyperGraph
+
+
+def mesh_arrays(side):
+    """Return (xy, edge pairs, border mask, hyperedge offsets, hyperedge indices)."""
+    i, j = np.meshgrid(np.arange(side + 1), np.arange(side + 1), indexing="ij")
+    xy = np.column_stack((i.ravel(), j.ravel())).astype(float)
+    ids = np.arange((side + 1) ** 2).reshape(side + 1, side + 1)
+
+    horizontal = np.column_stack((ids[:-1, :].ravel(), ids[1:, :].ravel()))
+    vertical = np.column_stack((ids[:, :-1].ravel(), ids[:, 1:].ravel()))
+    pairs = np.concatenate((horizontal, vertical))
+    border = np.concatenate((
+        np.isin(j[:-1, :].ravel(), (0, side)),
+        np.isin(i[:, :-1].ravel(), (0, side)),
+    ))
+
+    corners = np.stack((ids[:-1, :-1], ids[1:, :-1], ids[1:, 1:], ids[:-1, 1:]), axis=-1).reshape(-1, 4)
+    offsets = np.arange(0, 4 * len(corners) + 1, 4)
+    return xy, pairs, border, offsets, corners.ravel()
+
+
+def build_per_element(backend, xy, pairs, border, offsets, indices):
+    graph = HyperGraph(backend)
+    nodes = [graph.add_node(x, y) for x, y in xy.tolist()]
+    for (a, b), is_border in zip(pairs.tolist(), border.tolist()):
+        graph.add_edge(nodes[a], nodes[b], is_border=is_border)
+    indices = indices.tolist()
+    for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        graph.add_hyperedge([nodes[k] for k in indices[start:end]])
+    return graph
+
+
+def build_bulk(backend, xy, pairs, border, offsets, indices):
+    graph = HyperGraph(backend)
+    graph.add_nodes(xy)
+    graph.add_edges(pairs, border)
+    graph.add_hyperedges(offsets, indices)
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--elements", type=int, default=100_000, help="Number of quadrilaterals")
+    args = parser.parse_args()
+
+    side = max(1, int(math.sqrt(args.elements)))
+    arrays = mesh_arrays(side)
+    print(f"Mesh: {side} x {side} = {side * side} quadrilaterals")
+
+    print(f"{'backend':10}{'per element s':>15}{'bulk s':>10}{'speedup':>10}")
+    for backend in ("object", "array"):
+        times = []
+        for build in (build_per_element, build_bulk):
+            start = time.perf_counter()
+            build(backend, *arrays)
+            times.append(time.perf_counter() - start)
+        print(f"{backend:10}{times[0]:>15.2f}{times[1]:>10.2f}{times[0] / times[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Import time of the graph core and the productions, from python -X importtime.
+
+Imports each module in a fresh interpreter with -X importtime, repeated
+--repeat times, and reports the best cumulative time with the slowest
+modules it pulled in. Fails (exit status 1) if a module takes longer than
+--budget milliseconds or imports one of the plotting modules, which must
+only be loaded by HyperGraph.visualize().
+
+Usage:
+    python benchmarks/import_time.py [--budget 150] [--repeat 5] [--top 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULES = ["hypergraph", "hypergraph.hypergraph", "productions"]
+# Top-level packages that must not be imported by MODULES
+FORBIDDEN = ["matplotlib"]
+
+
+def import_times(module=None):
+    """Return {imported module: cumulative microseconds} for importing module in a new interpreter.
+
+    Without module, returns the modules imported by the interpreter startup.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}" if module else "pass"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=150, help="maximum import time per module, in ms")
+    parser.add_argument("--repeat", type=int, default=5, help="imports per module, the best one is kept")
+    parser.add_argument("--top", type=int, default=5, help="number of slowest dependencies to list")
+    args = parser.parse_args()
+
+    startup = set(import_times())
+    failed = False
+    for module in MODULES:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda times: times[module])
+        total = best[module] / 1000
+        forbidden = sorted(name for name in best if name.split(".")[0] in FORBIDDEN)
+
+        status = "ok"
+        if total > args.budget:
+            status, failed = f"over budget of {args.budget:.0f} ms", True
+        if forbidden:
+            status, failed = f"imports {', '.join(forbidden[:3])}", True
+        print(f"{module}: {total:.1f} ms ({status})")
+        slowest = sorted((name for name in best if name != module and name not in startup),
+                         key=best.get, reverse=True)
+        for name in slowest[:args.top]:
+            print(f"    {name:<40} {best[name] / 1000:8.1f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
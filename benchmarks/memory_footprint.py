@@ -0,0 +1,111 @@
+"""Memory taken by Node and Edge objects on a structured quad mesh.
+
+Builds the nodes, edges and Q hyperedges of a square mesh with about
+--elements quadrilaterals and reports bytes per node and per edge, for the
+current classes and for the dict-based layout they had before __slots__.
+
+Usage:
+    python benchmarks/memory_footprint.py [--elements 100000]
+"""
+import argparse
+import gc
+import math
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from hypergraph.node import Node
+from hypergraph.edge import Edge
+
+
+class DictNode:
+    """Node as stored before: attributes in a per-instance __dict__."""
+
+    def __init__(self, x, y, z=0, label="V"):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.label = label
+
+
+class DictEdge:
+    """Edge as stored before: __dict__, list of nodes and cached centroid."""
+
+    def __init__(self, nodes, is_border=False, label=None, R=False):
+        self._graph = None
+        self.nodes = nodes
+        self._B = is_border
+        self._label = label if label else ("E" if len(nodes) == 2 else "Q")
+        self._R = R
+        self.x = sum(node.x for node in nodes) / len(nodes)
+        self.y = sum(node.y for node in nodes) / len(nodes)
+
+
+def measure(build):
+    """Return (result, bytes allocated) for build()."""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return result, size
+
+
+def build_mesh(node_cls, edge_cls, side):
+    """Return (nodes, edges, hyperedges) of a side x side quad mesh."""
+    nodes, size_nodes = measure(
+        lambda: [node_cls(float(i), float(j)) for j in range(side + 1) for i in range(side + 1)]
+    )
+
+    def at(i, j):
+        return nodes[j * (side + 1) + i]
+
+    def edges():
+        result = []
+        for j in range(side + 1):
+            for i in range(side + 1):
+                if i < side:
+                    result.append(edge_cls([at(i, j), at(i + 1, j)], is_border=j in (0, side)))
+                if j < side:
+                    result.append(edge_cls([at(i, j), at(i, j + 1)], is_border=i in (0, side)))
+        return result
+
+    def hyperedges():
+        return [
+            edge_cls([at(i, j), at(i + 1, j), at(i + 1, j + 1), at(i, j + 1)], label="Q")
+            for j in range(side) for i in range(side)
+        ]
+
+    edge_list, size_edges = measure(edges)
+    hyperedge_list, size_hyperedges = measure(hyperedges)
+    return {
+        "nodes": (len(nodes), size_nodes),
+        "edges": (len(edge_list), size_edges),
+        "hyperedges": (len(hyperedge_list), size_hyperedges),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--elements", type=int, default=100_000, help="Number of quadrilaterals")
+    args = parser.parse_args()
+
+    side = max(1, int(math.sqrt(args.elements)))
+    print(f"Mesh: {side} x {side} = {side * side} quadrilaterals")
+
+    before = build_mesh(DictNode, DictEdge, side)
+    after = build_mesh(Node, Edge, side)
+
+    print(f"{'':12}{'count':>10}{'before B/obj':>15}{'after B/obj':>14}{'saved':>8}")
+    for kind in ("nodes", "edges", "hyperedges"):
+        count, size_before = before[kind]
+        _, size_after = after[kind]
+        print(f"{kind:12}{count:>10}{size_before / count:>15.1f}{size_after / count:>14.1f}"
+              f"{1 - size_after / size_before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Wall-clock time of a refinement run drawing a frame after every production.
+
+Replays the refinement of benchmarks/replay.py (--steps random targets)
+twice, drawing the graph after every production: once with
+HyperGraph.visualize() in the loop, and once through a RenderPipeline of
+--workers processes, which draws while the refinement goes on. The gain
+depends on the number of cores available.
+
+Usage:
+    python benchmarks/parallel_rendering.py [--steps 10] [--workers N] [--queue-size 8]
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.replay import run
+from hypergraph.render_pipeline import RenderPipeline
+from loops.initial_graph import create_initial_graph
+from productions.event_log import EventLog, read_events, replay
+
+
+def refine_and_draw(path, draw):
+    """Replay the log at path on the initial graph, calling draw(graph, index) after each event."""
+    graph = create_initial_graph()
+    frames = itertools.count()
+    replay(path, graph, on_apply=lambda production, matched, result: draw(graph, next(frames)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=10, help="number of refinement targets")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: one per CPU)")
+    parser.add_argument("--queue-size", type=int, default=8, help="frames pending at most")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    targets = [(rng.uniform(-10, 10), rng.uniform(-7, 7)) for _ in range(args.steps)]
+    output = tempfile.mkdtemp()
+    path = os.path.join(output, "events.jsonl")
+    with contextlib.redirect_stdout(io.StringIO()), EventLog(path) as log:
+        run(create_initial_graph(), targets, log)
+    events = sum(1 for _ in read_events(path))
+
+    def frame(kind, index):
+        return os.path.join(output, f"{kind}-{index:04d}.png")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        refine_and_draw(path, lambda graph, index: graph.visualize(frame("serial", index)))
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with RenderPipeline(args.workers, args.queue_size) as pipeline:
+            refine_and_draw(path, lambda graph, index: pipeline.submit(graph, frame("pipeline", index)))
+        pipelined = time.perf_counter() - start
+
+    print(f"{events} frames, {os.cpu_count()} CPUs, images in {output}")
+    print(f"serial:   {serial:8.2f} s")
+    print(f"pipeline: {pipelined:8.2f} s ({serial / pipelined:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Render time of a quad mesh at each level of detail and in the mesh style.
+
+Builds a square mesh of about --elements quadrilaterals, marks every tenth
+one for refinement, and renders it to PNG once per LevelOfDetail level
+(full, no labels, no markers, no spokes) and once with style="mesh".
+
+Usage:
+    python benchmarks/render_lod.py [--elements 2500] [--output DIR]
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bulk_construction import mesh_arrays
+from hypergraph.frame import Frame
+from hypergraph.hypergraph import HyperGraph
+from hypergraph.visualization import LevelOfDetail, draw
+
+
+def fixed_level(level):
+    """Return a LevelOfDetail dropping the first level details whatever the size."""
+    thresholds = [0 if i < level else None for i in range(3)]
+    return LevelOfDetail(*thresholds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--elements", type=int, default=2500, help="approximate number of quadrilaterals")
+    parser.add_argument("--output", help="directory to keep the images in (default: a temporary one)")
+    args = parser.parse_args()
+
+    side = max(1, round(math.sqrt(args.elements)))
+    xy, pairs, border, offsets, indices = mesh_arrays(side)
+    graph = HyperGraph("array")
+    graph.add_nodes(xy)
+    graph.add_edges(pairs, border)
+    graph.add_hyperedges(offsets, indices)
+    graph.mark(lambda x, y: (x + y) % 10 < 1)
+
+    start = time.perf_counter()
+    frame = Frame.from_graph(graph)
+    print(f"{frame.element_count()} elements ({side * side} quads), "
+          f"frame taken in {time.perf_counter() - start:.3f} s; default level: "
+          f"{LevelOfDetail.LEVELS[LevelOfDetail().level(frame.element_count())]}")
+
+    output = args.output or tempfile.mkdtemp()
+    os.makedirs(output, exist_ok=True)
+    runs = [(name, "full", fixed_level(level)) for level, name in enumerate(LevelOfDetail.LEVELS)]
+    runs.append(("mesh style", "mesh", None))
+    for name, style, detail in runs:
+        filename = os.path.join(output, name.replace(" ", "-") + ".png")
+        start = time.perf_counter()
+        draw(frame, filename, style, detail)
+        print(f"  {name:<12} {time.perf_counter() - start:8.3f} s")
+    print(f"images in {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Render time of a quad mesh with each renderer of hypergraph.renderers.
+
+Builds a square mesh of about --elements quadrilaterals, marks every tenth
+one for refinement, and draws it in both styles with the matplotlib
+renderer (PNG through Agg), the SVG renderer and the null renderer, with
+the default level of detail. The time includes taking the frame.
+
+Usage:
+    python benchmarks/renderers.py [--elements 40000] [--output DIR]
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bulk_construction import mesh_arrays
+from hypergraph.hypergraph import HyperGraph
+
+# Renderer name and file extension
+RENDERERS = [("matplotlib", "png"), ("svg", "svg"), ("null", "")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--elements", type=int, default=40000, help="approximate number of quadrilaterals")
+    parser.add_argument("--output", help="directory to keep the drawings in (default: a temporary one)")
+    args = parser.parse_args()
+
+    side = max(1, round(math.sqrt(args.elements)))
+    xy, pairs, border, offsets, indices = mesh_arrays(side)
+    graph = HyperGraph("array")
+    graph.add_nodes(xy)
+    graph.add_edges(pairs, border)
+    graph.add_hyperedges(offsets, indices)
+    graph.mark(lambda x, y: (x + y) % 10 < 1)
+    print(f"{len(graph.nodes) + len(graph.edges)} elements ({side * side} quads)")
+
+    output = args.output or tempfile.mkdtemp()
+    os.makedirs(output, exist_ok=True)
+    for style in ("full", "mesh"):
+        times = {}
+        for renderer, extension in RENDERERS:
+            filename = os.path.join(output, f"{style}.{extension}") if extension else None
+            start = time.perf_counter()
+            graph.visualize(filename, style=style, renderer=renderer)
+            times[renderer] = time.perf_counter() - start
+            size = f"{os.path.getsize(filename) / 1e6:6.1f} MB" if filename else ""
+            print(f"  {style:<5} {renderer:<11} {times[renderer]:8.3f} s {size}")
+        print(f"  {style:<5} svg vs matplotlib: {times['matplotlib'] / times['svg']:.1f}x")
+    print(f"drawings in {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Time to replay a recorded refinement run against running it.
+
+Refines the initial graph of loops/ towards --steps random target points
+(P9/P0 at the element nearest the target, then the scheduler), recording
+every application in an EventLog. The log is then replayed on a fresh
+initial graph, which skips all matching, and both results are compared.
+Production output is silenced during both timings.
+
+Usage:
+    python benchmarks/replay.py [--steps 200] [--seed 0] [--log events.jsonl]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from loops.initial_graph import create_initial_graph
+from productions import P0, P1, P2, P3, P4, P5, P9, P10, P11
+from productions.event_log import EventLog, replay
+from productions.scheduler import Scheduler
+
+
+def run(graph, targets, log):
+    scheduler = Scheduler(graph, [P10(), P4(), P3(), P11(), P1(), P2(), P5()])
+    for x, y in targets:
+        for production in (P9(), P0()):
+            matched = production.nearest_match(graph, x, y)
+            if matched:
+                log.apply(production, graph, matched)
+        scheduler.run(log=log)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=200, help="number of refinement targets")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the target points")
+    parser.add_argument("--log", help="where to keep the event log (default: a temporary file)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    targets = [(rng.uniform(-10, 10), rng.uniform(-7, 7)) for _ in range(args.steps)]
+    path = args.log or os.path.join(tempfile.mkdtemp(), "events.jsonl")
+    if os.path.exists(path):
+        os.remove(path)
+
+    graph = create_initial_graph()
+    with contextlib.redirect_stdout(io.StringIO()), EventLog(path) as log:
+        start = time.perf_counter()
+        run(graph, targets, log)
+        run_time = time.perf_counter() - start
+
+    replayed = create_initial_graph()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        events = replay(path, replayed)
+        replay_time = time.perf_counter() - start
+
+    exported, replayed_exported = graph.export(), replayed.export()
+    same = all(np.array_equal(exported[name], replayed_exported[name]) for name in exported)
+    print(f"{events} events, {len(graph.nodes)} nodes, {len(graph.edges)} edges, "
+          f"log {os.path.getsize(path) / 1024:.1f} KB at {path}")
+    print(f"run:    {run_time:8.3f} s")
+    print(f"replay: {replay_time:8.3f} s ({run_time / replay_time:.1f}x faster), identical result: {same}")
+
+
+if __name__ == "__main__":
+    main()
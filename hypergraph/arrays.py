@@ -0,0 +1,481 @@
+"""Struct-of-arrays storage for HyperGraph(backend="array").
+
+Node coordinates live in one growable float64 array, 2-node edges in an
+(E, 2) array of node indices and hyperedges in CSR form (offsets into one
+array of node indices), each with id, R, B, label and alive columns. Labels
+are stored as small integer codes. A node's id is its row; edge ids, shared
+by both edge tables, are mapped back to a row by edge_rows.
+
+Node and Edge objects are replaced by NodeView and EdgeView: thin objects
+holding only a table and a row index, cached so that an element is always
+represented by the same object. Views compare and hash by row. The graph
+indices (pairs, incidence, labels, spatial grids) hold views, so every
+element gets one once they are built; only a graph loaded from a checkpoint
+leaves them for its first use. The memory taken is therefore close to that
+of the object backend (112 MB against 122 MB for a 200 x 200 quad mesh).
+The gain is the vectorized bulk operations working on whole columns, and
+export, checkpoints and frames reading the columns without visiting the
+elements. Reading or writing a single attribute goes through NumPy and is
+slower than with plain objects.
+"""
+import numpy as np
+
+from hypergraph.node import Node
+from hypergraph.edge import Edge
+
+
+class GrowableArray:
+    """NumPy array with amortized O(1) append, doubling its capacity when full."""
+
+    def __init__(self, dtype, width=None, capacity=16):
+        self._shape_tail = () if width is None else (width,)
+        self._data = np.zeros((capacity,) + self._shape_tail, dtype=dtype)
+        self._size = 0
+
+    @classmethod
+    def wrap(cls, data):
+        """Return a GrowableArray filled with data, an array (or memory map) used without copying.
+
+        data is only copied once the array grows past its length.
+        """
+        array = cls.__new__(cls)
+        array._shape_tail = data.shape[1:]
+        array._data = data
+        array._size = len(data)
+        return array
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        self._data[index] = value
+
+    @property
+    def data(self):
+        """View of the filled part of the array."""
+        return self._data[:self._size]
+
+    def append(self, value):
+        """Append one row and return its index."""
+        self._reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+        return self._size - 1
+
+    def extend(self, values):
+        """Append rows and return the index of the first one."""
+        values = np.asarray(values, dtype=self._data.dtype)
+        start = self._size
+        self._reserve(start + len(values))
+        self._data[start:start + len(values)] = values
+        self._size += len(values)
+        return start
+
+    def truncate(self, size):
+        """Drop the rows from size on."""
+        self._size = min(self._size, size)
+
+    def _reserve(self, size):
+        if size <= len(self._data):
+            return
+        data = np.zeros((max(size, 2 * len(self._data)),) + self._shape_tail, dtype=self._data.dtype)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+
+
+class LabelTable:
+    """Two-way mapping between labels and the integer codes stored in arrays."""
+
+    def __init__(self, labels=()):
+        self.labels = list(labels)
+        self._codes = {label: code for code, label in enumerate(self.labels)}
+
+    def code(self, label):
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+class ArrayStorage:
+    """Columns holding the nodes, edges and hyperedges of one graph."""
+
+    EDGE = 0
+    HYPEREDGE = 1
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.labels = LabelTable()
+
+        self.node_xyz = GrowableArray(np.float64, width=3)
+        self.node_label = GrowableArray(np.int32)
+        self._node_views = []
+
+        self.edges = EdgeTable(self, self.EDGE)
+        self.hyperedges = HyperedgeTable(self, self.HYPEREDGE)
+        # Edge id -> (table kind, row); ids are shared by both tables
+        self.edge_rows = GrowableArray(np.int64, width=2)
+
+    def add_node(self, x, y, z=0, label="V"):
+        index = self.node_xyz.append((x, y, z))
+        self.node_label.append(self.labels.code(label))
+        self._node_views.append(None)
+        return self.node_view(index)
+
+    def add_nodes(self, xy, label="V"):
+        """Add the nodes at the rows of the (N, 2) array xy and return their views."""
+        start = self.node_xyz.extend(np.column_stack((xy, np.zeros(len(xy)))))
+        self.node_label.extend(np.full(len(xy), self.labels.code(label)))
+        self._node_views.extend([None] * len(xy))
+        return [self.node_view(index) for index in range(start, start + len(xy))]
+
+    def pop_node(self):
+        """Remove the last node added."""
+        size = len(self.node_xyz) - 1
+        self.node_xyz.truncate(size)
+        self.node_label.truncate(size)
+        self._node_views.pop()
+
+    def pop_edge(self):
+        """Remove the last edge or hyperedge added."""
+        kind, _ = self.edge_rows[len(self.edge_rows) - 1]
+        table = self.edges if kind == self.EDGE else self.hyperedges
+        table.pop()
+        self.edge_rows.truncate(len(self.edge_rows) - 1)
+
+    def node_by_id(self, node_id):
+        # A node's id is its row
+        if not 0 <= node_id < len(self.node_xyz):
+            raise KeyError(node_id)
+        return self.node_view(node_id)
+
+    def edge_by_id(self, edge_id):
+        if not 0 <= edge_id < len(self.edge_rows):
+            raise KeyError(edge_id)
+        kind, row = self.edge_rows[edge_id]
+        table = self.edges if kind == self.EDGE else self.hyperedges
+        if row < 0 or not table.alive[row]:
+            raise KeyError(edge_id)
+        return table.view(int(row))
+
+    def load(self, arrays, labels, edge_count):
+        """Take over the arrays of a checkpoint as columns, without copying them.
+
+        Args:
+            arrays: Arrays read by hypergraph.checkpoint.read(), as written by
+                    HyperGraph.save(); they may be memory maps
+            labels: Labels of the codes used in arrays
+            edge_count: Number of edge ids handed out, removed edges included
+        """
+        self.labels = LabelTable(labels)
+        self.node_xyz = GrowableArray.wrap(arrays["node_xyz"])
+        self.node_label = GrowableArray.wrap(arrays["node_label"])
+        self._node_views = [None] * len(self.node_xyz)
+
+        # Ids of removed edges keep the row -1
+        edge_rows = np.full((edge_count, 2), -1, dtype=np.int64)
+        for table, prefix in ((self.edges, "edge"), (self.hyperedges, "hyperedge")):
+            ids = arrays[prefix + "_id"]
+            table.ids = GrowableArray.wrap(ids)
+            table.R = GrowableArray.wrap(arrays[prefix + "_R"])
+            table.B = GrowableArray.wrap(arrays[prefix + "_B"])
+            table.label = GrowableArray.wrap(arrays[prefix + "_label"])
+            table.alive = GrowableArray.wrap(np.ones(len(ids), dtype=bool))
+            table._views = [None] * len(ids)
+            edge_rows[ids, 0] = table.kind
+            edge_rows[ids, 1] = np.arange(len(ids))
+        self.edges.nodes = GrowableArray.wrap(arrays["edge_nodes"])
+        self.hyperedges.offsets = GrowableArray.wrap(arrays["hyperedge_offsets"])
+        self.hyperedges.indices = GrowableArray.wrap(arrays["hyperedge_nodes"])
+        self.edge_rows = GrowableArray.wrap(edge_rows)
+
+    def node_view(self, index):
+        view = self._node_views[index]
+        if view is None:
+            view = self._node_views[index] = NodeView(self, index)
+        return view
+
+    def add_edge(self, nodes, is_border=False, label=None, R=False):
+        indices = [node._index for node in nodes]
+        if label is None:
+            label = "E" if len(indices) == 2 else "Q"
+        table = self.edges if len(indices) == 2 else self.hyperedges
+        edge_id = len(self.edge_rows)
+        view = table.add(edge_id, indices, self.labels.code(label), R, is_border)
+        self.edge_rows.append((table.kind, view._index))
+        return view
+
+    def add_edges(self, pairs, is_border, labels):
+        """Add 2-node edges between the node rows in the (E, 2) array pairs and return their views."""
+        return self._add_many(self.edges, pairs, len(pairs), is_border, labels)
+
+    def add_hyperedges(self, offsets, indices, labels):
+        """Add hyperedges given in CSR form (see HyperGraph.add_hyperedges) and return their views."""
+        count = len(offsets) - 1
+        return self._add_many(self.hyperedges, (offsets, indices), count, np.zeros(count, dtype=bool), labels)
+
+    def _add_many(self, table, node_data, count, is_border, labels):
+        first_id = len(self.edge_rows)
+        codes = [self.labels.code(label) for label in labels]
+        start = table.extend(np.arange(first_id, first_id + count), node_data, codes, is_border)
+        rows = np.arange(start, start + count)
+        self.edge_rows.extend(np.column_stack((np.full(count, table.kind), rows)))
+        return [table.view(row) for row in range(start, start + count)]
+
+    def node_xy(self):
+        """(N, 2) view of the node coordinates, in order of creation."""
+        return self.node_xyz.data[:, :2]
+
+    def hyperedge_rows(self, label=None):
+        """Return the rows of live hyperedges, optionally only those with label."""
+        table = self.hyperedges
+        mask = table.alive.data.copy()
+        if label is not None:
+            mask &= table.label.data == self.labels.code(label)
+        return np.flatnonzero(mask)
+
+    def hyperedge_centroids(self, rows):
+        """Return the (len(rows), 2) centroids of the given hyperedge rows."""
+        offsets = self.hyperedges.offsets.data
+        counts = np.diff(offsets)
+        xy = self.node_xy()
+        if not len(self.hyperedges.indices):
+            return np.zeros((0, 2))
+        sums = np.add.reduceat(xy[self.hyperedges.indices.data], offsets[:-1], axis=0)
+        return (sums / counts[:, None])[rows]
+
+    def export(self):
+        """Return compact copies of all columns, dropping removed edges."""
+        labels = np.array(self.labels.labels, dtype=object)
+
+        edge_rows = np.flatnonzero(self.edges.alive.data)
+        hyper_rows = np.flatnonzero(self.hyperedges.alive.data)
+        offsets = self.hyperedges.offsets.data
+        counts = np.diff(offsets)[hyper_rows]
+        starts = offsets[hyper_rows]
+        # Node indices of the kept hyperedges, concatenated
+        gather = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(counts.sum())
+
+        return {
+            "node_xyz": self.node_xyz.data.copy(),
+            "node_label": labels[self.node_label.data],
+            "edge_id": self.edges.ids.data[edge_rows].copy(),
+            "edge_nodes": self.edges.nodes.data[edge_rows].copy(),
+            "edge_R": self.edges.R.data[edge_rows].copy(),
+            "edge_B": self.edges.B.data[edge_rows].copy(),
+            "edge_label": labels[self.edges.label.data[edge_rows]],
+            "hyperedge_id": self.hyperedges.ids.data[hyper_rows].copy(),
+            "hyperedge_offsets": np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            "hyperedge_nodes": self.hyperedges.indices.data[gather].copy(),
+            "hyperedge_R": self.hyperedges.R.data[hyper_rows].copy(),
+            "hyperedge_B": self.hyperedges.B.data[hyper_rows].copy(),
+            "hyperedge_label": labels[self.hyperedges.label.data[hyper_rows]],
+        }
+
+
+class EdgeTable:
+    """2-node edges: an (E, 2) array of node indices plus attribute columns."""
+
+    def __init__(self, storage, kind):
+        self.storage = storage
+        self.kind = kind
+        self.nodes = GrowableArray(np.int64, width=2)
+        self.ids = GrowableArray(np.int64)
+        self.R = GrowableArray(np.int8)
+        self.B = GrowableArray(np.bool_)
+        self.label = GrowableArray(np.int32)
+        self.alive = GrowableArray(np.bool_)
+        self._views = []
+
+    def add(self, edge_id, indices, label_code, R, is_border):
+        row = self._add_nodes(indices)
+        self.ids.append(edge_id)
+        self.R.append(R)
+        self.B.append(is_border)
+        self.label.append(label_code)
+        self.alive.append(False)  # Set when the graph indexes the edge
+        self._views.append(None)
+        return self.view(row)
+
+    def extend(self, ids, node_data, label_codes, is_border):
+        """Add rows for many edges at once and return the first row."""
+        start = self._extend_nodes(node_data)
+        self.ids.extend(ids)
+        self.R.extend(np.zeros(len(ids), dtype=np.int8))
+        self.B.extend(is_border)
+        self.label.extend(label_codes)
+        self.alive.extend(np.zeros(len(ids), dtype=bool))
+        self._views.extend([None] * len(ids))
+        return start
+
+    def pop(self):
+        """Remove the last row."""
+        size = len(self.ids) - 1
+        self._pop_nodes(size)
+        for column in (self.ids, self.R, self.B, self.label, self.alive):
+            column.truncate(size)
+        self._views.pop()
+
+    def view(self, row):
+        view = self._views[row]
+        if view is None:
+            view = self._views[row] = EdgeView(self, row)
+        return view
+
+    def node_indices(self, row):
+        return self.nodes[row]
+
+    def _add_nodes(self, indices):
+        return self.nodes.append(indices)
+
+    def _extend_nodes(self, pairs):
+        return self.nodes.extend(pairs)
+
+    def _pop_nodes(self, size):
+        self.nodes.truncate(size)
+
+
+class HyperedgeTable(EdgeTable):
+    """Hyperedges in CSR form: node indices of row i are indices[offsets[i]:offsets[i + 1]]."""
+
+    def __init__(self, storage, kind):
+        super().__init__(storage, kind)
+        self.nodes = None
+        self.offsets = GrowableArray(np.int64)
+        self.offsets.append(0)
+        self.indices = GrowableArray(np.int64)
+
+    def node_indices(self, row):
+        return self.indices[self.offsets[row]:self.offsets[row + 1]]
+
+    def _add_nodes(self, indices):
+        self.indices.extend(indices)
+        return self.offsets.append(len(self.indices)) - 1
+
+    def _extend_nodes(self, csr):
+        offsets, indices = csr
+        base = len(self.indices)
+        self.indices.extend(indices)
+        return self.offsets.extend(base + offsets[1:]) - 1
+
+    def _pop_nodes(self, size):
+        self.offsets.truncate(size + 1)
+        self.indices.truncate(int(self.offsets[size]))
+
+
+class NodeView(Node):
+    """Node stored in ArrayStorage columns."""
+
+    __slots__ = ("_storage", "_index")
+
+    def __init__(self, storage, index):
+        self._storage = storage
+        self._index = index
+
+    @property
+    def id(self):
+        return self._index
+
+    def _coordinate(axis):
+        def get(self):
+            return float(self._storage.node_xyz[self._index, axis])
+
+        def set(self, value):
+            self._storage.node_xyz[self._index, axis] = value
+
+        return property(get, set)
+
+    x = _coordinate(0)
+    y = _coordinate(1)
+    z = _coordinate(2)
+    del _coordinate
+
+    @property
+    def label(self):
+        storage = self._storage
+        return storage.labels.labels[storage.node_label[self._index]]
+
+    @label.setter
+    def label(self, value):
+        self._storage.node_label[self._index] = self._storage.labels.code(value)
+
+    def __eq__(self, other):
+        return (isinstance(other, NodeView) and other._storage is self._storage
+                and other._index == self._index)
+
+    def __hash__(self):
+        return hash((NodeView, self._index))
+
+
+class EdgeView(Edge):
+    """Edge or hyperedge stored in ArrayStorage columns.
+
+    The backing fields used by Edge (_label, _R, _B, _graph) map to columns,
+    so the notifying properties of Edge work unchanged. _graph maps to the
+    alive column: it is set while the edge belongs to the graph.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def _column(name, get, set_):
+        def getter(self):
+            return get(self, getattr(self._table, name)[self._index])
+
+        def setter(self, value):
+            getattr(self._table, name)[self._index] = set_(self, value)
+
+        return property(getter, setter)
+
+    _R = _column("R", lambda self, value: int(value), lambda self, value: value)
+    _B = _column("B", lambda self, value: bool(value), lambda self, value: value)
+    _label = _column(
+        "label",
+        lambda self, code: self._table.storage.labels.labels[code],
+        lambda self, value: self._table.storage.labels.code(value),
+    )
+    del _column
+
+    @property
+    def id(self):
+        return int(self._table.ids[self._index])
+
+    @property
+    def _graph(self):
+        return self._table.storage.graph if self._table.alive[self._index] else None
+
+    @_graph.setter
+    def _graph(self, graph):
+        self._table.alive[self._index] = graph is not None
+
+    @property
+    def nodes(self):
+        storage = self._table.storage
+        return tuple(storage.node_view(int(i)) for i in self._table.node_indices(self._index))
+
+    @property
+    def x(self):
+        xyz = self._table.storage.node_xyz
+        return float(xyz[self._table.node_indices(self._index), 0].mean())
+
+    @property
+    def y(self):
+        xyz = self._table.storage.node_xyz
+        return float(xyz[self._table.node_indices(self._index), 1].mean())
+
+    def is_hyperedge(self):
+        return self._table.kind == ArrayStorage.HYPEREDGE
+
+    def __eq__(self, other):
+        return (isinstance(other, EdgeView) and other._table is self._table
+                and other._index == self._index)
+
+    def __hash__(self):
+        return hash((self._table.kind, self._index))
@@ -0,0 +1,96 @@
+"""Binary checkpoint files holding named NumPy arrays.
+
+Layout of a file:
+
+    8 bytes   magic, MAGIC
+    8 bytes   length of the header, little-endian unsigned
+    header    UTF-8 JSON: {"version", "metadata", "sections"}
+    sections  raw C-order array data
+
+Each section starts at a multiple of ALIGNMENT bytes from the start of the
+file, so it can be memory-mapped as is. The header gives for every array
+its dtype, shape and offset, relative to the end of the header padded to
+ALIGNMENT. Used by HyperGraph.save() and HyperGraph.load().
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"HGCKPT\x00\x01"
+VERSION = 1
+ALIGNMENT = 64
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write(path, arrays, metadata):
+    """Write arrays and metadata to path.
+
+    Args:
+        path: File to create or overwrite
+        arrays: Dict of name -> NumPy array, of a numeric or boolean dtype
+        metadata: JSON-serializable dict stored in the header
+    """
+    sections = {}
+    contiguous = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise TypeError(f"Section {name!r} has dtype object, which cannot be stored")
+        contiguous[name] = array
+        sections[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({"version": VERSION, "metadata": metadata, "sections": sections}).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<Q", len(header)))
+        file.write(header)
+        for name, section in sections.items():
+            file.write(b"\0" * (data_start + section["offset"] - file.tell()))
+            file.write(contiguous[name].tobytes())
+
+
+def read(path, mmap=True):
+    """Read a file written by write().
+
+    Args:
+        path: File to read
+        mmap: Map the sections into memory instead of reading them; pages
+              are then only read when touched. The maps are copy-on-write:
+              changing an array never changes the file.
+
+    Returns:
+        tuple: (metadata, arrays) where arrays maps each name to an array
+
+    Raises:
+        ValueError: If path is not a checkpoint or has an unknown version
+    """
+    with open(path, "rb") as file:
+        magic = file.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a graph checkpoint")
+        (length,) = struct.unpack("<Q", file.read(8))
+        header = json.loads(file.read(length))
+        if header["version"] != VERSION:
+            raise ValueError(f"Unsupported checkpoint version {header['version']}")
+        data_start = _aligned(len(MAGIC) + 8 + length)
+
+        arrays = {}
+        for name, section in header["sections"].items():
+            dtype, shape = np.dtype(section["dtype"]), tuple(section["shape"])
+            offset = data_start + section["offset"]
+            count = int(np.prod(shape))
+            if count == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            elif mmap:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape)
+            else:
+                file.seek(offset)
+                arrays[name] = np.fromfile(file, dtype=dtype, count=count).reshape(shape)
+    return header["metadata"], arrays
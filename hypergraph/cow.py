@@ -0,0 +1,274 @@
+"""Copy-on-write containers letting HyperGraph.snapshot() share storage.
+
+A container is split into a local layer, holding the changes of its owner,
+on top of a read-only base shared with other owners. branch() freezes the
+current content into a new base shared by both sides, so it costs O(1) and
+afterwards each side only pays for what it changes. Bases are stacked by
+repeated branching; a stack deeper than MAX_DEPTH is collapsed into one
+layer so lookups stay O(1).
+"""
+import itertools
+
+MAX_DEPTH = 8
+
+_MISSING = object()
+_DELETED = object()  # Marks a key of the base deleted in the local layer
+
+
+class CowDict:
+    """Dict that can share its content with other CowDicts.
+
+    Supports the dict operations used by the graph indices, with the same
+    insertion order. Values may be containers themselves: get() and []
+    may return a value shared with other owners, which must not be
+    modified in place. setdefault() returns a value safe to modify,
+    copied into the local layer first by the copy function.
+    """
+
+    def __init__(self, copy=None):
+        """Create an empty CowDict.
+
+        Args:
+            copy: Function copying a value before it is modified, or None
+                  if values are never modified in place
+        """
+        self._copy = copy
+        self._reset(None)
+
+    @classmethod
+    def wrap(cls, mapping, copy=None):
+        """Return a CowDict taking over mapping (a dict) as its content, without copying it."""
+        cow = cls(copy)
+        cow._local = mapping
+        cow._len = len(mapping)
+        return cow
+
+    def branch(self):
+        """Return a CowDict with the same content, sharing it with this one."""
+        base = self._freeze()
+        self._reset(base)
+        other = CowDict(self._copy)
+        other._reset(base)
+        return other
+
+    def shared_value(self, key):
+        """Return the value key has in the shared base, or None."""
+        value = self._base._lookup(key) if self._base is not None else _MISSING
+        return None if value is _MISSING or value is _DELETED else value
+
+    def replace_shared(self, key, value):
+        """Replace the value key has in the shared base.
+
+        The base is seen by other owners, so value must look the same as
+        the old one to them: this is used to swap an object for a frozen
+        copy of itself just before its owner modifies it.
+        """
+        layer = self._base
+        while layer is not None:
+            if key in layer._local:
+                layer._local[key] = value
+                return
+            layer = layer._base
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING or value is _DELETED else value
+
+    def setdefault(self, key, default=None):
+        """Return the value of key ready to be modified, inserting default if key is missing."""
+        value = self._local.get(key, _MISSING)
+        if value is not _MISSING and value is not _DELETED:
+            return value
+        if value is _MISSING and self._base is not None:
+            value = self._base._lookup(key)
+        if value is _MISSING or value is _DELETED:
+            self[key] = default
+            return default
+        if self._copy is not None:
+            # Shadows the base entry, so the key keeps its place in the order
+            value = self._local[key] = self._copy(value)
+        return value
+
+    def pop(self, key, default=_MISSING):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        del self[key]
+        return value
+
+    def update(self, pairs):
+        for key, value in pairs:
+            self[key] = value
+
+    def items(self):
+        return ((key, self[key]) for key in self)
+
+    def values(self):
+        return (self[key] for key in self)
+
+    def keys(self):
+        return iter(self)
+
+    def __getitem__(self, key):
+        value = self._lookup(key)
+        if value is _MISSING or value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        local = self._local
+        current = local.get(key, _MISSING)
+        if current is _DELETED:
+            # Deleted from the base then added again: it moves to the end
+            del local[key]
+            self._moved.add(key)
+            self._len += 1
+        elif current is _MISSING and not self._in_base(key):
+            self._len += 1
+        local[key] = value
+
+    def __delitem__(self, key):
+        local = self._local
+        current = local.get(key, _MISSING)
+        if current is _DELETED or (current is _MISSING and not self._in_base(key)):
+            raise KeyError(key)
+        if self._in_base(key):
+            local[key] = _DELETED
+            self._moved.discard(key)
+        else:
+            del local[key]
+        self._len -= 1
+
+    def __contains__(self, key):
+        value = self._lookup(key)
+        return value is not _MISSING and value is not _DELETED
+
+    def __iter__(self):
+        local = self._local
+        if self._base is not None:
+            for key in self._base:
+                value = local.get(key, _MISSING)
+                if value is _MISSING or (value is not _DELETED and key not in self._moved):
+                    yield key
+        for key, value in local.items():
+            if value is not _DELETED and (key in self._moved or not self._in_base(key)):
+                yield key
+
+    def __len__(self):
+        return self._len
+
+    def __repr__(self):
+        return f"CowDict({dict(self.items())!r})"
+
+    def _lookup(self, key):
+        layer = self
+        while layer is not None:
+            value = layer._local.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            layer = layer._base
+        return _MISSING
+
+    def _in_base(self, key):
+        if self._base is None:
+            return False
+        value = self._base._lookup(key)
+        return value is not _MISSING and value is not _DELETED
+
+    def _reset(self, base):
+        self._local = {}
+        self._moved = set()
+        self._base = base
+        self._depth = 0 if base is None else base._depth + 1
+        self._len = 0 if base is None else len(base)
+
+    def _freeze(self):
+        """Return a read-only CowDict with the current content, to become a shared base."""
+        if not self._local:
+            return self._base
+        frozen = CowDict(self._copy)
+        frozen._local, frozen._moved, frozen._base = self._local, self._moved, self._base
+        frozen._depth, frozen._len = self._depth, self._len
+        if frozen._depth >= MAX_DEPTH:
+            frozen._local = dict(frozen.items())
+            frozen._moved, frozen._base, frozen._depth = set(), None, 0
+        return frozen
+
+
+class CowList:
+    """List that can share its content with other CowLists.
+
+    Supports reading, iteration, append() and pop(). Only elements added
+    since the last branch() can be popped.
+    """
+
+    def __init__(self):
+        self._base = ()
+        self._base_len = 0
+        self._local = []
+        self._depth = 0
+
+    @classmethod
+    def wrap(cls, items):
+        """Return a CowList taking over items (a list) as its content, without copying it."""
+        cow = cls()
+        cow._local = items
+        return cow
+
+    def branch(self):
+        """Return a CowList with the same content, sharing it with this one."""
+        base = self._freeze()
+        self._reset(base)
+        other = CowList()
+        other._reset(base)
+        return other
+
+    def append(self, item):
+        self._local.append(item)
+
+    def extend(self, items):
+        self._local.extend(items)
+
+    def pop(self):
+        if not self._local:
+            raise IndexError("pop from the shared part of a CowList")
+        return self._local.pop()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if 0 <= index < self._base_len:
+            return self._base[index]
+        return self._local[index - self._base_len]
+
+    def __iter__(self):
+        return itertools.chain(self._base, self._local)
+
+    def __len__(self):
+        return self._base_len + len(self._local)
+
+    def __contains__(self, item):
+        return any(element is item or element == item for element in self)
+
+    def __repr__(self):
+        return f"CowList({list(self)!r})"
+
+    def _reset(self, base):
+        self._base = base
+        self._base_len = len(base)
+        self._local = []
+        self._depth = base._depth + 1 if isinstance(base, CowList) else 0
+
+    def _freeze(self):
+        if not self._local:
+            return self._base
+        frozen = CowList()
+        frozen._base, frozen._base_len, frozen._local, frozen._depth = (
+            self._base, self._base_len, self._local, self._depth)
+        if frozen._depth >= MAX_DEPTH:
+            return tuple(frozen)
+        return frozen
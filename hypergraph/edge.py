@@ -2,17 +2,54 @@ from hypergraph.node import Node
 
 
 class Edge:
+    __slots__ = ("id", "_source", "_graph", "nodes", "_B", "_label", "_R", "x", "y")
+
     def __init__(
         self, nodes: list[Node] | tuple[Node, ...], is_border=False, label=None, R=False
     ):
-        self.nodes = nodes
-        self.B = is_border
-        self.label = label if label else ("E" if len(self.nodes) == 2 else "Q")
-        self.R = R  # Refinement flag
+        self.id = None  # Set by HyperGraph.add_edge / add_hyperedge
+        self._source = None  # Edge this is a snapshot's copy of, see _copy()
+        self._graph = None  # Owning HyperGraph, notified when label, R or B change
+        self.nodes = tuple(nodes)
+        self._B = is_border
+        self._label = label if label else ("E" if len(self.nodes) == 2 else "Q")
+        self._R = R  # Refinement flag
 
         self.x = sum(node.x for node in self.nodes) / len(self.nodes)
         self.y = sum(node.y for node in self.nodes) / len(self.nodes)
 
+    @property
+    def label(self):
+        return self._label
+
+    @label.setter
+    def label(self, value):
+        old = self._label
+        self._label = value
+        if self._graph is not None and old != value:
+            self._graph._on_edge_changed(self, "label", old)
+
+    @property
+    def R(self):
+        return self._R
+
+    @R.setter
+    def R(self, value):
+        old = self._R
+        self._R = value
+        if self._graph is not None and old != value:
+            self._graph._on_edge_changed(self, "R", old)
+
+    @property
+    def B(self):
+        return self._B
+
+    @B.setter
+    def B(self, value):
+        old = self._B
+        self._B = value
+        if self._graph is not None and old != value:
+            self._graph._on_edge_changed(self, "B", old)
 
     @property
     def is_border(self):
@@ -27,6 +64,27 @@ class Edge:
     def is_hyperedge(self):
         return len(self.nodes) > 2
 
+    @classmethod
+    def _create(cls, edge_id, nodes, is_border, label, x, y):
+        """Build an edge whose centroid is already known, see HyperGraph.add_edges()."""
+        edge = cls.__new__(cls)
+        edge.id, edge._source, edge._graph, edge.nodes = edge_id, None, None, nodes
+        edge._B, edge._label, edge._R = is_border, label, False
+        edge.x, edge.y = x, y
+        return edge
+
+    def _copy(self):
+        """Return a copy of the edge not attached to any graph.
+
+        The copy keeps a reference to the edge first copied, which is the
+        object the indices shared with a snapshot hold for it.
+        """
+        edge = Edge.__new__(Edge)
+        edge.id, edge._source, edge._graph, edge.nodes = self.id, self._source or self, None, self.nodes
+        edge._B, edge._label, edge._R = self._B, self._label, self._R
+        edge.x, edge.y = self.x, self.y
+        return edge
+
     def __str__(self):
         if self.is_hyperedge():
             return f"HyperEdge({self.x:.2f}, {self.y:.2f}, label={self.label}, R={self.R}, nodes={len(self.nodes)})"
@@ -0,0 +1,77 @@
+"""Drawable state of a HyperGraph, gathered into NumPy arrays.
+
+A Frame holds what a renderer needs and nothing else: coordinates,
+connectivity as line segments, R and B flags and labels. It does not refer
+to the graph, so the graph can go on changing after the frame is taken,
+and it is cheap to pickle. Taking a frame does not import matplotlib.
+"""
+import numpy as np
+
+
+class Frame:
+    """Coordinates, flags and labels of every element of a graph at one moment.
+
+    Attributes:
+        node_xy: (N, 2) node coordinates
+        node_labels: N node labels
+        edge_segments: (E, 2, 2) end points of the 2-node edges
+        edge_centroids: (E, 2) midpoints of the 2-node edges
+        edge_R, edge_B: (E,) flags of the 2-node edges
+        edge_labels: E labels of the 2-node edges
+        hyperedge_centroids: (M, 2) centroids of the hyperedges
+        hyperedge_R: (M,) R flags of the hyperedges
+        hyperedge_labels: M labels of the hyperedges
+        hyperedge_offsets: (M + 1,) offsets of the nodes of each hyperedge
+                           into spoke_segments
+        spoke_segments: (S, 2, 2) lines from each hyperedge centroid to its nodes
+        spoke_R: (S,) R flag of the hyperedge of each spoke
+    """
+
+    def __init__(self, arrays):
+        """Build a frame from the arrays returned by HyperGraph.export()."""
+        xy = np.asarray(arrays["node_xyz"], dtype=float)[:, :2]
+        self.node_xy = xy
+        self.node_labels = list(arrays["node_label"])
+
+        pairs = np.asarray(arrays["edge_nodes"], dtype=np.int64).reshape(-1, 2)
+        self.edge_segments = xy[pairs]
+        self.edge_centroids = self.edge_segments.mean(axis=1).reshape(-1, 2)
+        self.edge_R = np.asarray(arrays["edge_R"], dtype=np.int8)
+        self.edge_B = np.asarray(arrays["edge_B"], dtype=bool)
+        self.edge_labels = list(arrays["edge_label"])
+
+        offsets = np.asarray(arrays["hyperedge_offsets"], dtype=np.int64)
+        indices = np.asarray(arrays["hyperedge_nodes"], dtype=np.int64)
+        counts = np.diff(offsets)
+        corners = xy[indices]
+        if len(counts):
+            self.hyperedge_centroids = np.add.reduceat(corners, offsets[:-1], axis=0) / counts[:, None]
+        else:
+            self.hyperedge_centroids = np.zeros((0, 2))
+        self.hyperedge_R = np.asarray(arrays["hyperedge_R"], dtype=np.int8)
+        self.hyperedge_labels = list(arrays["hyperedge_label"])
+        self.hyperedge_offsets = offsets - offsets[0]
+        self.spoke_segments = np.stack((np.repeat(self.hyperedge_centroids, counts, axis=0), corners), axis=1)
+        self.spoke_R = np.repeat(self.hyperedge_R, counts)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Return the frame of graph as it is now."""
+        return cls(graph.export())
+
+    def element_count(self):
+        """Return the number of nodes, edges and hyperedges."""
+        return len(self.node_xy) + len(self.edge_segments) + len(self.hyperedge_centroids)
+
+    def polygons(self):
+        """Return the corners of each hyperedge as a list of (k, 2) arrays, in node order."""
+        if not len(self.hyperedge_centroids):
+            return []
+        return np.split(self.spoke_segments[:, 1], self.hyperedge_offsets[1:-1])
+
+    def bounds(self):
+        """Return (x_min, y_min, x_max, y_max) of the nodes, or None if there are none."""
+        if not len(self.node_xy):
+            return None
+        (x_min, y_min), (x_max, y_max) = self.node_xy.min(axis=0), self.node_xy.max(axis=0)
+        return float(x_min), float(y_min), float(x_max), float(y_max)
@@ -1,131 +1,1078 @@
-import matplotlib.pyplot as plt
-from matplotlib.patches import Patch
+import gc
+import heapq
+import math
+from contextlib import contextmanager
+
 from hypergraph.node import Node
 from hypergraph.edge import Edge
+from hypergraph.store import OrderedStore
+from hypergraph.cow import CowDict, CowList
+from hypergraph.spatial import SpatialGrid
+
+# edges_near() ranks the labelled edges directly when at most one edge in
+# this many has the label, instead of walking the edge grid
+NEAR_CANDIDATE_RATIO = 8
+
+
+@contextmanager
+def _gc_paused():
+    """Pause the cyclic garbage collector, which would otherwise run full
+    collections over and over while many objects are being allocated."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
 
 class HyperGraph:
-    def __init__(self):
+    def __init__(self, backend="object"):
+        """Initialize an empty graph.
+
+        Args:
+            backend: "object" keeps every node and edge as a Python object;
+                     "array" keeps them in NumPy columns (see hypergraph.arrays)
+                     and hands out views. Both support the same API.
+        """
+        if backend == "object":
+            self._storage = None
+        elif backend == "array":
+            from hypergraph.arrays import ArrayStorage
+            self._storage = ArrayStorage(self)
+        else:
+            raise ValueError(f"Unknown backend: {backend!r}")
+        self.backend = backend
+
+        self._init_indices()
+        # Callbacks notified of every change, see subscribe()
+        self._listeners = []
+        # Ids handed out by add_node() and add_edge()/add_hyperedge()
+        self._next_node_id = 0
+        self._next_edge_id = 0
+        # Undo records (function, args) of the open transactions, and the
+        # journal length at the start of each of them, see transaction()
+        self._journal = []
+        self._transactions = []
+        self._undoing = False
+        # Set once the storage is shared with a snapshot, see snapshot()
+        self._shared = False
+
+    # Attributes set by _init_indices(), built on first use after load()
+    _INDICES = frozenset((
+        "nodes", "edges", "_pair_index", "_node_edges", "_node_hyperedges", "_midpoints",
+        "_label_index", "_nodes_by_id", "_edges_by_id", "_grid", "_edge_grid",
+    ))
+
+    def _init_indices(self):
         self.nodes = []
-        self.edges = []
+        self.edges = OrderedStore()
+        # Unordered node pair -> 2-node edges between them, in insertion order
+        self._pair_index = {}
+        # Node -> incident 2-node edges / hyperedges, in insertion order
+        self._node_edges = {}
+        self._node_hyperedges = {}
+        # Unordered parent node pair -> node splitting that edge in half
+        self._midpoints = {}
+        # (label, arity, R) -> edges with those attributes
+        self._label_index = {}
+        # Id -> element for the object backend (the array one keeps them in columns)
+        self._nodes_by_id = {}
+        self._edges_by_id = {}
+        # Hash grids over node coordinates and edge centroids for position queries
+        self._grid = SpatialGrid()
+        self._edge_grid = SpatialGrid()
+
+    def __getattr__(self, name):
+        # Only called for missing attributes: the indices of a graph opened by
+        # load() are built the first time one of them is needed
+        pending = self.__dict__.get("_pending_load")
+        if pending is None or name not in self._INDICES:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        del self._pending_load
+        self._init_indices()
+        self._build_indices(*pending)
+        return getattr(self, name)
 
     def add_node(self, x, y, label="V"):
-        node = Node(x, y, label=label)
+        if self._storage is not None:
+            node = self._storage.add_node(x, y, label=label)
+        else:
+            node = Node(x, y, label=label)
+            node.id = self._next_node_id
+            self._nodes_by_id[node.id] = node
+        self._next_node_id += 1
         self.nodes.append(node)
+        layout = self._grid.add(node)
+        self._record(self._undo_add_node, node)
+        if layout is not None:
+            self._record(self._undo_refit, self._grid, layout)
+        self._notify("add_node", node)
         return node
 
     def add_edge(self, node_1, node_2, is_border=False, label="E"):
-        edge = Edge([node_1, node_2], is_border, label)
-        self.edges.append(edge)
+        edge = self._new_edge([node_1, node_2], is_border, label)
+        self.edges.add(edge)
+        self._index_edge(edge)
+        self._record(self._undo_add_edge, edge)
+        self._notify("add_edge", edge)
         return edge
 
     def add_hyperedge(self, nodes, label="Q"):
-        edge = Edge(nodes, label=label)
-        self.edges.append(edge)
+        edge = self._new_edge(nodes, label=label)
+        self.edges.add(edge)
+        self._index_edge(edge)
+        self._record(self._undo_add_edge, edge)
+        self._notify("add_edge", edge)
+        return edge
+
+    @_gc_paused()
+    def add_nodes(self, xy, label="V"):
+        """Add many nodes at once.
+
+        Args:
+            xy: (N, 2) array of node coordinates
+            label: Label of the new nodes
+
+        Returns:
+            list: The new nodes, whose ids follow the rows of xy
+        """
+        import numpy as np
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        if self._storage is not None:
+            nodes = self._storage.add_nodes(xy, label)
+        else:
+            nodes = []
+            for node_id, (x, y) in enumerate(xy.tolist(), start=self._next_node_id):
+                node = Node(x, y, label=label)
+                node.id = node_id
+                self._nodes_by_id[node_id] = node
+                nodes.append(node)
+        self._next_node_id += len(nodes)
+        self.nodes.extend(nodes)
+        layout = self._grid.extend(nodes)
+        self._added(self._undo_add_node, "add_node", nodes)
+        if layout is not None:
+            self._record(self._undo_refit, self._grid, layout)
+        return nodes
+
+    @_gc_paused()
+    def add_edges(self, index_pairs, border_mask=None, labels="E"):
+        """Add many 2-node edges at once.
+
+        Args:
+            index_pairs: (E, 2) array of node ids
+            border_mask: (E,) boolean array of border flags, or None for no border edges
+            labels: Label of all the new edges, or a sequence of E labels
+
+        Returns:
+            list: The new edges, in the order of index_pairs
+        """
+        import numpy as np
+        pairs = np.asarray(index_pairs, dtype=np.int64).reshape(-1, 2)
+        count = len(pairs)
+        border = np.zeros(count, dtype=bool) if border_mask is None else np.asarray(border_mask, dtype=bool)
+        labels = [labels] * count if isinstance(labels, str) else list(labels)
+
+        nodes = [self.node(i) for i in pairs.ravel().tolist()]
+        node_lists = list(zip(nodes[::2], nodes[1::2]))
+        if self._storage is not None:
+            xy = self._storage.node_xy()[pairs]
+        else:
+            xy = np.array([(node.x, node.y) for node in nodes], dtype=float).reshape(-1, 2, 2)
+        centroids = (xy[:, 0] + xy[:, 1]) / 2
+
+        if self._storage is not None:
+            edges = self._storage.add_edges(pairs, border, labels)
+        else:
+            edges = [
+                Edge._create(edge_id, ends, is_border, label, x, y)
+                for edge_id, ends, is_border, label, (x, y) in zip(
+                    range(self._next_edge_id, self._next_edge_id + count),
+                    node_lists, border.tolist(), labels, centroids.tolist())
+            ]
+        self._next_edge_id += count
+        self._index_new_edges(edges, [(label, 2, False) for label in labels], node_lists, centroids)
+        return edges
+
+    @_gc_paused()
+    def add_hyperedges(self, offsets, indices, labels="Q"):
+        """Add many hyperedges at once.
+
+        Hyperedges are given in CSR form, as returned by export(): the node
+        ids of hyperedge i are indices[offsets[i]:offsets[i + 1]].
+
+        Args:
+            offsets: (M + 1,) array of offsets into indices
+            indices: Array of node ids
+            labels: Label of all the new hyperedges, or a sequence of M labels
+
+        Returns:
+            list: The new hyperedges, in the order given
+
+        Raises:
+            ValueError: If a hyperedge has fewer than 3 nodes; 2-node edges
+                        are added with add_edges()
+        """
+        import numpy as np
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if len(offsets) < 2:
+            return []
+        if (np.diff(offsets) < 3).any():
+            raise ValueError("Hyperedges need at least 3 nodes, add 2-node edges with add_edges()")
+        indices = np.asarray(indices, dtype=np.int64)[offsets[0]:offsets[-1]]
+        offsets = offsets - offsets[0]
+        count = len(offsets) - 1
+        labels = [labels] * count if isinstance(labels, str) else list(labels)
+
+        nodes = [self.node(i) for i in indices.tolist()]
+        bounds = offsets.tolist()
+        node_lists = [tuple(nodes[start:end]) for start, end in zip(bounds, bounds[1:])]
+        if self._storage is not None:
+            xy = self._storage.node_xy()[indices]
+        else:
+            xy = np.array([(node.x, node.y) for node in nodes], dtype=float).reshape(-1, 2)
+        centroids = np.add.reduceat(xy, offsets[:-1], axis=0) / np.diff(offsets)[:, None] if count else np.zeros((0, 2))
+
+        if self._storage is not None:
+            edges = self._storage.add_hyperedges(offsets, indices, labels)
+        else:
+            edges = [
+                Edge._create(edge_id, corners, False, label, x, y)
+                for edge_id, corners, label, (x, y) in zip(
+                    range(self._next_edge_id, self._next_edge_id + count),
+                    node_lists, labels, centroids.tolist())
+            ]
+        self._next_edge_id += count
+        keys = [(label, len(corners), False) for label, corners in zip(labels, node_lists)]
+        self._index_new_edges(edges, keys, node_lists, centroids)
+        return edges
+
+    def _index_new_edges(self, edges, keys, node_lists, centroids):
+        """Add new edges to every index in one pass.
+
+        Does what _index_edge() does for each edge, with the label keys,
+        nodes and (E, 2) centroids given by the caller and every index
+        extended once per key.
+        """
+        self.edges.extend(edges)
+        groups = {}
+        for edge, key in zip(edges, keys):
+            edge._graph = self
+            groups.setdefault(key, []).append(edge)
+        for key, group in groups.items():
+            self._label_index.setdefault(key, OrderedStore()).extend(group)
+        if self._storage is None:
+            self._edges_by_id.update((edge.id, edge) for edge in edges)
+
+        pair_index = self._pair_index
+        for edge, nodes in zip(edges, node_lists):
+            hyperedge = len(nodes) > 2
+            incidence = self._node_hyperedges if hyperedge else self._node_edges
+            for node in nodes:
+                incidence.setdefault(node, {})[edge] = None
+            if not hyperedge:
+                pair_index.setdefault(frozenset(nodes), []).append(edge)
+
+        # The grid picks its cell size once for all the new edges
+        layout = self._edge_grid.extend(edges, centroids[:, 0].tolist(), centroids[:, 1].tolist())
+        self._added(self._undo_add_edge, "add_edge", edges)
+        if layout is not None:
+            self._record(self._undo_refit, self._edge_grid, layout)
+
+    def _added(self, undo, event, elements):
+        """Journal and notify the elements added by a bulk method."""
+        if self._journaling():
+            for element in elements:
+                self._record(undo, element)
+        if self._listeners:
+            for element in elements:
+                self._notify(event, element)
+
+    def _new_edge(self, nodes, is_border=False, label=None):
+        if self._storage is not None:
+            edge = self._storage.add_edge(nodes, is_border, label)
+        else:
+            edge = Edge(nodes, is_border, label)
+            edge.id = self._next_edge_id
+        self._next_edge_id += 1
         return edge
 
+    def node(self, node_id):
+        """Return the node with the given id. Raises KeyError if there is none."""
+        if self._storage is not None:
+            return self._storage.node_by_id(node_id)
+        return self._nodes_by_id[node_id]
+
+    def edge(self, edge_id):
+        """Return the edge or hyperedge with the given id.
+
+        Raises KeyError if there is none or it was removed.
+        """
+        if self._storage is not None:
+            return self._storage.edge_by_id(edge_id)
+        return self._own(self._edges_by_id[edge_id])
+
     def get_edge_between(self, node_1, node_2):
-        for edge in self.edges:
-            if not edge.is_hyperedge() and \
-               ((edge.nodes[0] == node_1 and edge.nodes[1] == node_2) or \
-                (edge.nodes[0] == node_2 and edge.nodes[1] == node_1)):
-                return edge
-        return None
+        """Return the first 2-node edge joining node_1 and node_2, or None."""
+        edges = self._pair_index.get(frozenset((node_1, node_2)))
+        return self._own(edges[0]) if edges else None
+
+    def incident_edges(self, node):
+        """Return the 2-node edges touching node."""
+        return self._owned(self._node_edges.get(node, ()))
+
+    def incident_hyperedges(self, node):
+        """Return the hyperedges (elements) containing node."""
+        return self._owned(self._node_hyperedges.get(node, ()))
+
+    def neighbors(self, node):
+        """Return the nodes joined to node by a 2-node edge."""
+        result = {}
+        for edge in self._node_edges.get(node, ()):
+            for other in edge.nodes:
+                if other is not node:
+                    result[other] = None
+        return list(result)
+
+    def degree(self, node):
+        """Number of 2-node edges touching node."""
+        return len(self._node_edges.get(node, ()))
+
+    def hyperdegree(self, node):
+        """Number of hyperedges containing node."""
+        return len(self._node_hyperedges.get(node, ()))
+
+    def register_midpoint(self, node_1, node_2, midpoint):
+        """Record that the edge node_1 - node_2 was split at midpoint.
+
+        The entry outlives the parent edge, so elements sharing that side
+        can still find the hanging node after the parent edge is removed.
+        """
+        key = frozenset((node_1, node_2))
+        self._record(self._undo_register_midpoint, key, self._midpoints.get(key))
+        self._midpoints[key] = midpoint
+
+    def get_midpoint(self, node_1, node_2):
+        """Return the registered node splitting node_1 - node_2, or None."""
+        return self._midpoints.get(frozenset((node_1, node_2)))
+
+    def get_split(self, node_1, node_2):
+        """Return (midpoint, edge node_1 - midpoint, edge midpoint - node_2).
+
+        Returns None if node_1 - node_2 was never split. Half-edges that no
+        longer exist are returned as None.
+        """
+        midpoint = self.get_midpoint(node_1, node_2)
+        if midpoint is None:
+            return None
+        return (
+            midpoint,
+            self.get_edge_between(node_1, midpoint),
+            self.get_edge_between(midpoint, node_2),
+        )
+
+    def find_node(self, x, y, tolerance=1e-6):
+        """Return the node closest to (x, y) within tolerance, or None."""
+        found = self._grid.within(x, y, tolerance)
+        return found[0] if found else None
+
+    def nodes_within(self, x, y, tolerance):
+        """Return the nodes at distance at most tolerance from (x, y), nearest first."""
+        return self._grid.within(x, y, tolerance)
+
+    def nearest_nodes(self, x, y, k=1):
+        """Return the k nodes closest to (x, y), nearest first."""
+        return self._grid.nearest(x, y, k)
+
+    def nodes_in_box(self, x_min, y_min, x_max, y_max):
+        """Return the nodes inside the axis-aligned box, borders included."""
+        return self._grid.in_box(x_min, y_min, x_max, y_max)
+
+    def edges_near(self, x, y, label=None, arity=None, R=None):
+        """Yield edges and hyperedges in order of centroid distance from (x, y).
+
+        Edges are produced lazily, so stopping after the first few only looks
+        at the neighbourhood of (x, y). The graph must not be changed while
+        iterating.
+
+        Args:
+            x, y: Target point
+            label: Only yield edges with this label, or None for any
+            arity: Number of nodes of the edges, used with label
+            R: Refinement flag to match, or None for any value
+        """
+        if label is None:
+            edges = self._edge_grid.iter_nearest(x, y)
+        else:
+            edges = self._labelled_edges_near(x, y, label, arity, R)
+        return map(self._own, edges) if self._shared else edges
+
+    def _labelled_edges_near(self, x, y, label, arity, R):
+        """Yield the edges of edges_near() with the given label, arity and R.
+
+        Only the label index buckets are looked at when they hold a small
+        part of the edges, otherwise the grid walk skips the other edges.
+        """
+        buckets = [
+            edges for key, edges in self._label_index.items()
+            if key[0] == label and key[1] == arity and (R is None or key[2] == R)
+        ]
+        count = sum(len(edges) for edges in buckets)
+        if not count:
+            return
+        if count * NEAR_CANDIDATE_RATIO > len(self._edge_grid):
+            # The grid may hold another graph's object, read this graph's state
+            edges_by_id = self._edges_by_id if self._shared else None
+            for edge in self._edge_grid.iter_nearest(x, y):
+                state = edge if edges_by_id is None or edge._graph is self else edges_by_id[edge.id]
+                if state.label == label and len(state.nodes) == arity and (R is None or state.R == R):
+                    yield edge
+            return
+
+        hypot = math.hypot
+        heap = [
+            (hypot(edge.x - x, edge.y - y), order, edge)
+            for order, edge in enumerate(edge for edges in buckets for edge in edges)
+        ]
+        heapq.heapify(heap)
+        while heap:
+            yield heapq.heappop(heap)[2]
+
+    def edges_with(self, label, arity, R=None):
+        """Return the edges with the given label and number of nodes.
+
+        Args:
+            label: Edge label (eg, "E", "Q", "S")
+            arity: Number of nodes of the edge
+            R: Refinement flag to match, or None for any value
+
+        Returns:
+            list: Matching edges. It is a copy, so the graph may be changed
+                  while iterating over it.
+        """
+        if R is not None:
+            return self._owned(self._label_index.get((label, arity, R), ()))
+
+        result = []
+        for key, edges in self._label_index.items():
+            if key[0] == label and key[1] == arity:
+                result.extend(edges)
+        return self._owned(result)
 
     def remove_edge(self, edge):
-        if edge in self.edges:
-            self.edges.remove(edge)
+        """Remove edge from the graph. Edges of other graphs are ignored.
 
-    def print(self):
-        print("Nodes:")
-        for node in self.nodes:
-            print(f"  {node}")
-        print("Edges:")
-        for edge in self.edges:
-            print(f"  {edge}")
+        An edge handed out by a graph sharing storage with this one (see
+        snapshot()) stands for this graph's copy of it, if it still has it.
+        """
+        if edge._graph is not self:
+            if not self._shared or self._indexed(edge) not in self.edges:
+                return
+            edge = self._own(self._indexed(edge))
+        if self._journaling():
+            self._record(self._undo_remove_edge, edge, self._edge_positions(edge))
+        self.edges.discard(self._indexed(edge))
+        self._unindex_edge(edge)
+        self._notify("remove_edge", edge)
+
+    @contextmanager
+    def transaction(self):
+        """Journal the changes made inside the block so they can be undone.
+
+        Every added node or edge, removed edge, changed label, R or B flag
+        and registered midpoint is recorded with what is needed to undo it,
+        so rolling back costs O(changes), not O(graph size). If the block
+        raises, its changes are rolled back and the exception propagates.
+        Transactions can be nested; leaving the outermost one discards the
+        journal. Direct changes to node attributes are not recorded.
+
+        Example:
+            with graph.transaction():
+                p3.apply(graph, matched)
+                if not acceptable(graph):
+                    graph.rollback()
+        """
+        self._transactions.append(len(self._journal))
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        finally:
+            self._transactions.pop()
+            if not self._transactions:
+                self._journal = []
+
+    def rollback(self):
+        """Undo every change made since the innermost open transaction began.
+
+        The graph, including the order of its elements and the next ids,
+        is left as it was when the transaction began, and the transaction
+        stays open. Listeners are notified of each undone change.
+        """
+        if not self._transactions:
+            raise RuntimeError("rollback() called outside of a transaction")
 
-    def visualize(self, filename=None):
-        plt.figure(figsize=(16, 16))
+        start = self._transactions[-1]
+        self._undoing = True
+        try:
+            while len(self._journal) > start:
+                undo, args = self._journal.pop()
+                undo(*args)
+        finally:
+            self._undoing = False
 
-        for edge in self.edges:
-            if not edge.is_hyperedge():
-                x_vals = [edge.nodes[0].x, edge.nodes[1].x]
-                y_vals = [edge.nodes[0].y, edge.nodes[1].y]
+    def snapshot(self):
+        """Return a copy-on-write copy of the graph.
 
-                # Edge color: red for marked, black for rest
-                if edge.R:
-                    color = 'red'
+        The copy shares all its storage with this graph: nodes, edges and
+        every index. Taking it costs O(1), and afterwards either graph only
+        copies the parts it changes, so the memory used grows with how far
+        the two diverge, not with the size of the mesh. Both graphs can be
+        changed independently; productions see the copy as a plain graph.
 
-                else:
-                    color = 'black'
+        Nodes are shared by both graphs, so their attributes must not be
+        changed after the snapshot. Edges are copied the first time the
+        copy hands them out; this graph keeps its own edge objects. The
+        copy starts with no listeners and no open transaction.
 
-                plt.scatter(edge.x, edge.y, s=700, c='white', marker='s',
-                            edgecolors='black', linewidths=1.5, zorder=14)
+        Returns:
+            HyperGraph: The copy
 
-                label_text = f"{edge.label}\nR={edge.R}" if edge.R else edge.label
-                plt.text(edge.x, edge.y, label_text, ha='center', va='center',
-                         fontsize=12, fontweight='bold', zorder=15)
+        Raises:
+            RuntimeError: If a transaction is open
+            NotImplementedError: For the array backend
+        """
+        if self._storage is not None:
+            raise NotImplementedError("snapshot() is not supported by the array backend")
+        if self._transactions:
+            raise RuntimeError("snapshot() called inside a transaction")
 
-                # Edge is thicker if it's a border edge
-                linewidth = 4 if edge.B else 2
-                plt.plot(x_vals, y_vals, color=color, linewidth=linewidth, zorder=1)
+        copy = HyperGraph()
+        # Index name -> function copying one of its values before it is modified
+        for name, copy_value in (
+            ("_pair_index", list),
+            ("_node_edges", dict),
+            ("_node_hyperedges", dict),
+            ("_midpoints", None),
+            ("_label_index", OrderedStore.branch),
+            ("_nodes_by_id", None),
+            ("_edges_by_id", None),
+        ):
+            index = getattr(self, name)
+            if not isinstance(index, CowDict):
+                index = CowDict.wrap(index, copy_value)
+                setattr(self, name, index)
+            setattr(copy, name, index.branch())
+
+        if not isinstance(self.nodes, CowList):
+            self.nodes = CowList.wrap(self.nodes)
+        copy.nodes = self.nodes.branch()
+        copy.edges = self.edges.branch(view=copy._own, key=copy._indexed)
+        copy._grid = self._grid.branch()
+        copy._edge_grid = self._edge_grid.branch()
+        copy._next_node_id = self._next_node_id
+        copy._next_edge_id = self._next_edge_id
+        self._shared = copy._shared = True
+        return copy
+
+    def node_coordinates(self):
+        """Return the node coordinates as an (N, 2) array, in the order of self.nodes."""
+        if self._storage is not None:
+            return self._storage.node_xy().copy()
+        import numpy as np
+        return np.array([(node.x, node.y) for node in self.nodes], dtype=float).reshape(-1, 2)
+
+    def bounding_box(self):
+        """Return (x_min, y_min, x_max, y_max) of the nodes, or None if there are none."""
+        if self._storage is not None:
+            xy = self._storage.node_xy()
+        else:
+            xy = self.node_coordinates()
+        if not len(xy):
+            return None
+        (x_min, y_min), (x_max, y_max) = xy.min(axis=0), xy.max(axis=0)
+        return float(x_min), float(y_min), float(x_max), float(y_max)
+
+    def hyperedge_centroids(self, label=None):
+        """Return the hyperedges and their centroids.
+
+        Args:
+            label: Only hyperedges with this label, or None for all
+
+        Returns:
+            tuple: (hyperedges, centroids) where centroids is an (M, 2) array
+                   whose rows follow the hyperedges list, in graph.edges order
+        """
+        if self._storage is not None:
+            storage = self._storage
+            rows = storage.hyperedge_rows(label)
+            return [storage.hyperedges.view(int(row)) for row in rows], storage.hyperedge_centroids(rows)
+
+        import numpy as np
+        hyperedges = [edge for edge in self.edges
+                      if edge.is_hyperedge() and (label is None or edge.label == label)]
+        centroids = np.array([(edge.x, edge.y) for edge in hyperedges], dtype=float).reshape(-1, 2)
+        return hyperedges, centroids
+
+    def mark(self, criterion, label=None):
+        """Mark for refinement (R=1) the hyperedges whose centroid meets criterion.
+
+        The criterion is evaluated once for all hyperedges, on coordinate arrays.
+
+        Args:
+            criterion: Function criterion(x, y) taking two arrays of centroid
+                       coordinates and returning a boolean array
+            label: Only hyperedges with this label, or None for all
+
+        Returns:
+            list: Hyperedges whose R changed from 0 to 1
+        """
+        import numpy as np
+        if self._storage is not None:
+            storage = self._storage
+            rows = storage.hyperedge_rows(label)
+            centroids = storage.hyperedge_centroids(rows)
+            selected = np.asarray(criterion(centroids[:, 0], centroids[:, 1]), dtype=bool)
+            selected &= storage.hyperedges.R.data[rows] == 0
+            hyperedges = [storage.hyperedges.view(int(row)) for row in rows[selected]]
+        else:
+            hyperedges, centroids = self.hyperedge_centroids(label)
+            selected = np.asarray(criterion(centroids[:, 0], centroids[:, 1]), dtype=bool)
+            hyperedges = [edge for edge, chosen in zip(hyperedges, selected) if chosen and not edge.R]
+
+        for edge in hyperedges:
+            edge.R = 1
+        return hyperedges
+
+    def export(self):
+        """Return the graph as NumPy arrays.
+
+        Nodes are referred to by their position in self.nodes, which is also
+        their id. Edges and hyperedges come with their ids. Hyperedges are
+        in CSR form: the nodes of hyperedge i are
+        hyperedge_nodes[hyperedge_offsets[i]:hyperedge_offsets[i + 1]].
+
+        Returns:
+            dict: node_xyz, node_label, edge_id, edge_nodes, edge_R, edge_B, edge_label,
+                  hyperedge_id, hyperedge_offsets, hyperedge_nodes, hyperedge_R, hyperedge_B,
+                  hyperedge_label
+        """
+        if self._storage is not None:
+            return self._storage.export()
+
+        import numpy as np
+        index = {node: i for i, node in enumerate(self.nodes)}
+        edges = [edge for edge in self._edge_states() if not edge.is_hyperedge()]
+        hyperedges = [edge for edge in self._edge_states() if edge.is_hyperedge()]
+        counts = [len(edge.nodes) for edge in hyperedges]
+        return {
+            "node_xyz": np.array([(n.x, n.y, n.z) for n in self.nodes], dtype=float).reshape(-1, 3),
+            "node_label": np.array([n.label for n in self.nodes], dtype=object),
+            "edge_id": np.array([e.id for e in edges], dtype=np.int64),
+            "edge_nodes": np.array([[index[n] for n in e.nodes] for e in edges], dtype=np.int64).reshape(-1, 2),
+            "edge_R": np.array([e.R for e in edges], dtype=np.int8),
+            "edge_B": np.array([e.B for e in edges], dtype=bool),
+            "edge_label": np.array([e.label for e in edges], dtype=object),
+            "hyperedge_id": np.array([e.id for e in hyperedges], dtype=np.int64),
+            "hyperedge_offsets": np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            "hyperedge_nodes": np.array([index[n] for e in hyperedges for n in e.nodes], dtype=np.int64),
+            "hyperedge_R": np.array([e.R for e in hyperedges], dtype=np.int8),
+            "hyperedge_B": np.array([e.B for e in hyperedges], dtype=bool),
+            "hyperedge_label": np.array([e.label for e in hyperedges], dtype=object),
+        }
+
+    def save(self, path):
+        """Write the graph to a binary file, to be read back by load().
+
+        The file holds the arrays of export(), with labels stored as integer
+        codes, plus the registered midpoints and the order of the label
+        index, so a loaded graph goes on refining exactly as this one would.
+        See hypergraph.checkpoint for the layout. Listeners and open
+        transactions are not saved.
+
+        Args:
+            path: File to create or overwrite
+        """
+        import numpy as np
+        from hypergraph import checkpoint
+
+        arrays = self.export()
+        codes = {}
+        for name in ("node_label", "edge_label", "hyperedge_label"):
+            arrays[name] = np.array([codes.setdefault(label, len(codes)) for label in arrays[name].tolist()],
+                                    dtype=np.int32)
+
+        # Place of each edge in its label index bucket, which decides the
+        # order productions find their matches in
+        rank = {}
+        for bucket in self._label_index.values():
+            rank.update((edge.id, i) for i, edge in enumerate(bucket.stored()))
+        for kind in ("edge", "hyperedge"):
+            arrays[kind + "_rank"] = np.array([rank[i] for i in arrays[kind + "_id"].tolist()], dtype=np.int64)
+
+        midpoints = [(sorted(node.id for node in key), node.id) for key, node in self._midpoints.items()]
+        arrays["midpoint_ends"] = np.array([ends for ends, _ in midpoints], dtype=np.int64).reshape(-1, 2)
+        arrays["midpoint"] = np.array([node_id for _, node_id in midpoints], dtype=np.int64)
+
+        metadata = {"backend": self.backend, "labels": list(codes), "next_edge_id": self._next_edge_id}
+        checkpoint.write(path, arrays, metadata)
+
+    @classmethod
+    def load(cls, path, backend=None, mmap=True):
+        """Read a graph written by save().
+
+        With mmap the file is memory-mapped instead of read. The array
+        backend then takes the mapped arrays over as its columns, so the
+        graph opens in constant time and only the pages touched are read
+        from disk; the indices used by the productions are built the first
+        time one is needed. Changes are never written back to the file.
+
+        Args:
+            path: File written by save()
+            backend: Backend of the new graph, or None for the one it was saved from
+            mmap: Memory-map the file instead of reading it
+
+        Returns:
+            HyperGraph: The loaded graph
+
+        Raises:
+            ValueError: If path is not a graph checkpoint
+        """
+        from hypergraph import checkpoint
+        metadata, arrays = checkpoint.read(path, mmap)
+        graph = cls(backend or metadata["backend"])
+        graph._next_node_id = len(arrays["node_xyz"])
+        graph._next_edge_id = metadata["next_edge_id"]
+        if graph._storage is not None:
+            graph._storage.load(arrays, metadata["labels"], graph._next_edge_id)
+            for name in cls._INDICES:
+                delattr(graph, name)
+            graph._pending_load = (arrays, metadata["labels"])
+        else:
+            graph._build_indices(arrays, metadata["labels"])
+        return graph
+
+    @_gc_paused()
+    def _build_indices(self, arrays, labels):
+        """Create the elements of a graph read by load() and index them.
+
+        Edges and hyperedges are indexed together in id order, which is the
+        order they were added in; the label index buckets then get back the
+        order they were saved in.
+        """
+        import numpy as np
+        labels = np.array(labels, dtype=object)
+        xyz = np.asarray(arrays["node_xyz"])
+        pairs = np.asarray(arrays["edge_nodes"])
+        offsets = np.asarray(arrays["hyperedge_offsets"])
+        indices = np.asarray(arrays["hyperedge_nodes"])
+
+        if self._storage is not None:
+            storage = self._storage
+            nodes = [storage.node_view(i) for i in range(len(xyz))]
+        else:
+            nodes = []
+            for node_id, ((x, y, z), label) in enumerate(zip(xyz.tolist(), labels[arrays["node_label"]].tolist())):
+                node = Node(x, y, z, label)
+                node.id = node_id
+                nodes.append(node)
+            self._nodes_by_id.update(enumerate(nodes))
+        self.nodes.extend(nodes)
+        self._grid.extend(nodes, xyz[:, 0].tolist(), xyz[:, 1].tolist())
+
+        edge_nodes = [(nodes[a], nodes[b]) for a, b in pairs.tolist()]
+        bounds = offsets.tolist()
+        corners = [nodes[i] for i in indices.tolist()]
+        hyperedge_nodes = [tuple(corners[start:end]) for start, end in zip(bounds, bounds[1:])]
+        node_lists = edge_nodes + hyperedge_nodes
+
+        counts = np.diff(offsets)
+        hyperedge_centroids = (np.add.reduceat(xyz[indices, :2], offsets[:-1], axis=0) / counts[:, None]
+                               if len(counts) else np.zeros((0, 2)))
+        centroids = np.concatenate((xyz[pairs, :2].mean(axis=1).reshape(-1, 2), hyperedge_centroids))
+
+        ids = np.concatenate((arrays["edge_id"], arrays["hyperedge_id"]))
+        R = np.concatenate((arrays["edge_R"], arrays["hyperedge_R"])).tolist()
+        B = np.concatenate((arrays["edge_B"], arrays["hyperedge_B"])).tolist()
+        edge_labels = labels[np.concatenate((arrays["edge_label"], arrays["hyperedge_label"]))].tolist()
+        if self._storage is not None:
+            edges = ([storage.edges.view(row) for row in range(len(pairs))]
+                     + [storage.hyperedges.view(row) for row in range(len(counts))])
+        else:
+            edges = []
+            for edge_id, ends, is_border, label, R_value, (x, y) in zip(
+                    ids.tolist(), node_lists, B, edge_labels, R, centroids.tolist()):
+                edge = Edge._create(edge_id, ends, is_border, label, x, y)
+                edge._R = R_value
+                edges.append(edge)
+
+        order = np.argsort(ids, kind="stable").tolist()
+        self._index_new_edges(
+            [edges[i] for i in order],
+            [(edge_labels[i], len(node_lists[i]), R[i]) for i in order],
+            [node_lists[i] for i in order],
+            centroids[order],
+        )
+
+        rank = dict(zip(ids.tolist(), np.concatenate((arrays["edge_rank"], arrays["hyperedge_rank"])).tolist()))
+        for key, bucket in list(self._label_index.items()):
+            self._label_index[key] = OrderedStore(sorted(bucket, key=lambda edge: rank[edge.id]))
+
+        for (a, b), midpoint in zip(arrays["midpoint_ends"].tolist(), arrays["midpoint"].tolist()):
+            self._midpoints[frozenset((nodes[a], nodes[b]))] = nodes[midpoint]
+
+    def subscribe(self, callback):
+        """Register callback to be notified of every change to the graph.
+
+        The callback is called as callback(event, element, attribute, old_value)
+        where event is one of "add_node", "add_edge", "remove_edge",
+        "change_edge" or "remove_node" (only sent by rollback()). attribute
+        ("label", "R" or "B") and old_value are only set for "change_edge",
+        and None otherwise.
+        """
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, event, element, attribute=None, old_value=None):
+        for callback in self._listeners:
+            callback(event, element, attribute, old_value)
+
+    def _own(self, edge):
+        """Return this graph's object for edge.
+
+        Edges shared with a snapshot belong to the graph that created them;
+        the other graph makes its own copy the first time it hands one out.
+        """
+        if edge._graph is self:
+            return edge
+        current = self._edges_by_id[edge.id]
+        if current._graph is not self:
+            current = current._copy()
+            current._graph = self
+            self._edges_by_id[edge.id] = current
+        return current
+
+    def _indexed(self, edge):
+        """Return the object the indices hold for edge.
+
+        Indices shared with a snapshot hold the edges as they were when it
+        was taken, and the copies made by _own() stand for those.
+        """
+        return edge._source or edge if self._shared else edge
+
+    def _owned(self, edges):
+        """Return edges as a list of this graph's objects, see _own()."""
+        if not self._shared:
+            return list(edges)
+        return [self._own(edge) for edge in edges]
+
+    def _edge_states(self):
+        """Iterate over the edges for reading, without copying shared ones."""
+        if not self._shared:
+            return iter(self.edges)
+        edges_by_id = self._edges_by_id
+        return (edge if edge._graph is self else edges_by_id[edge.id] for edge in self.edges.stored())
+
+    def _index_edge(self, edge, positions=None):
+        """Add edge to the indices, at the places in positions if given (see _edge_positions)."""
+        edge._graph = self
+        if self._storage is None:
+            self._edges_by_id[edge.id] = edge
+        item = self._indexed(edge)
+        key = self._label_key(edge)
+        bucket = self._label_index.get(key)
+        if bucket is None:
+            bucket = self._label_index[key] = OrderedStore()
+        else:
+            # setdefault() gives a copy safe to modify when the index is shared
+            bucket = self._label_index.setdefault(key, bucket)
+        if positions is None:
+            bucket.add(item)
+            layout = self._edge_grid.add(item)
+            if layout is not None:
+                self._record(self._undo_refit, self._edge_grid, layout)
+        else:
+            bucket.restore(item, positions["label"])
+            self._edge_grid.restore(item, positions["grid"])
+
+        incidence = self._node_hyperedges if edge.is_hyperedge() else self._node_edges
+        for i, node in enumerate(edge.nodes):
+            incident = incidence.setdefault(node, {})
+            if positions is None:
+                incident[item] = None
             else:
-                # Hyperedge color: bright red for marked (R=1), yellow for normal (R=0)
-                hyperedge_color = 'red' if edge.R else 'yellow'
+                items = list(incident)
+                items.insert(positions["incidence"][i], item)
+                incidence[node] = dict.fromkeys(items)
 
-                plt.scatter(edge.x, edge.y, s=700, c=hyperedge_color, marker='s',
-                            edgecolors='black', linewidths=2, zorder=14)
+        if edge.is_hyperedge():
+            return
+        edges = self._pair_index.setdefault(frozenset(edge.nodes), [])
+        if positions is None:
+            edges.append(item)
+        else:
+            edges.insert(positions["pair"], item)
 
-                # Add R value to label if marked
-                label_text = f"{edge.label}\nR={edge.R}" if edge.R else edge.label
-                plt.text(edge.x, edge.y, label_text, ha='center', va='center',
-                         fontsize=12, fontweight='bold', zorder=15)
+    def _edge_positions(self, edge):
+        """Return where edge sits in each index, so it can be put back exactly."""
+        item = self._indexed(edge)
+        incidence = self._node_hyperedges if edge.is_hyperedge() else self._node_edges
+        positions = {
+            "edges": self.edges.position(item),
+            "label": self._label_index[self._label_key(edge)].position(item),
+            "grid": self._edge_grid.position(item),
+            "incidence": [list(incidence[node]).index(item) for node in edge.nodes],
+        }
+        if not edge.is_hyperedge():
+            positions["pair"] = self._pair_index[frozenset(edge.nodes)].index(item)
+        return positions
 
-                # Connection lines to nodes
-                connection_color = 'red' if edge.R else 'black'
-                for node in edge.nodes:
-                    plt.plot([edge.x, node.x], [edge.y, node.y],
-                            color=connection_color, alpha=0.6,
-                            linewidth=2, zorder=5)
+    def _unindex_edge(self, edge):
+        edge._graph = None
+        if self._storage is None:
+            del self._edges_by_id[edge.id]
+        item = self._indexed(edge)
+        self._remove_from_label_index(item, self._label_key(edge))
+        self._edge_grid.discard(item)
 
-        for node in self.nodes:
-            color = 'lightblue'
-            plt.scatter(node.x, node.y, s=600, c=color, edgecolors='black',
-                        linewidths=2, zorder=9)
-            plt.text(node.x, node.y, node.label, ha='center', va='center',
-                     fontsize=10, fontweight='bold', zorder=10)
-
-        # Calculate bounds with margin
-        if self.nodes:
-            all_x = [n.x for n in self.nodes]
-            all_y = [n.y for n in self.nodes]
-            min_x, max_x = min(all_x), max(all_x)
-            min_y, max_y = min(all_y), max(all_y)
-            
-            # Add 30% margin
-            margin_x = (max_x - min_x) * 0.3 or 1
-            margin_y = (max_y - min_y) * 0.3 or 1
-            
-            plt.xlim(min_x - margin_x, max_x + margin_x)
-            plt.ylim(min_y - margin_y, max_y + margin_y)
-
-        plt.axis('equal')
-        plt.grid(True, alpha=0.3)
-
-        # Add legend
-        legend_elements = [
-            Patch(facecolor='black', edgecolor='black', label='Edge (R=0)'),
-            Patch(facecolor='red', edgecolor='red', label='Edge (R=1)'),
-            Patch(facecolor='lightblue', edgecolor='black', label='Node'),
+        # Indices are modified through setdefault(), which copies shared entries
+        incidence = self._node_hyperedges if edge.is_hyperedge() else self._node_edges
+        for node in edge.nodes:
+            incident = incidence.get(node)
+            if incident is not None:
+                incident = incidence.setdefault(node, incident)
+                incident.pop(item, None)
+                if not incident:
+                    del incidence[node]
 
-        ]
-        plt.legend(handles=legend_elements, loc='upper right', fontsize=10)
+        if edge.is_hyperedge():
+            return
+        key = frozenset(edge.nodes)
+        edges = self._pair_index.get(key)
+        if edges is None:
+            return
+        edges = self._pair_index.setdefault(key, edges)
+        edges.remove(item)
+        if not edges:
+            del self._pair_index[key]
+
+    def _label_key(self, edge, label=None, R=None):
+        return (
+            edge.label if label is None else label,
+            len(edge.nodes),
+            edge.R if R is None else R,
+        )
 
-        plt.title('HyperGraph Visualization')
+    def _remove_from_label_index(self, edge, key):
+        edges = self._label_index.get(key)
+        if edges is not None:
+            edges = self._label_index.setdefault(key, edges)
+            edges.discard(edge)
+            if not edges:
+                del self._label_index[key]
 
-        if filename:
-            plt.savefig(filename, dpi=150, bbox_inches='tight')
+    def _on_edge_changed(self, edge, attribute, old_value):
+        """Called by Edge when its label, R or B flag changes."""
+        if self._shared and self._edges_by_id.shared_value(edge.id) is edge:
+            # A snapshot still sees edge: leave it a frozen copy with the old value
+            frozen = edge._copy()
+            setattr(frozen, "_" + attribute, old_value)
+            self._edges_by_id.replace_shared(edge.id, frozen)
+            self._edges_by_id[edge.id] = edge
+        position = None
+        if attribute in ("label", "R"):
+            item = self._indexed(edge)
+            old_key = self._label_key(edge, **{attribute: old_value})
+            if self._journaling():
+                position = self._label_index[old_key].position(item)
+            self._remove_from_label_index(item, old_key)
+            self._label_index.setdefault(self._label_key(edge), OrderedStore()).add(item)
+        self._record(self._undo_change_edge, edge, attribute, old_value, position)
+        self._notify("change_edge", edge, attribute, old_value)
+
+    def _journaling(self):
+        return bool(self._transactions) and not self._undoing
+
+    def _record(self, undo, *args):
+        if self._transactions and not self._undoing:
+            self._journal.append((undo, args))
+
+    def _undo_add_node(self, node):
+        self.nodes.pop()
+        self._grid.discard(node)
+        if self._storage is not None:
+            self._storage.pop_node()
+        else:
+            del self._nodes_by_id[node.id]
+        self._next_node_id -= 1
+        self._notify("remove_node", node)
+
+    def _undo_add_edge(self, edge):
+        self.edges.discard(self._indexed(edge))
+        self._unindex_edge(edge)
+        if self._storage is not None:
+            self._storage.pop_edge()
+        self._next_edge_id -= 1
+        self._notify("remove_edge", edge)
+
+    def _undo_remove_edge(self, edge, positions):
+        self.edges.restore(self._indexed(edge), positions["edges"])
+        self._index_edge(edge, positions)
+        self._notify("add_edge", edge)
+
+    def _undo_change_edge(self, edge, attribute, old_value, position):
+        new_value = getattr(edge, attribute)
+        # Write the backing field, the label index is moved back below
+        setattr(edge, "_" + attribute, old_value)
+        if position is not None:
+            item = self._indexed(edge)
+            self._remove_from_label_index(item, self._label_key(edge, **{attribute: new_value}))
+            self._label_index.setdefault(self._label_key(edge), OrderedStore()).restore(item, position)
+        self._notify("change_edge", edge, attribute, new_value)
+
+    def _undo_refit(self, grid, layout):
+        grid.restore_layout(layout)
+
+    def _undo_register_midpoint(self, key, old_midpoint):
+        if old_midpoint is None:
+            self._midpoints.pop(key, None)
         else:
-            plt.show()
+            self._midpoints[key] = old_midpoint
+
+    def print(self):
+        print("Nodes:")
+        for node in self.nodes:
+            print(f"  {node}")
+        print("Edges:")
+        for edge in self._edge_states():
+            print(f"  {edge}")
+
+    def visualize(self, filename=None, style="full", detail=None, renderer=None):
+        """Draw the graph, see hypergraph.renderers.
+
+        The renderers are only imported on the first call, and matplotlib
+        only by the matplotlib one, so importing the graph does not pay for
+        them.
+
+        Args:
+            filename: File to write the drawing to, or None to show it
+                      (matplotlib renderer only)
+            style: "full" for every element with markers and labels, or
+                   "mesh" for only the hyperedge outlines coloured by R
+            detail: renderers.LevelOfDetail setting the element counts
+                    above which details are left out, or None for the default
+            renderer: Renderer instance or name ("matplotlib", "svg" or
+                      "null"), or None for $HYPERGRAPH_RENDERER, "matplotlib"
+                      by default
 
-        plt.close()
\ No newline at end of file
+        Raises:
+            ValueError: If style or renderer is unknown
+        """
+        from hypergraph.renderers import get_renderer
+        get_renderer(renderer).render(self, filename, style, detail)
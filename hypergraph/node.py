@@ -1,5 +1,8 @@
 class Node:
+    __slots__ = ("id", "x", "y", "z", "label")
+
     def __init__(self, x, y, z=0, label="V"):
+        self.id = None  # Set by HyperGraph.add_node
         self.x = x
         self.y = y
         self.z = z
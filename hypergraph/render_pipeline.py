@@ -0,0 +1,84 @@
+"""Rendering of graph frames in worker processes, alongside the refinement.
+
+RenderPipeline.submit() takes a Frame of the graph (see hypergraph.frame),
+which only costs gathering a few arrays, and hands it to a pool of worker
+processes that draw it while the caller goes on changing the graph. At
+most queue_size frames are pending at a time: submit() waits for the
+oldest one to be written before taking a new one, which bounds memory.
+Frames are collected in the order they were submitted, so errors are
+raised in that order too.
+"""
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+from hypergraph.frame import Frame
+from hypergraph.renderers import get_renderer
+
+
+def _render(renderer, frame, filename, style, detail):
+    renderer.draw(frame, filename, style, detail)
+    return filename
+
+
+class RenderPipeline:
+    """Draws snapshots of a graph to image files in a process pool.
+
+    Example:
+        with RenderPipeline() as pipeline:
+            for i, step in enumerate(steps):
+                step(graph)
+                pipeline.submit(graph, f"{i:02d}.png")
+    """
+
+    def __init__(self, workers=None, queue_size=8, style="full", detail=None, renderer=None):
+        """Start the worker processes.
+
+        Args:
+            workers: Number of worker processes, or None for one per CPU
+            queue_size: Maximum number of frames taken but not yet written
+            style, detail: Passed to the renderer for every frame
+            renderer: Renderer instance or name, see renderers.get_renderer()
+        """
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.queue_size = queue_size
+        self.style = style
+        self.detail = detail
+        self.renderer = get_renderer(renderer)
+        self.rendered = []  # Files written, in order of submission
+        self._executor = ProcessPoolExecutor(workers, initializer=self.renderer.init_worker)
+        self._pending = collections.deque()
+
+    def submit(self, graph, filename):
+        """Take a frame of graph as it is now and queue it to be drawn to filename.
+
+        Blocks while queue_size frames are pending.
+        """
+        self.submit_frame(Frame.from_graph(graph), filename)
+
+    def submit_frame(self, frame, filename):
+        """Queue frame to be drawn to filename, blocking while queue_size frames are pending."""
+        while len(self._pending) >= self.queue_size:
+            self._collect()
+        self._pending.append(self._executor.submit(_render, self.renderer, frame, filename, self.style, self.detail))
+
+    def wait(self):
+        """Block until every submitted frame is written."""
+        while self._pending:
+            self._collect()
+
+    def close(self):
+        """Wait for the pending frames and stop the workers."""
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+
+    def _collect(self):
+        self.rendered.append(self._pending.popleft().result())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
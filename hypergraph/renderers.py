@@ -0,0 +1,345 @@
+"""Renderers drawing a HyperGraph, chosen with HyperGraph.visualize(renderer=...).
+
+A Renderer draws a Frame (see hypergraph.frame) to a file. Three are
+provided, registered by name in RENDERERS:
+
+    "matplotlib"  MatplotlibRenderer, the figure of hypergraph.visualization,
+                  to any image format matplotlib writes or to a window
+    "svg"         SvgRenderer, writes SVG elements straight to the file,
+                  without matplotlib or any other dependency
+    "null"        NullRenderer, draws nothing, for tests and benchmarks
+
+The renderer used when none is given is named by the HYPERGRAPH_RENDERER
+environment variable, "matplotlib" if it is not set, so a whole test or
+loop run can skip drawing with HYPERGRAPH_RENDERER=null. This module does
+not import matplotlib.
+"""
+import os
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from hypergraph.frame import Frame
+
+
+STYLES = ("full", "mesh")
+
+
+class LevelOfDetail:
+    """Element counts above which renderers leave details out.
+
+    Details go in a fixed order as the frame grows: first the labels, then
+    the markers at edge and hyperedge centroids (nodes shrink to dots), then
+    the spokes joining hyperedges to their nodes. Counts are of nodes, edges
+    and hyperedges together; a threshold of None never drops its detail.
+    """
+
+    # Name of each level, by the number of details dropped
+    LEVELS = ("full", "no labels", "no markers", "no spokes")
+
+    def __init__(self, labels=2000, markers=10000, spokes=40000):
+        """Initialize the policy.
+
+        Args:
+            labels: Element count above which labels are not drawn
+            markers: Element count above which centroid markers are not drawn
+            spokes: Element count above which hyperedge spokes are not drawn
+        """
+        self.labels = labels
+        self.markers = markers
+        self.spokes = spokes
+
+    def level(self, count):
+        """Return the number of details dropped for a frame of count elements, 0 to 3."""
+        level = 0
+        for threshold in (self.labels, self.markers, self.spokes):
+            if threshold is None or count <= threshold:
+                break
+            level += 1
+        return level
+
+
+def check_style(style):
+    """Raise ValueError if style is not one of STYLES."""
+    if style not in STYLES:
+        raise ValueError(f"Unknown style: {style!r}")
+
+
+class Renderer:
+    """Base class of the renderers.
+
+    Subclasses implement draw(); render() takes the frame of a graph and
+    passes it on. Renderers keep no state between calls and can be pickled,
+    so one can be handed to a RenderPipeline.
+    """
+
+    name = None
+
+    def init_worker(self):
+        """Prepare a worker process of a RenderPipeline to draw with this renderer."""
+
+    def render(self, graph, filename=None, style="full", detail=None):
+        """Draw graph as it is now, see draw()."""
+        self.draw(Frame.from_graph(graph), filename, style, detail)
+
+    def draw(self, frame, filename=None, style="full", detail=None):
+        """Draw a Frame.
+
+        The "full" style draws edges, hyperedges with spokes to their nodes,
+        nodes, markers and labels, leaving out details on large frames as set
+        by detail. The "mesh" style only draws the outline of each hyperedge,
+        red if it is marked (R=1) and black otherwise.
+
+        Args:
+            frame: Frame to draw
+            filename: File to write the drawing to
+            style: "full" or "mesh"
+            detail: LevelOfDetail to use, or None for the default one
+
+        Raises:
+            ValueError: If style is unknown
+        """
+        raise NotImplementedError
+
+
+class MatplotlibRenderer(Renderer):
+    """Draws with matplotlib, see hypergraph.visualization.
+
+    Without a filename the figure is shown in a window.
+    """
+
+    name = "matplotlib"
+
+    def init_worker(self):
+        # Workers only ever write files
+        import matplotlib
+        matplotlib.use("Agg")
+
+    def draw(self, frame, filename=None, style="full", detail=None):
+        from hypergraph.visualization import draw
+        draw(frame, filename, style, detail)
+
+
+class NullRenderer(Renderer):
+    """Draws nothing and does not take a frame; only the style is checked."""
+
+    name = "null"
+
+    def render(self, graph, filename=None, style="full", detail=None):
+        check_style(style)
+
+    def draw(self, frame, filename=None, style="full", detail=None):
+        check_style(style)
+
+
+class SvgRenderer(Renderer):
+    """Writes an SVG file, element by element, without rasterizing.
+
+    Elements of one kind and colour share a group, so each one only costs
+    its coordinates: edges and spokes are joined into one path per colour,
+    markers, nodes and labels are one short element each. The picture
+    follows the matplotlib one, with graph coordinates scaled to width
+    pixels and the same 30% margin.
+    """
+
+    name = "svg"
+
+    # Number of elements formatted before each write
+    CHUNK = 4096
+
+    STYLESHEET = (
+        "text{font-family:sans-serif;font-weight:bold;text-anchor:middle;dominant-baseline:central}"
+        ".edge-marker{fill:white;stroke:black;stroke-width:1.5}"
+        ".hyperedge-marker{fill:yellow;stroke:black;stroke-width:2}"
+        ".hyperedge-marker.R{fill:red}"
+        ".node{fill:lightblue;stroke:black;stroke-width:2}"
+        ".dot{fill:black}"
+        ".element{fill:none;stroke:black;stroke-width:1}"
+        ".element.R{stroke:red}"
+    )
+
+    def __init__(self, width=1600):
+        """Initialize the renderer.
+
+        Args:
+            width: Width of the picture in pixels; the height follows the graph
+        """
+        self.width = width
+
+    def draw(self, frame, filename=None, style="full", detail=None):
+        """Write frame as SVG to filename, see Renderer.draw().
+
+        Args:
+            filename: Path or open text file to write to
+
+        Raises:
+            ValueError: If style is unknown or filename is not given
+        """
+        check_style(style)
+        if filename is None:
+            raise ValueError("SvgRenderer needs a file to write to")
+        if hasattr(filename, "write"):
+            self._write(frame, filename, style, detail)
+        else:
+            with open(filename, "w", encoding="utf-8") as file:
+                self._write(frame, file, style, detail)
+
+    def _write(self, frame, file, style, detail):
+        to_pixels, height = self._viewport(frame)
+        file.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{height}" '
+            f'viewBox="0 0 {self.width} {height}">\n'
+            f'<style>{self.STYLESHEET}</style>\n'
+            f'<rect width="100%" height="100%" fill="white"/>\n'
+            f'<text x="{self.width / 2:.0f}" y="20" font-size="16">HyperGraph Visualization</text>\n'
+        )
+        if style == "mesh":
+            self._write_mesh(file, frame, to_pixels)
+        else:
+            level = (detail or LevelOfDetail()).level(frame.element_count())
+            self._write_full(file, frame, to_pixels, level)
+        file.write("</svg>\n")
+
+    def _viewport(self, frame):
+        """Return a function mapping (..., 2) graph coordinates to pixels, and the height in pixels."""
+        bounds = frame.bounds() or (0.0, 0.0, 0.0, 0.0)
+        min_x, min_y, max_x, max_y = bounds
+        margin_x = (max_x - min_x) * 0.3 or 1
+        margin_y = (max_y - min_y) * 0.3 or 1
+        min_x, max_x = min_x - margin_x, max_x + margin_x
+        min_y, max_y = min_y - margin_y, max_y + margin_y
+        scale = self.width / (max_x - min_x)
+        height = max(1, round((max_y - min_y) * scale))
+
+        def to_pixels(xy):
+            # SVG y grows downwards
+            pixels = np.empty_like(xy, dtype=float)
+            pixels[..., 0] = (xy[..., 0] - min_x) * scale
+            pixels[..., 1] = (max_y - xy[..., 1]) * scale
+            return pixels
+
+        return to_pixels, height
+
+    def _write_full(self, file, frame, to_pixels, level):
+        """Write every element of frame, leaving out the details of the given LevelOfDetail level."""
+        labels, markers, spokes = level < 1, level < 2, level < 3
+
+        # Edges: red for marked, black for the rest, thicker on the border
+        edges = to_pixels(frame.edge_segments)
+        for R in (0, 1):
+            for B in (False, True):
+                rows = (frame.edge_R.astype(bool) == bool(R)) & (frame.edge_B == B)
+                self._write_segments(file, edges[rows], 'red' if R else 'black', 4 if B else 2)
+
+        # Hyperedges: spokes to their nodes, bright red for marked (R=1)
+        if spokes:
+            segments = to_pixels(frame.spoke_segments)
+            marked = frame.spoke_R.astype(bool)
+            file.write('<g opacity="0.6">\n')
+            self._write_segments(file, segments[~marked], 'black', 2)
+            self._write_segments(file, segments[marked], 'red', 2)
+            file.write('</g>\n')
+
+        nodes = to_pixels(frame.node_xy)
+        if markers:
+            self._write_each(file, nodes, '<circle class="node" cx="%.1f" cy="%.1f" r="12"/>')
+        else:
+            self._write_each(file, nodes, '<circle class="dot" cx="%.1f" cy="%.1f" r="1"/>')
+        if labels:
+            self._write_labels(file, nodes, frame.node_labels, None, 10)
+
+        edge_centroids = to_pixels(frame.edge_centroids)
+        hyperedge_centroids = to_pixels(frame.hyperedge_centroids)
+        if markers:
+            self._write_each(file, edge_centroids - 13,
+                             '<rect class="edge-marker" x="%.1f" y="%.1f" width="26" height="26"/>')
+            marked = frame.hyperedge_R.astype(bool)
+            self._write_each(file, hyperedge_centroids[~marked] - 13,
+                             '<rect class="hyperedge-marker" x="%.1f" y="%.1f" width="26" height="26"/>')
+            self._write_each(file, hyperedge_centroids[marked] - 13,
+                             '<rect class="hyperedge-marker R" x="%.1f" y="%.1f" width="26" height="26"/>')
+        if labels:
+            self._write_labels(file, edge_centroids, frame.edge_labels, frame.edge_R, 12)
+            self._write_labels(file, hyperedge_centroids, frame.hyperedge_labels, frame.hyperedge_R, 12)
+
+    def _write_mesh(self, file, frame, to_pixels):
+        """Write the outline of each hyperedge, marked ones last so they are not drawn over."""
+        corners = to_pixels(frame.spoke_segments[:, 1]).reshape(-1, 2)
+        counts = np.diff(frame.hyperedge_offsets)
+        marked = frame.hyperedge_R.astype(bool)
+        # Polygons with as many corners are written from one template
+        for R in (False, True):
+            for count in np.unique(counts[marked == R]).tolist():
+                rows = np.flatnonzero((marked == R) & (counts == count))
+                points = corners[frame.hyperedge_offsets[rows][:, None] + np.arange(count)]
+                template = '<polygon class="%s" points="%s"/>\n' % (
+                    "element R" if R else "element", " ".join(["%.1f,%.1f"] * count))
+                for chunk in self._format(template, points.reshape(len(rows), -1)):
+                    file.write(chunk)
+
+    def _write_segments(self, file, segments, colour, width):
+        """Write (k, 2, 2) pixel segments as one path."""
+        if not len(segments):
+            return
+        file.write(f'<path fill="none" stroke="{colour}" stroke-width="{width}" d="')
+        for chunk in self._format("M%.1f %.1fL%.1f %.1f", segments.reshape(-1, 4)):
+            file.write(chunk)
+        file.write('"/>\n')
+
+    def _write_each(self, file, points, template):
+        """Write template filled in with the x and y of each of the (k, 2) pixel points."""
+        for chunk in self._format(template + "\n", points):
+            file.write(chunk)
+
+    def _format(self, template, rows):
+        """Yield template filled in with each row of the (k, n) array rows, CHUNK rows at a time."""
+        width = rows.shape[1]
+        values = rows.ravel().tolist()
+        step = width * self.CHUNK
+        whole = template * self.CHUNK
+        for start in range(0, len(values), step):
+            part = values[start:start + step]
+            yield (whole if len(part) == step else template * (len(part) // width)) % tuple(part)
+
+    def _write_labels(self, file, points, labels, R, fontsize):
+        """Write each label centred at its pixel point, adding R=... for marked elements if R is given."""
+        groups = {}
+        for i, label in enumerate(labels):
+            groups.setdefault((label, R[i] if R is not None and R[i] else 0), []).append(i)
+        file.write(f'<g font-size="{fontsize}">\n')
+        for (label, marked), rows in groups.items():
+            text = escape(str(label)).replace("%", "%%")
+            if marked:
+                # Two lines 1.2 font sizes apart, as in the matplotlib picture
+                shift = 0.6 * fontsize
+                template = (f'<text x="%.1f" y="%.1f">{text}</text>'
+                            f'<text x="%.1f" y="%.1f">R={marked}</text>\n')
+                pixels = points[rows]
+                rows = np.column_stack((pixels[:, 0], pixels[:, 1] - shift, pixels[:, 0], pixels[:, 1] + shift))
+            else:
+                template = f'<text x="%.1f" y="%.1f">{text}</text>\n'
+                rows = points[rows]
+            for chunk in self._format(template, rows):
+                file.write(chunk)
+        file.write('</g>\n')
+
+
+RENDERERS = {renderer.name: renderer for renderer in (MatplotlibRenderer, SvgRenderer, NullRenderer)}
+
+
+def get_renderer(renderer=None):
+    """Return the Renderer for renderer.
+
+    Args:
+        renderer: Renderer instance, name of one in RENDERERS, or None for
+                  the one named by $HYPERGRAPH_RENDERER, "matplotlib" by default
+
+    Raises:
+        ValueError: If no renderer has that name
+    """
+    if isinstance(renderer, Renderer):
+        return renderer
+    name = renderer or os.environ.get("HYPERGRAPH_RENDERER") or "matplotlib"
+    if name not in RENDERERS:
+        raise ValueError(f"Unknown renderer: {name!r}, expected one of {', '.join(RENDERERS)}")
+    return RENDERERS[name]()
@@ -0,0 +1,337 @@
+import copy
+import heapq
+import itertools
+import math
+
+from hypergraph.cow import CowDict
+
+
+class SpatialGrid:
+    """Uniform hash grid over the positions of nodes, or of anything with x and y.
+
+    Items are bucketed by the cell (floor(x / cell_size), floor(y / cell_size))
+    they lie in, so a query only visits the cells overlapping its search area
+    and a point lookup costs O(1) expected. The cell size follows the extent
+    of the items: when they get crowded (at most once per doubling of the
+    item count) or their bounding box spans many more cells than there are
+    items, it is refitted to about PER_CELL items per cell over the bounding
+    box and the grid rebuilt.
+
+    Items are assumed not to move once added. branch() returns a copy
+    sharing the cells with this grid; each side then copies only the cells
+    it changes (see hypergraph.cow).
+    """
+
+    # Average number of items per occupied cell above which the cells are refitted
+    MAX_PER_CELL = 4
+    # Items per cell over the bounding box aimed at when refitting
+    PER_CELL = 2
+    # Cells of the bounding box per item above which the cells are refitted
+    MAX_CELLS_PER_ITEM = 8
+    MIN_CELL_SIZE = 1e-9
+
+    def __init__(self, cell_size=1.0):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._count = 0
+        self._rebuilt_at = 0
+        self._bounds = None  # (i_min, j_min, i_max, j_max) of the occupied cells
+        self._extent = None  # (x_min, y_min, x_max, y_max) of the items
+
+    def __len__(self):
+        return self._count
+
+    def add(self, item):
+        """Add item, refitting the cells if needed.
+
+        Returns:
+            The layout of the grid before item was added if the cells were
+            refitted, to be given back to restore_layout(), else None
+        """
+        # The layout is only built when the cells are refitted
+        bounds, extent = self._bounds, self._extent
+        x, y = item.x, item.y
+        key = math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+        self._cells.setdefault(key, []).append(item)
+        self._grow_bounds(x, y)
+        self._count += 1
+        count = self._count
+        crowded = (count > self.MAX_PER_CELL * len(self._cells)
+                   and count >= 2 * max(self._rebuilt_at, self.MAX_PER_CELL))
+        if crowded or self._box_cells() > self.MAX_CELLS_PER_ITEM * count:
+            cell_size = self._fitted_cell_size()
+            if not 0.5 < cell_size / self.cell_size < 2:
+                layout = (self.cell_size, self._cells, count - 1, self._rebuilt_at, bounds, extent)
+                self._rebuild(cell_size)
+                # The old cells are left alone by the rebuild; take item out again
+                cells = layout[1]
+                bucket = cells.setdefault(key, cells[key])
+                bucket.pop()
+                if not bucket:
+                    del cells[key]
+                return layout
+        return None
+
+    def branch(self):
+        """Return a copy of the grid sharing its cells with this one."""
+        if not isinstance(self._cells, CowDict):
+            self._cells = CowDict.wrap(self._cells, copy=list)
+        other = copy.copy(self)
+        other._cells = self._cells.branch()
+        return other
+
+    def extend(self, items, xs=None, ys=None):
+        """Add many items, choosing the cell size once for all of them.
+
+        Args:
+            items: Items to add
+            xs, ys: Coordinates of the items if already known, else read
+                    from their x and y
+
+        Returns:
+            The layout of the grid before the items were added if the cells
+            were refitted, to be given back to restore_layout(), else None
+        """
+        items = list(items)
+        if not items:
+            return None
+        layout = self._layout()
+        self._count += len(items)
+        if xs is None:
+            xs = [item.x for item in items]
+            ys = [item.y for item in items]
+
+        # Fit the cells to the bounding box of all the items, then insert
+        # everything once
+        x_min, x_max, y_min, y_max = min(xs), max(xs), min(ys), max(ys)
+        if self._extent is not None:
+            old_x_min, old_y_min, old_x_max, old_y_max = self._extent
+            x_min, y_min = min(x_min, old_x_min), min(y_min, old_y_min)
+            x_max, y_max = max(x_max, old_x_max), max(y_max, old_y_max)
+        self._extent = (x_min, y_min, x_max, y_max)
+        cell_size = self._fitted_cell_size()
+
+        if not 0.5 < cell_size / self.cell_size < 2:
+            old = [item for bucket in self._cells.values() for item in bucket]
+            items = old + items
+            xs = [item.x for item in old] + list(xs)
+            ys = [item.y for item in old] + list(ys)
+            self.cell_size = cell_size
+            self._cells = {}
+            self._bounds = None
+            self._rebuilt_at = self._count
+            self._insert_all(items, xs, ys)
+            return layout
+        self._insert_all(items, xs, ys)
+        return None
+
+    def restore_layout(self, layout):
+        """Put back the cells as they were before a refitting add() or extend().
+
+        Items added since are dropped, so this undoes the call that returned
+        layout when the changes made after it have been undone first.
+        """
+        self.cell_size, self._cells, self._count, self._rebuilt_at, self._bounds, self._extent = layout
+
+    def discard(self, item):
+        """Remove item if present. Returns True if it was removed."""
+        cell = self._cell(item.x, item.y)
+        bucket = self._cells.get(cell)
+        if not bucket or item not in bucket:
+            return False
+        # setdefault() gives a copy safe to modify when the cells are shared
+        bucket = self._cells.setdefault(cell, bucket)
+        bucket.remove(item)
+        if not bucket:
+            del self._cells[cell]
+        self._count -= 1
+        return True
+
+    def position(self, item):
+        """Return the place of item in its cell, to be given back to restore()."""
+        return self._cells[self._cell(item.x, item.y)].index(item)
+
+    def restore(self, item, position):
+        """Put item back at the place it had in its cell when position() was taken."""
+        self._cells.setdefault(self._cell(item.x, item.y), []).insert(position, item)
+        self._count += 1
+        self._grow_bounds(item.x, item.y)
+
+    def within(self, x, y, tolerance):
+        """Return the items at distance at most tolerance from (x, y), nearest first."""
+        found = []
+        for item in self._items_in_cells(x - tolerance, y - tolerance, x + tolerance, y + tolerance):
+            dist = math.hypot(item.x - x, item.y - y)
+            if dist <= tolerance:
+                found.append((dist, len(found), item))
+        found.sort()
+        return [item for _, _, item in found]
+
+    def nearest(self, x, y, k=1):
+        """Return the k items closest to (x, y), nearest first."""
+        if k <= 0:
+            return []
+        return list(itertools.islice(self.iter_nearest(x, y), k))
+
+    def iter_nearest(self, x, y):
+        """Yield the items in order of distance from (x, y).
+
+        Rings of cells around (x, y) are visited outwards, from the first one
+        reaching the occupied cells to the last one covering them, and only
+        their occupied part is looked at. An item is yielded as soon as no
+        item of a later ring can be nearer, so taking the first few items only
+        visits the cells around (x, y), or those on the near side of the
+        items when (x, y) is outside them. The grid must not be changed while
+        iterating.
+        """
+        if not self._cells:
+            return
+
+        size = self.cell_size
+        ci, cj = self._cell(x, y)
+        i_min, j_min, i_max, j_max = self._bounds
+        first_ring = max(i_min - ci, ci - i_max, j_min - cj, cj - j_max, 0)
+        last_ring = max(abs(ci - i_min), abs(ci - i_max), abs(cj - j_min), abs(cj - j_max))
+        # No item is nearer than the bounding box of the items
+        x_min, y_min, x_max, y_max = self._extent
+        box_distance = math.hypot(max(x_min - x, 0, x - x_max), max(y_min - y, 0, y - y_max))
+
+        # Items outside ring r are at least r * size + edge away
+        edge = min(x - ci * size, (ci + 1) * size - x, y - cj * size, (cj + 1) * size - y)
+
+        cells, push, hypot = self._cells, heapq.heappush, math.hypot
+        heap = []
+        order = 0  # Ties are yielded in the order they were found
+        for ring in range(first_ring, last_ring + 1):
+            for cell in self._ring_cells(ci, cj, ring, self._bounds):
+                for item in cells.get(cell, ()):
+                    push(heap, (hypot(item.x - x, item.y - y), order, item))
+                    order += 1
+            limit = max(box_distance, ring * size + edge)
+            while heap and heap[0][0] <= limit:
+                yield heapq.heappop(heap)[2]
+
+        while heap:
+            yield heapq.heappop(heap)[2]
+
+    def in_box(self, x_min, y_min, x_max, y_max):
+        """Return the items with x_min <= x <= x_max and y_min <= y <= y_max."""
+        return [
+            item for item in self._items_in_cells(x_min, y_min, x_max, y_max)
+            if x_min <= item.x <= x_max and y_min <= item.y <= y_max
+        ]
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _insert(self, item):
+        self._cells.setdefault(self._cell(item.x, item.y), []).append(item)
+        self._grow_bounds(item.x, item.y)
+
+    def _grow_bounds(self, x, y):
+        """Extend the occupied cell bounds and the extent to cover (x, y)."""
+        extent = self._extent
+        if extent is not None and extent[0] <= x <= extent[2] and extent[1] <= y <= extent[3]:
+            # The cells of the extent are within the bounds
+            return
+        i, j = self._cell(x, y)
+        if self._bounds is None:
+            self._bounds = (i, j, i, j)
+            self._extent = (x, y, x, y)
+            return
+        i_min, j_min, i_max, j_max = self._bounds
+        self._bounds = (min(i, i_min), min(j, j_min), max(i, i_max), max(j, j_max))
+        x_min, y_min, x_max, y_max = self._extent
+        self._extent = (min(x, x_min), min(y, y_min), max(x, x_max), max(y, y_max))
+
+    def _layout(self):
+        """Return the state replaced when the cells are refitted.
+
+        A refit fills a new dict of cells, so the current one can be kept as it is.
+        """
+        return self.cell_size, self._cells, self._count, self._rebuilt_at, self._bounds, self._extent
+
+    def _box_cells(self):
+        """Return the number of cells of the bounding box of the occupied cells."""
+        i_min, j_min, i_max, j_max = self._bounds
+        return (i_max - i_min + 1) * (j_max - j_min + 1)
+
+    def _fitted_cell_size(self):
+        """Return the cell size putting about PER_CELL items in each cell of the extent.
+
+        Along a line of items (a flat extent) the cells are sized from its
+        length instead. Coincident items keep the current size.
+        """
+        x_min, y_min, x_max, y_max = self._extent
+        width, height = x_max - x_min, y_max - y_min
+        cells = max(1.0, self._count / self.PER_CELL)
+        cell_size = max(math.sqrt(width * height / cells), max(width, height) / cells)
+        if cell_size == 0:
+            return self.cell_size
+        return max(cell_size, self.MIN_CELL_SIZE)
+
+    def _insert_all(self, items, xs, ys):
+        """Insert many items at the given coordinates, updating the bounds once."""
+        size = self.cell_size
+        floor = math.floor
+        keys = [(floor(x / size), floor(y / size)) for x, y in zip(xs, ys)]
+        cells = self._cells
+        for key, item in zip(keys, items):
+            cells.setdefault(key, []).append(item)
+        i_values = [i for i, _ in keys]
+        j_values = [j for _, j in keys]
+        i_min, j_min, i_max, j_max = min(i_values), min(j_values), max(i_values), max(j_values)
+        if self._bounds is not None:
+            b_i_min, b_j_min, b_i_max, b_j_max = self._bounds
+            i_min, j_min, i_max, j_max = min(i_min, b_i_min), min(j_min, b_j_min), max(i_max, b_i_max), max(j_max, b_j_max)
+        self._bounds = (i_min, j_min, i_max, j_max)
+
+    def _rebuild(self, cell_size):
+        items = [item for bucket in self._cells.values() for item in bucket]
+        self.cell_size = cell_size
+        self._cells = {}
+        self._bounds = None
+        self._extent = None
+        for item in items:
+            self._insert(item)
+        self._rebuilt_at = self._count
+
+    def _items_in_cells(self, x_min, y_min, x_max, y_max):
+        if not self._cells:
+            return
+        i_min, j_min = self._cell(x_min, y_min)
+        i_max, j_max = self._cell(x_max, y_max)
+        b_i_min, b_j_min, b_i_max, b_j_max = self._bounds
+        i_min, j_min = max(i_min, b_i_min), max(j_min, b_j_min)
+        i_max, j_max = min(i_max, b_i_max), min(j_max, b_j_max)
+        if i_min > i_max or j_min > j_max:
+            return
+
+        if (i_max - i_min + 1) * (j_max - j_min + 1) > len(self._cells):
+            # Large area: cheaper to go through the occupied cells
+            for (i, j), bucket in self._cells.items():
+                if i_min <= i <= i_max and j_min <= j <= j_max:
+                    yield from bucket
+        else:
+            for i in range(i_min, i_max + 1):
+                for j in range(j_min, j_max + 1):
+                    yield from self._cells.get((i, j), ())
+
+    @staticmethod
+    def _ring_cells(ci, cj, ring, bounds):
+        """Yield the cells at Chebyshev distance ring from (ci, cj) within bounds."""
+        i_min, j_min, i_max, j_max = bounds
+        if ring == 0:
+            if i_min <= ci <= i_max and j_min <= cj <= j_max:
+                yield ci, cj
+            return
+        lo, hi = max(ci - ring, i_min), min(ci + ring, i_max)
+        for j in (cj - ring, cj + ring):
+            if j_min <= j <= j_max:
+                for i in range(lo, hi + 1):
+                    yield i, j
+        lo, hi = max(cj - ring + 1, j_min), min(cj + ring - 1, j_max)
+        for i in (ci - ring, ci + ring):
+            if i_min <= i <= i_max:
+                for j in range(lo, hi + 1):
+                    yield i, j
@@ -0,0 +1,96 @@
+from operator import itemgetter
+
+from hypergraph.cow import CowDict
+
+
+class OrderedStore:
+    """Insertion-ordered collection of graph elements.
+
+    Backed by a dict mapping each element to its insertion number, so
+    membership, add and removal are O(1) while iteration keeps the order in
+    which elements were added. It supports the read-only list operations the
+    productions use on ``graph.edges`` (iteration, ``len``, ``in``).
+
+    An element taken out and put back with restore() regains its old place;
+    the order is fixed lazily, on the next iteration.
+
+    branch() returns a copy sharing the content with this store; each side
+    then copies only what it changes (see hypergraph.cow).
+    """
+
+    def __init__(self, items=()):
+        self._items = {}
+        self._next = 0
+        self._sorted = True
+        self._view = None
+        self._key = None
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        self._items.pop(item, None)
+        self._items[item] = self._next
+        self._next += 1
+
+    def extend(self, items):
+        """Add many items, none of which may be in the store yet."""
+        items = list(items)
+        self._items.update(zip(items, range(self._next, self._next + len(items))))
+        self._next += len(items)
+
+    def discard(self, item):
+        """Remove item if present. Returns True if it was removed."""
+        return self._items.pop(item, None) is not None
+
+    def position(self, item):
+        """Return the insertion number of item, to be given back to restore()."""
+        return self._items[item]
+
+    def restore(self, item, position):
+        """Put item back at the place it had when position() was taken."""
+        self._items[item] = position
+        self._next = max(self._next, position + 1)
+        if len(self._items) > 1:
+            self._sorted = False
+
+    def branch(self, view=None, key=None):
+        """Return a copy of the store sharing its content with this one.
+
+        Args:
+            view: Function applied to each element when iterating the copy,
+                  or None
+            key: Function giving the stored element an element looked up
+                 with ``in`` stands for, or None
+        """
+        if not isinstance(self._items, CowDict):
+            self._items = CowDict.wrap(self._items)
+        other = OrderedStore()
+        other._items = self._items.branch()
+        other._next, other._sorted, other._view, other._key = self._next, self._sorted, view, key
+        return other
+
+    def stored(self):
+        """Iterate over the elements as stored, without applying the view."""
+        if not self._sorted:
+            self._items = dict(sorted(self._items.items(), key=itemgetter(1)))
+            self._sorted = True
+        return iter(self._items)
+
+    def __contains__(self, item):
+        if self._key is not None:
+            item = self._key(item)
+        return item in self._items
+
+    def __iter__(self):
+        if self._view is None:
+            return self.stored()
+        return map(self._view, self.stored())
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __repr__(self):
+        return f"OrderedStore({list(self)!r})"
@@ -0,0 +1,173 @@
+"""Drawing of a HyperGraph with matplotlib, behind HyperGraph.visualize().
+
+Kept out of hypergraph.hypergraph so that importing the graph does not
+import matplotlib; this module is only imported when a graph is drawn.
+
+The graph is first gathered into a Frame (see hypergraph.frame), then each
+kind of element is drawn as one collection: a LineCollection for the edges
+and one for the hyperedge spokes, one scatter for the edge markers, one for
+the hyperedge markers and one for the nodes. Labels are drawn as one
+scatter per distinct label, whose marker is the outline of its text, so a
+frame costs a handful of artists whatever the size of the mesh. On large
+meshes details are left out as set by a LevelOfDetail. This is the
+"matplotlib" renderer of hypergraph.renderers.
+"""
+from functools import lru_cache
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.patches import Patch
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+
+from hypergraph.frame import Frame
+from hypergraph.renderers import LevelOfDetail, check_style
+
+
+def visualize(graph, filename=None, style="full", detail=None):
+    """Draw graph, see draw().
+
+    Args:
+        graph: HyperGraph instance
+        filename: Image file to save the figure to, or None to show it
+        style: "full" or "mesh", see draw()
+        detail: LevelOfDetail to use, or None for the default one
+    """
+    draw(Frame.from_graph(graph), filename, style, detail)
+
+
+def draw(frame, filename=None, style="full", detail=None):
+    """Draw a Frame.
+
+    The "full" style draws edges, hyperedges with spokes to their nodes,
+    nodes, markers and labels, leaving out details on large frames as set
+    by detail. The "mesh" style only draws the outline of each hyperedge,
+    red if it is marked (R=1) and black otherwise.
+
+    Args:
+        frame: Frame to draw
+        filename: Image file to save the figure to, or None to show it
+        style: "full" or "mesh"
+        detail: LevelOfDetail to use, or None for the default one
+
+    Raises:
+        ValueError: If style is unknown
+    """
+    check_style(style)
+    fig, ax = plt.subplots(figsize=(16, 16))
+
+    if style == "mesh":
+        # Marked elements last, so their outlines are not drawn over
+        polygons = frame.polygons()
+        order = np.argsort(frame.hyperedge_R, kind='stable')
+        ax.add_collection(PolyCollection(
+            [polygons[i] for i in order], facecolors='none',
+            edgecolors=['red' if frame.hyperedge_R[i] else 'black' for i in order], linewidths=1,
+        ))
+        legend_elements = [
+            Patch(facecolor='none', edgecolor='black', label='Element (R=0)'),
+            Patch(facecolor='none', edgecolor='red', label='Element (R=1)'),
+        ]
+    else:
+        _draw_full(ax, frame, (detail or LevelOfDetail()).level(frame.element_count()))
+        legend_elements = [
+            Patch(facecolor='black', edgecolor='black', label='Edge (R=0)'),
+            Patch(facecolor='red', edgecolor='red', label='Edge (R=1)'),
+            Patch(facecolor='lightblue', edgecolor='black', label='Node'),
+        ]
+
+    # Calculate bounds with 30% margin
+    bounds = frame.bounds()
+    if bounds:
+        min_x, min_y, max_x, max_y = bounds
+        margin_x = (max_x - min_x) * 0.3 or 1
+        margin_y = (max_y - min_y) * 0.3 or 1
+        ax.set_xlim(min_x - margin_x, max_x + margin_x)
+        ax.set_ylim(min_y - margin_y, max_y + margin_y)
+
+    ax.axis('equal')
+    ax.grid(True, alpha=0.3)
+
+    ax.legend(handles=legend_elements, loc='upper right', fontsize=10)
+    ax.set_title('HyperGraph Visualization')
+
+    if filename:
+        fig.savefig(filename, dpi=150, bbox_inches='tight')
+    else:
+        plt.show()
+
+    plt.close(fig)
+
+
+def _draw_full(ax, frame, level):
+    """Draw every element of frame, leaving out the details of the given LevelOfDetail level."""
+    labels, markers, spokes = level < 1, level < 2, level < 3
+
+    # Edges: red for marked, black for the rest, thicker on the border
+    ax.add_collection(LineCollection(
+        frame.edge_segments,
+        colors=['red' if R else 'black' for R in frame.edge_R],
+        linewidths=[4 if B else 2 for B in frame.edge_B],
+        zorder=1,
+    ))
+    if markers:
+        ax.scatter(frame.edge_centroids[:, 0], frame.edge_centroids[:, 1], s=700, c='white', marker='s',
+                   edgecolors='black', linewidths=1.5, zorder=14)
+    if labels:
+        _labels(ax, frame.edge_centroids, frame.edge_labels, frame.edge_R, fontsize=12, zorder=15)
+
+    # Hyperedges: bright red for marked (R=1), yellow for normal (R=0),
+    # with connection lines to their nodes
+    if spokes:
+        ax.add_collection(LineCollection(
+            frame.spoke_segments,
+            colors=['red' if R else 'black' for R in frame.spoke_R],
+            alpha=0.6, linewidths=2, zorder=5,
+        ))
+    if markers:
+        ax.scatter(frame.hyperedge_centroids[:, 0], frame.hyperedge_centroids[:, 1], s=700,
+                   c=['red' if R else 'yellow' for R in frame.hyperedge_R], marker='s',
+                   edgecolors='black', linewidths=2, zorder=14)
+    if labels:
+        _labels(ax, frame.hyperedge_centroids, frame.hyperedge_labels, frame.hyperedge_R, fontsize=12, zorder=15)
+
+    if markers:
+        ax.scatter(frame.node_xy[:, 0], frame.node_xy[:, 1], s=600, c='lightblue', edgecolors='black',
+                   linewidths=2, zorder=9)
+    else:
+        ax.scatter(frame.node_xy[:, 0], frame.node_xy[:, 1], s=4, c='black', linewidths=0, zorder=9)
+    if labels:
+        _labels(ax, frame.node_xy, frame.node_labels, None, fontsize=10, zorder=10)
+
+
+def _labels(ax, positions, labels, R, fontsize, zorder):
+    """Write each label centred at its position, adding R=... for marked elements if R is given."""
+    groups = {}
+    for i, label in enumerate(labels):
+        text = f"{label}\nR={R[i]}" if R is not None and R[i] else str(label)
+        groups.setdefault(text, []).append(i)
+    for text, rows in groups.items():
+        path = _text_path(text, fontsize)
+        if not len(path.vertices):
+            continue
+        # Markers are scaled to fit sqrt(s) points, which keeps the font size
+        size = (2 * np.abs(path.vertices).max()) ** 2
+        ax.scatter(positions[rows, 0], positions[rows, 1], s=size, marker=path, c='black',
+                   linewidths=0, zorder=zorder)
+
+
+@lru_cache(maxsize=None)
+def _text_path(text, fontsize):
+    """Return the outline of bold text centred on (0, 0), in points, lines 1.2 font sizes apart."""
+    lines = text.split("\n")
+    paths = []
+    for i, line in enumerate(lines):
+        path = TextPath((0, 0), line, size=fontsize, prop=FontProperties(weight='bold'))
+        extents = path.get_extents()
+        shift_y = (len(lines) - 1 - 2 * i) * 0.6 * fontsize
+        paths.append(path.transformed(Affine2D().translate(
+            -(extents.x0 + extents.x1) / 2, shift_y - (extents.y0 + extents.y1) / 2)))
+    return Path.make_compound_path(*paths)
@@ -14,5 +14,11 @@ from productions.p9.p9 import P9
 from productions.p10.p10 import P10
 from productions.p11.p11 import P11
 from productions.p12.p12 import P12
+from productions.matcher import IncrementalMatcher
+from productions.parallel import independent_matches, apply_parallel
+from productions.scheduler import Scheduler
+from productions.event_log import EventLog, replay
 
-__all__ = ['Production', 'P0', 'P1', 'P2', 'P3', 'P4', 'P5', 'P6', 'P7', 'P8', 'P9', 'P10', 'P11', 'P12']
+__all__ = ['Production', 'P0', 'P1', 'P2', 'P3', 'P4', 'P5', 'P6', 'P7', 'P8', 'P9', 'P10', 'P11', 'P12',
+           'IncrementalMatcher', 'independent_matches', 'apply_parallel', 'Scheduler',
+           'EventLog', 'replay']
@@ -0,0 +1,158 @@
+import json
+from contextlib import contextmanager
+
+from hypergraph.node import Node
+from hypergraph.edge import Edge
+
+
+class EventLog:
+    """Append-only log of the productions applied to a graph.
+
+    Every application is written as one line of JSON as soon as it is
+    done, so a log can be followed while the run goes on and survives it
+    being interrupted:
+
+        {"production": "P3", "matched": {...}, "created": {"nodes": [...], "edges": [...]}}
+
+    matched is the dictionary given to apply(), with nodes written as
+    {"n": id}, edges and hyperedges as {"e": id} and tuples as {"t": [...]};
+    created holds the ids of the nodes and edges apply() added. replay()
+    re-applies a log to a graph without matching anything.
+
+    Example:
+        with EventLog("run.jsonl") as log:
+            Scheduler(graph, productions).run(log=log)
+        replay("run.jsonl", create_initial_graph())
+    """
+
+    def __init__(self, path):
+        """Open the log for appending.
+
+        Args:
+            path: JSON-lines file, created if missing
+        """
+        self.path = path
+        self._file = open(path, "a")
+
+    def apply(self, production, graph, matched_elements):
+        """Apply production to graph and record the application.
+
+        Args:
+            production: Production to apply
+            graph: HyperGraph instance
+            matched_elements: Dictionary of matched elements from can_apply()
+
+        Returns:
+            dict: The result of production.apply()
+        """
+        matched = _encode(matched_elements)
+        with _capture(graph) as created:
+            result = production.apply(graph, matched_elements)
+        self._file.write(json.dumps({"production": production.name, "matched": matched, "created": created},
+                                    separators=(",", ":")) + "\n")
+        self._file.flush()
+        return result
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_events(path):
+    """Yield the events of a log written by EventLog, in order."""
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(path, graph, productions=None, on_apply=None):
+    """Re-apply the productions recorded in a log, without matching.
+
+    Each event's matched elements are looked up by id and given straight to
+    apply(). graph must be in the state the recorded run started from.
+
+    Args:
+        path: Log written by EventLog
+        graph: HyperGraph instance to rewrite
+        productions: Production instances to apply events with, by name;
+                     defaults to one of each production in the package
+        on_apply: Optional callback on_apply(production, matched, result),
+                  called after each application
+
+    Returns:
+        int: Number of events replayed
+
+    Raises:
+        ValueError: If an application creates other ids than recorded, ie
+                    graph did not start in the recorded state
+    """
+    if productions is None:
+        import productions as package
+        productions = [getattr(package, f"P{number}")() for number in range(13)]
+    by_name = {production.name: production for production in productions}
+
+    count = 0
+    for event in read_events(path):
+        production = by_name[event["production"]]
+        matched = _decode(event["matched"], graph)
+        with _capture(graph) as created:
+            result = production.apply(graph, matched)
+        if created != event["created"]:
+            raise ValueError(f"Replay diverged at event {count} ({production.name}): "
+                             f"created {created}, recorded {event['created']}")
+        count += 1
+        if on_apply:
+            on_apply(production, matched, result)
+    return count
+
+
+@contextmanager
+def _capture(graph):
+    """Collect the ids of the nodes and edges added to graph inside the block."""
+    created = {"nodes": [], "edges": []}
+
+    def on_change(event, element, attribute, old_value):
+        if event == "add_node":
+            created["nodes"].append(element.id)
+        elif event == "add_edge":
+            created["edges"].append(element.id)
+
+    graph.subscribe(on_change)
+    try:
+        yield created
+    finally:
+        graph.unsubscribe(on_change)
+
+
+def _encode(value):
+    if isinstance(value, Node):
+        return {"n": value.id}
+    if isinstance(value, Edge):
+        return {"e": value.id}
+    if isinstance(value, tuple):
+        return {"t": [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    return value
+
+
+def _decode(value, graph):
+    if isinstance(value, list):
+        return [_decode(item, graph) for item in value]
+    if isinstance(value, dict):
+        if "n" in value and len(value) == 1:
+            return graph.node(value["n"])
+        if "e" in value and len(value) == 1:
+            return graph.edge(value["e"])
+        if "t" in value and len(value) == 1:
+            return tuple(_decode(item, graph) for item in value["t"])
+        return {key: _decode(item, graph) for key, item in value.items()}
+    return value
@@ -0,0 +1,153 @@
+from contextlib import contextmanager
+
+
+class IncrementalMatcher:
+    """Keeps the set of valid matches of several productions up to date.
+
+    The matcher subscribes to the graph and, instead of rescanning the whole
+    graph after every rewrite, only re-checks the anchors in the neighbourhood
+    of what changed: the changed element itself and every edge or hyperedge
+    sharing a node with it. Re-checking is lazy, so a production's apply()
+    can make several changes before anything is matched again.
+
+    Matches are found through Production.candidates() and Production.match_at().
+    Anchors are re-checked per production, when that production is queried.
+    Nodes added without any edge do not invalidate anything on their own;
+    they are seen as soon as an edge touching the surrounding element changes.
+
+    Example:
+        matcher = IncrementalMatcher(graph, [P0(), P1()])
+        matched = matcher.pop(p0)
+        while matched:
+            p0.apply(graph, matched)
+            matched = matcher.pop(p0)
+        matcher.close()
+    """
+
+    def __init__(self, graph, productions, enables=None):
+        """Initialize matcher with a full scan of every production.
+
+        Args:
+            graph: HyperGraph instance to watch
+            productions: Productions to keep matches for
+            enables: Optional dict mapping a production to the productions its
+                     apply() can create new matches of (see Production.can_enable).
+                     Changes made inside applying(production) are then only
+                     matched again for those; the others just drop matches
+                     the change may have broken
+        """
+        self.graph = graph
+        self.productions = list(productions)
+        self.enables = enables or {}
+        # production -> {anchor: matched_elements}, oldest match first
+        self._matches = {production: {} for production in self.productions}
+        # production -> anchors to match again, in order of change
+        self._dirty = {production: {} for production in self.productions}
+        self._source = None
+
+        for production in self.productions:
+            matches = self._matches[production]
+            for anchor in production.candidates(graph):
+                matched = production.match_at(graph, anchor)
+                if matched:
+                    matches[anchor] = matched
+
+        graph.subscribe(self._on_change)
+
+    def close(self):
+        """Stop listening to graph changes."""
+        self.graph.unsubscribe(self._on_change)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @contextmanager
+    def applying(self, production):
+        """Attribute the changes made inside the block to production.
+
+        Example:
+            with matcher.applying(p1):
+                p1.apply(graph, matched)
+        """
+        self._source = production
+        try:
+            yield
+        finally:
+            self._source = None
+
+    def matches(self, production):
+        """Return the current matches of production, oldest first."""
+        self._refresh(production)
+        return list(self._matches[production].values())
+
+    def has_match(self, production):
+        self._refresh(production)
+        return bool(self._matches[production])
+
+    def pop(self, production):
+        """Remove and return one match of production, or None if there is none.
+
+        The match is valid for the current graph; it is not handed out again
+        unless something in its neighbourhood changes.
+        """
+        self._refresh(production)
+        matches = self._matches[production]
+        if not matches:
+            return None
+        anchor = next(iter(matches))
+        return matches.pop(anchor)
+
+    def pop_any(self):
+        """Return (production, matched) for the first production with a match.
+
+        Productions are tried in the order they were given. Returns
+        (None, None) when no production can be applied.
+        """
+        for production in self.productions:
+            self._refresh(production)
+            matches = self._matches[production]
+            if matches:
+                anchor = next(iter(matches))
+                return production, matches.pop(anchor)
+        return None, None
+
+    def _on_change(self, event, element, attribute=None, old_value=None):
+        if event in ("add_node", "remove_node"):
+            return
+
+        anchors = [element]
+        for node in element.nodes:
+            anchors.extend(self.graph.incident_edges(node))
+            anchors.extend(self.graph.incident_hyperedges(node))
+
+        enabled = None
+        if self._source is not None and self._source in self.enables:
+            enabled = self.enables[self._source]
+        for production in self.productions:
+            dirty = self._dirty[production]
+            if enabled is None or production in enabled:
+                for anchor in anchors:
+                    dirty[anchor] = None
+            else:
+                # No new match can appear, only existing ones can break
+                matches = self._matches[production]
+                for anchor in anchors:
+                    if anchor in matches:
+                        dirty[anchor] = None
+
+    def _refresh(self, production):
+        dirty = self._dirty[production]
+        if not dirty:
+            return
+
+        self._dirty[production] = {}
+        matches = self._matches[production]
+        for anchor in dirty:
+            matches.pop(anchor, None)
+            if anchor in self.graph.edges:
+                matched = production.match_at(self.graph, anchor)
+                if matched:
+                    matches[anchor] = matched
@@ -1,10 +1,16 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 
 class P0(Production):
     """Production P0: Mark quadrilateral element for refinement.
     It sets value of attribute R of the hyperedge with label Q to 1
     """
 
+    # Q hyperedge with R=0 and an edge along each of its 4 sides
+    pattern = Pattern("Q", 4, R=0, ring=True)
+    # Marks the Q hyperedge
+    produces = [("Q", 1)]
+
     def __init__(self):
         super().__init__(
             name="P0",
@@ -17,44 +23,15 @@ class P0(Production):
         Args:
             refinement_criterion: External condition (e.g., error estimate) to decide if element should be refined
         """
-        hyperedges_to_check = [hyperedge] if hyperedge else graph.edges
-
-        for edge in hyperedges_to_check:
-            if not edge.is_hyperedge():
-                continue
-
-            # Check if it's a quadrilateral (label Q and 4 nodes)
-            if edge.label != "Q" or len(edge.nodes) != 4:
-                continue
-
-            # Check if R = 0 (not yet marked for refinement)
-            if edge.R != 0:
-                continue
-
-            # Check refinement criterion
-            if not refinement_criterion:
-                continue
-
-            # Find the 4 edges connecting the nodes
-            nodes = edge.nodes
-            edges_found = []
-
-            for i in range(4):
-                node1 = nodes[i]
-                node2 = nodes[(i + 1) % 4]
-                found_edge = graph.get_edge_between(node1, node2)
-                if found_edge is None:
-                    break
-                edges_found.append(found_edge)
+        # Check refinement criterion
+        if not refinement_criterion:
+            return False, None
 
-            if len(edges_found) == 4:
-                return True, {
-                    'hyperedge': edge,
-                    'nodes': nodes,
-                    'edges': edges_found
-                }
+        return self._first_match(graph, hyperedge)
 
-        return False, None
+    def write_set(self, matched_elements):
+        # Only the R flag of the hyperedge is changed
+        return {matched_elements['hyperedge']}
 
     def apply(self, graph, matched_elements):
         """Apply P0 to mark the quadrilateral for refinement."""
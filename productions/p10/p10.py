@@ -1,4 +1,5 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 
 class P10(Production):
     """
@@ -7,6 +8,11 @@ class P10(Production):
     """
 
 
+    # S hyperedge with R=1 and an unmarked E edge along each of its 6 sides
+    pattern = Pattern("S", 6, R=1, ring=True, ring_label="E", ring_R=0)
+    # Marks the ring edges
+    produces = [("E", 1)]
+
     def __init__(self):
         super().__init__(
             name="P10",
@@ -17,42 +23,13 @@ class P10(Production):
         """Check if P10 can be applied to the graph.
 
         Args:
-            refinement_criterion: External condition (e.g., error estimate) to decide if element should be refined
+            hyperedge: Optional hyperedge to check; otherwise check all.
         """
-        hyperedges_to_check = [hyperedge] if hyperedge else graph.edges
-
-        for edge in hyperedges_to_check:
-            if not edge.is_hyperedge():
-                continue
-
-            # Check if it's a hexagonal (label "S", 6 nodes, and already marked for refinement (R=1))
-            if edge.label != "S" or len(edge.nodes) != 6 or edge.R != 1:
-                continue
-
-
-            # Find the 6 edges connecting the nodes
-            nodes = edge.nodes
-            edges_found = []
-
-            for i in range(6):
-                node1 = nodes[i]
-                node2 = nodes[(i + 1) % 6]
-                found_edge = graph.get_edge_between(node1, node2)
-                if found_edge is None or found_edge.label != "E":
-                    break
-                # Check if edge is not already marked
-                if found_edge.R == 1:
-                    break
-                edges_found.append(found_edge)
-
-            if len(edges_found) == 6:
-                return True, {
-                    'hyperedge': edge,
-                    'nodes': nodes,
-                    'edges': edges_found
-                }
+        return self._first_match(graph, hyperedge)
 
-        return False, None
+    def write_set(self, matched_elements):
+        # Only the R flags of the ring edges are changed
+        return set(matched_elements['edges'])
 
     def apply(self, graph, matched_elements):
         """Apply P10 to mark the marked for refinement hexagonal edges for breaking."""
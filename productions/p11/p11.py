@@ -1,45 +1,32 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 
 class P11(Production):
     """Production P11: Break the hexagonal element marked for refinement, if all its edges are broken.
     It sets value of attribute R of new hyperedges with label Q to 0.
     """
 
+    # S hyperedge with R=1 whose 6 sides are all broken by hanging nodes with unmarked half-edges
+    pattern = Pattern("S", 6, R=1, split=True, split_R=0)
+    # Adds unmarked spokes and Q hyperedges
+    produces = [("E", 0), ("Q", 0)]
+
     def __init__(self):
         super().__init__(
             name="P11",
             description="Break the hexagonal element marked for refinement, if all its edges are broken."
         )
     
-    def _get_node_between(self, graph, node1, node2, desired_R=None):
-        """
-        Find and return a node between node1 and node2 [that is a hanging node].
-        Args:
-            graph: HyperGraph instance
-            node1: First node
-            node2: Second node
-            desired_R: Desired refinement flag of the edges connecting to the node
-        Returns:
-            Node instance if found, None otherwise
-        """
-        for node in graph.nodes:
-            
-            if node == node1 or node == node2:
-                continue
-
-            # if not node.is_hanging:
-            #     continue
-
-            edge1 = graph.get_edge_between(node1, node)
-            edge2 = graph.get_edge_between(node, node2)
-            if not edge1 or not edge2:
-                continue
-
-            if (desired_R is None or (edge1.R == desired_R and edge2.R == desired_R)):
-                return node
-        
-        return None
-
+    def matched_elements(self, found):
+        nodes_found = []
+        for corner, hanging in zip(found['nodes'], found['hanging']):
+            nodes_found.append(corner)
+            nodes_found.append(hanging)
+        return {
+            'hyperedge': found['anchor'],
+            'nodes': nodes_found,   # Even indices are original nodes, odd indices are hanging nodes
+            'edges': found['half_edges']
+        }
 
     def can_apply(self, graph, hyperedge=None, refinement_criterion=True):
         """Check if P11 can be applied to the graph.
@@ -47,52 +34,10 @@ class P11(Production):
         Args:
             refinement_criterion: External condition (e.g., error estimate) to decide if element should be refined
         """
-        hyperedges_to_check = [hyperedge] if hyperedge else graph.edges
         if hyperedge and not refinement_criterion:
             return False, None
 
-        for edge in hyperedges_to_check:
-            if not edge.is_hyperedge():
-                continue
-
-            # Check if it's a hexagonal (label S and 6 nodes)
-            if edge.label != "S" or len(edge.nodes) != 6:
-                continue
-
-            # Check if R = 1 (marked for refinement)
-            if edge.R != 1:
-                continue
-
-            nodes = edge.nodes
-            nodes_found = []
-            edges_found = []
-            
-            for i in range(6):
-                nodeA = nodes[i]
-                nodeB = nodes[(i + 1) % 6]
-                nodes_found.append(nodeA)
-
-                # Get node between node1 and node2 (A -- C -- B)
-                nodeC = self._get_node_between(graph, nodeA, nodeB, desired_R=0)
-                if not nodeC:
-                    break
-                nodes_found.append(nodeC)
-                
-                edgeAC = graph.get_edge_between(nodeA, nodeC)
-                edgeCB = graph.get_edge_between(nodeC, nodeB)
-                if not edgeAC or not edgeCB:
-                    break
-                edges_found.append(edgeAC)
-                edges_found.append(edgeCB)
-
-            if len(nodes_found) == 12 and len(edges_found) == 12:
-                return True, {
-                    'hyperedge': edge,
-                    'nodes': nodes_found,   # Even indices are original nodes, odd indices are hanging nodes
-                    'edges': edges_found
-                }
-
-        return False, None
+        return self._first_match(graph, hyperedge)
 
     def apply(self, graph, matched_elements):
         """Apply P11 to break the hexagonal element marked"""
@@ -1,10 +1,16 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 
 class P12(Production):
     """Production P12: Mark heptagonal element for refinement.
     It sets value of attribute R of the hyperedge with label T to 1
     """
 
+    # T hyperedge with R=0 and an edge along each of its 7 sides
+    pattern = Pattern("T", 7, R=0, ring=True)
+    # Marks the T hyperedge
+    produces = [("T", 1)]
+
     def __init__(self):
         super().__init__(
             name="P12",
@@ -17,44 +23,15 @@ class P12(Production):
         Args:
             refinement_criterion: External condition (e.g., error estimate) to decide if element should be refined
         """
-        hyperedges_to_check = [hyperedge] if hyperedge else graph.edges
-
-        for edge in hyperedges_to_check:
-            if not edge.is_hyperedge():
-                continue
-
-            # Check if it's a heptagon (label T and 7 nodes)
-            if edge.label != "T" or len(edge.nodes) != 7:
-                continue
-
-            # Check if R = 0 (not yet marked for refinement)
-            if edge.R != 0:
-                continue
-
-            # Check refinement criterion
-            if not refinement_criterion:
-                continue
-
-            # Find the 7 edges connecting the nodes
-            nodes = edge.nodes
-            edges_found = []
-
-            for i in range(7):
-                node1 = nodes[i]
-                node2 = nodes[(i + 1) % 7]
-                found_edge = graph.get_edge_between(node1, node2)
-                if found_edge is None:
-                    break
-                edges_found.append(found_edge)
+        # Check refinement criterion
+        if not refinement_criterion:
+            return False, None
 
-            if len(edges_found) == 7:
-                return True, {
-                    'hyperedge': edge,
-                    'nodes': nodes,
-                    'edges': edges_found
-                }
+        return self._first_match(graph, hyperedge)
 
-        return False, None
+    def write_set(self, matched_elements):
+        # Only the R flag of the hyperedge is changed
+        return {matched_elements['hyperedge']}
 
     def apply(self, graph, matched_elements):
         """Apply P12 to mark the heptagon for refinement."""
@@ -1,4 +1,5 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 
 
 class P2(Production):
@@ -7,30 +8,22 @@ class P2(Production):
     It sets value of attribute R of each hyperedge with label E to 0.
     """
 
+    # Marked shared E edge already broken by a neighbour: a node joined to both its ends
+    pattern = Pattern("E", 2, R=1, border=False, split=True)
+    # Unmarks the half-edges
+    produces = [("E", 0)]
+
     def __init__(self):
         super().__init__("P2", "Remove broken edge")
 
-    def can_apply(self, graph, **kwargs):
-        for edge in graph.edges:
-            if not edge.is_hyperedge() and edge.label == "E" and edge.R == 1 and not edge.is_border:
-                n1, n2 = edge.nodes
-                n1_edges = []
-                n2_edges = []
-                for e in graph.edges:
-                    if e == edge or e.is_hyperedge():
-                        continue
-                    if n1 in e.nodes:
-                        n1_edges.append(e)
-                    elif n2 in e.nodes:
-                        n2_edges.append(e)
-                for n1_edge in n1_edges:
-                    for n2_edge in n2_edges:
-                        if len(set(n1_edge.nodes) | set(n2_edge.nodes)) == 3:
-                            return True, {
-                                "edge_to_remove": edge,
-                                "neighbor_edges": (n1_edge, n2_edge)
-                            }
-        return False, None
+    def matched_elements(self, found):
+        return {
+            "edge_to_remove": found['anchor'],
+            "neighbor_edges": tuple(found['half_edges'])
+        }
+
+    def can_apply(self, graph, edge=None, **kwargs):
+        return self._first_match(graph, edge)
 
     def apply(self, graph, matched_elements):
         edge_to_remove = matched_elements['edge_to_remove']
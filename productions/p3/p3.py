@@ -1,4 +1,22 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
+
+TOLERANCE = 1e-6
+
+
+def _has_midpoint_node(graph, n1, n2):
+    """Check if n1 - n2 was already broken (midpoint hanging node exists)."""
+    split = graph.get_split(n1, n2)
+    if split is not None and split[1] is not None and split[2] is not None:
+        return True
+
+    # Not registered (e.g. built by hand): look for a node at the midpoint
+    # joined to both endpoints
+    mx, my = (n1.x + n2.x) / 2.0, (n1.y + n2.y) / 2.0
+    for node in graph.nodes_within(mx, my, TOLERANCE):
+        if graph.get_edge_between(n1, node) is not None and graph.get_edge_between(node, n2) is not None:
+            return True
+    return False
 
 
 class P3(Production):
@@ -9,31 +27,20 @@ class P3(Production):
       hanging midpoint node and replaces the original edge with two edges.
     """
 
+    # Marked shared E edge that was not broken yet
+    pattern = Pattern(
+        "E", 2, R=1, border=False,
+        guards=[lambda graph, edge: not _has_midpoint_node(graph, *edge.nodes)]
+    )
+    # Adds unmarked half-edges and unmarks the edge
+    produces = [("E", 0)]
+
     def __init__(self):
         super().__init__(name="P3", description="Break shared edge marked for refinement")
 
     def _midpoint(self, n1, n2):
         return ( (n1.x + n2.x) / 2.0, (n1.y + n2.y) / 2.0 )
 
-    def _has_midpoint_node(self, graph, n1, n2):
-        # compute the perpendicularly shifted midpoint used when creating hanging nodes
-        mx, my = self._midpoint(n1, n2)
-        tol = 1e-6
-        for node in graph.nodes:
-            if abs(node.x - mx) <= tol and abs(node.y - my) <= tol:
-                # ensure this node is connected to both endpoints
-                connected_to_n1 = False
-                connected_to_n2 = False
-                for e in graph.edges:
-                    if not e.is_hyperedge():
-                        if (e.nodes[0] == n1 and e.nodes[1] == node) or (e.nodes[0] == node and e.nodes[1] == n1):
-                            connected_to_n1 = True
-                        if (e.nodes[0] == n2 and e.nodes[1] == node) or (e.nodes[0] == node and e.nodes[1] == n2):
-                            connected_to_n2 = True
-                if connected_to_n1 and connected_to_n2:
-                    return True
-        return False
-
     def can_apply(self, graph, edge=None):
         """Check if P3 can be applied.
 
@@ -44,34 +51,11 @@ class P3(Production):
         Returns:
             (bool, dict) same convention as Production.can_apply
         """
-        edges_to_check = [edge] if edge else graph.edges
-
-        for e in edges_to_check:
-            if e.is_hyperedge():
-                continue
+        return self._first_match(graph, edge)
 
-            # Must be a regular edge labeled "E"
-            if e.label != "E":
-                continue
-
-            # Must be marked for refinement
-            if e.R != 1:
-                continue
-
-            # Must be shared (not a border edge)
-            if e.is_border:
-                continue
-
-            n1, n2 = e.nodes[0], e.nodes[1]
-
-            # Check if it was already broken (midpoint hanging node exists)
-            if self._has_midpoint_node(graph, n1, n2):
-                continue
-
-            # Found candidate
-            return True, {"edge": e, "nodes": (n1, n2)}
-
-        return False, None
+    def matched_elements(self, found):
+        n1, n2 = found['nodes']
+        return {"edge": found['anchor'], "nodes": (n1, n2)}
 
     def apply(self, graph, matched_elements):
         """Apply P3: create hanging midpoint and split the edge."""
@@ -98,6 +82,8 @@ class P3(Production):
         # Mark the original edge as no longer marked for refinement
         edge.R = 0
 
+        graph.register_midpoint(n1, n2, mid)
+
         print(f"[{self.name}] Broke edge between {n1} and {n2} into two edges with midpoint {mid} (original edge kept)")
 
         return {
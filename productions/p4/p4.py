@@ -1,4 +1,5 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 
 class P4(Production):
     """
@@ -6,34 +7,27 @@ class P4(Production):
     It sets value of attribute R of each hyperedge with label E to 0.
     """
 
+    # Boundary E edge marked for refinement
+    pattern = Pattern("E", 2, R=1, border=True)
+    # Adds unmarked half-edges
+    produces = [("E", 0)]
+
     def __init__(self):
         super().__init__(
             name="P4",
             description="Unmark boundary edges (E) previously marked for refinement (R:1 -> 0)"
         )
 
+    def matched_elements(self, found):
+        return {'hyperedge': found['anchor']}
+
     def can_apply(self, graph, hyperedge=None):
         """Check if P4 can be applied to the graph.
 
         Args:
             hyperedge: Optional hyperedge to check; otherwise check all.
         """
-        hyperedges_to_check = [hyperedge] if hyperedge else graph.edges
-
-        for edge in hyperedges_to_check:
-            if not edge.is_border:
-                continue
-
-            if edge.label != "E":
-                continue
-
-            if edge.R != 1:
-                continue
-
-            return True, {'hyperedge': edge}
-
-
-        return False, None
+        return self._first_match(graph, hyperedge)
 
     def apply(self, graph, matched_elements):
         """Apply P4: break boundary edge marked for refinement into two edges with a new node in the middle."""
@@ -41,17 +35,26 @@ class P4(Production):
 
         n1, n2 = edge.nodes
 
-        x_mid = (n1.x + n2.x) / 2
-        y_mid = (n1.y + n2.y) / 2
-        new_node = graph.add_node(x_mid, y_mid)
-
-        e1 = graph.add_hyperedge([n1, new_node], label="E")
+        # Reuse the midpoint if this side was already split
+        split = graph.get_split(n1, n2)
+        if split is not None:
+            new_node, e1, e2 = split
+        else:
+            x_mid = (n1.x + n2.x) / 2
+            y_mid = (n1.y + n2.y) / 2
+            new_node = graph.add_node(x_mid, y_mid)
+            e1 = e2 = None
+
+        if e1 is None:
+            e1 = graph.add_hyperedge([n1, new_node], label="E")
         e1.R = 0
         e1.is_border = edge.is_border
-        e2 = graph.add_hyperedge([new_node, n2], label="E")
+        if e2 is None:
+            e2 = graph.add_hyperedge([new_node, n2], label="E")
         e2.R = 0
         e2.is_border = edge.is_border
 
+        graph.register_midpoint(n1, n2, new_node)
         graph.remove_edge(edge)
 
 
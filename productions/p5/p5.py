@@ -1,4 +1,5 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 from hypergraph.node import Node
 
 EPSILON = 1e-6
@@ -8,49 +9,31 @@ class P5(Production):
     it sets value of attribute R of new hyperedges with label Q to 0
     """
 
+    # Q hyperedge with R=1 and a node at the midpoint of each of its 4 sides
+    pattern = Pattern("Q", 4, R=1, midpoints=True)
+    # Adds unmarked spokes and Q hyperedges
+    produces = [("E", 0), ("Q", 0)]
+
     def __init__(self):
         super().__init__(
             name="P5",
             description="Break quadrilateral element if all its edges are broken"
         )
 
-    def can_apply(self, graph):
+    def matched_elements(self, found):
+        return {
+            'hyperedge': found['anchor'],
+            'nodes': found['nodes'],
+            'edges': found['midpoints']
+        }
+
+    def can_apply(self, graph, hyperedge=None):
         """Check if P5 can be applied to the graph.
 
         Args:
-            refinement_criterion: External condition (e.g., error estimate) to decide if element should be refined
+            hyperedge: Optional hyperedge to check; otherwise check all.
         """
-
-        for hyperedge in graph.edges:
-            if hyperedge.label == "Q" and len(hyperedge.nodes) == 4 and hyperedge.R == 1:
-                nodes = hyperedge.nodes
-
-                edges = []
-                for i in range(4):
-                    node_a = nodes[i]
-                    node_b = nodes[(i + 1) % 4]
-                    
-                    mid_x, mid_y = (node_a.x + node_b.x) / 2, (node_a.y + node_b.y) / 2
-                    
-                    found_mid = None
-                    for node in graph.nodes:
-                        if abs(node.x - mid_x) < EPSILON and abs(node.y - mid_y) < EPSILON:
-                            found_mid = node
-                            break
-                    
-                    if not found_mid:
-                        break 
-
-                    edges.append(found_mid)
-
-                if len(edges) == 4:
-                    return True, {
-                        'hyperedge': hyperedge,
-                        'nodes': nodes,
-                        'edges': edges 
-                    }
-        
-        return False, None
+        return self._first_match(graph, hyperedge)
 
     def apply(self, graph, matched_elements):
         hyperedge = matched_elements['hyperedge']
@@ -1,4 +1,5 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 
 
 class P6(Production):
@@ -7,6 +8,11 @@ class P6(Production):
     It sets value of attribute R of the hyperedge with label P to 1.
     """
 
+    # P hyperedge with R=0 and an edge along each of its 5 sides
+    pattern = Pattern("P", 5, R=0, ring=True)
+    # Marks the P hyperedge
+    produces = [("P", 1)]
+
     def __init__(self):
         super().__init__(
             name="P6",
@@ -18,45 +24,15 @@ class P6(Production):
         Check if P6 can be applied to the graph.
         """
 
-        hyperedges_to_check = [hyperedge] if hyperedge else graph.edges
-
-        for edge in hyperedges_to_check:
-            # must be hyperedge
-            if not edge.is_hyperedge():
-                continue
-
-            # must be pentagon (label P and 5 nodes)
-            if edge.label != "P" or len(edge.nodes) != 5:
-                continue
-
-            # must not be already marked
-            if edge.R != 0:
-                continue
-
-            # external refinement criterion
-            if not refinement_criterion:
-                continue
-
-            # check if all 5 surrounding edges E exist
-            nodes = edge.nodes
-            edges_found = []
-
-            for i in range(5):
-                n1 = nodes[i]
-                n2 = nodes[(i + 1) % 5]
-                found_edge = graph.get_edge_between(n1, n2)
-                if found_edge is None:
-                    break
-                edges_found.append(found_edge)
+        # external refinement criterion
+        if not refinement_criterion:
+            return False, None
 
-            if len(edges_found) == 5:
-                return True, {
-                    "hyperedge": edge,
-                    "nodes": nodes,
-                    "edges": edges_found
-                }
+        return self._first_match(graph, hyperedge)
 
-        return False, None
+    def write_set(self, matched_elements):
+        # Only the R flag of the hyperedge is changed
+        return {matched_elements["hyperedge"]}
 
     def apply(self, graph, matched_elements):
         """
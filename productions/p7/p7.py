@@ -1,4 +1,5 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 
 
 class P7(Production):
@@ -9,6 +10,11 @@ class P7(Production):
     it sets value of attribute R of each hyperedge with label E to 1
     '''
 
+    # P hyperedge with R=1 and an E edge along each of its 5 sides
+    pattern = Pattern("P", 5, R=1, ring=True, ring_label="E")
+    # Marks the ring edges
+    produces = [("E", 1)]
+
     def __init__(self):
         super().__init__(
             name="P7",
@@ -16,35 +22,11 @@ class P7(Production):
         )
 
     def can_apply(self, graph, hyperedge=None):
+        return self._first_match(graph, hyperedge)
 
-        hyperedges_to_check = [hyperedge] if hyperedge else graph.edges
-
-        for edge in hyperedges_to_check:
-            if not edge.is_hyperedge():
-                continue
-
-            if edge.label != "P" or len(edge.nodes) != 5 or edge.R != 1:
-                continue
-
-            nodes = edge.nodes
-            edges_found = []
-
-            for i in range(5):
-                node1 = nodes[i]
-                node2 = nodes[(i + 1) % 5]
-                found_edge = graph.get_edge_between(node1, node2)
-                if found_edge is None or found_edge.label != "E":
-                    break
-                edges_found.append(found_edge)
-
-            if len(edges_found) == 5:
-                return True, {
-                    "hyperedge": edge,
-                    "nodes": nodes,
-                    "edges": edges_found,
-                }
-
-        return False, None
+    def write_set(self, matched_elements):
+        # Only the R flags of the ring edges are changed
+        return set(matched_elements["edges"])
 
     def apply(self, graph, matched_elements):
 
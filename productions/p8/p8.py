@@ -1,52 +1,42 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 from hypergraph.hypergraph import HyperGraph
 from typing import Dict, Optional, Tuple
 import math
 
 
 class P8(Production):
+    # P hyperedge with R=1 whose 5 sides are all broken by hanging nodes with unmarked half-edges
+    pattern = Pattern("P", 5, R=1, split=True, split_R=0)
+    # Adds unmarked spokes and Q hyperedges
+    produces = [("E", 0), ("Q", 0)]
+
     def __init__(self):
         super().__init__(
             name="P8",
             description="Break pentagonal element marked for refinement into quadrilaterals"
         )
     
-    def can_apply(self, graph, hyperedge=None):
-        edges_to_check = graph.edges
-        for edge in edges_to_check:
-            if not edge.is_hyperedge():
-                continue
-            if edge.label != "P" or len(edge.nodes) != 5:
-                continue
-            if getattr(edge, 'R', 0) != 1:
-                continue
-            
-            nodes = edge.nodes
-            found_edges = []
-            
-            for i in range(5):
-                node1 = nodes[i]
-                node2 = nodes[(i + 1) % 5]
-                
-                found_edge = graph.get_edge_between(node1, node2)
-                if found_edge is None:
-                    found_edges.append(found_edge)
-        
+    def matched_elements(self, found):
+        hanging = found['hanging']
+        return {
+            'pentagon_hyperedge': found['anchor'],
+            'nodes': found['nodes'],
+            'edges': found['half_edges'],
+            # midpoints[i] lies on the side between nodes[i - 1] and nodes[i]
+            'midpoints': [hanging[i - 1] for i in range(5)]
+        }
 
-            if len(found_edges) == 5:
-                return True, {
-                    'pentagon_hyperedge': edge,
-                    'nodes': nodes,
-                    'edges': found_edges
-                }
-            
-        return False, None
+    def can_apply(self, graph, hyperedge=None):
+        return self._first_match(graph, hyperedge)
     
-    def apply(self, graph, matched_elements, midpoints):
+    def apply(self, graph, matched_elements, midpoints=None):
 
         pentagon_he = matched_elements['pentagon_hyperedge']
         nodes = matched_elements['nodes']
         edges = matched_elements['edges']
+        if midpoints is None:
+            midpoints = matched_elements['midpoints']
         
         graph.remove_edge(pentagon_he)
 
@@ -55,14 +45,14 @@ class P8(Production):
         centroid_z = sum(getattr(node, 'z', 0) for node in nodes) / 5
 
         # dodajemy centrale V
-        centroid_node = graph.add_node(centroid_x, centroid_y, centroid_z)
+        centroid_node = graph.add_node(centroid_x, centroid_y)
+        centroid_node.z = centroid_z
             
         # dadajemy krawedz pomiedzy srodiem a midpointami
         for midpoint in midpoints:
             print("Midpoint: ", midpoint.label)
             graph.add_edge(centroid_node, midpoint, 
-                        is_border=False, 
-                        R=0)
+                        is_border=False)
         
         # dodajemy quady
         new_quads = []
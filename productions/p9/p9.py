@@ -1,4 +1,5 @@
 from productions.production_base import Production
+from productions.pattern import Pattern
 
 class P9(Production):
     """
@@ -6,6 +7,11 @@ class P9(Production):
     It sets value of attribute R of the hyperedge with label S to 1.
     """
 
+    # S hyperedge with R=0 and an edge along each of its 6 sides
+    pattern = Pattern("S", 6, R=0, ring=True)
+    # Marks the S hyperedge
+    produces = [("S", 1)]
+
     def __init__(self):
         super().__init__(
             name="P9",
@@ -18,44 +24,15 @@ class P9(Production):
         Args:
             refinement_criterion: External condition (e.g., error estimate) to decide if element should be refined
         """
-        hyperedges_to_check = [hyperedge] if hyperedge else graph.edges
-
-        for edge in hyperedges_to_check:
-            if not edge.is_hyperedge():
-                continue
-
-            # Check if it's a hexagon (label S and 6 nodes)
-            if edge.label != "S" or len(edge.nodes) != 6:
-                continue
-
-            # Check if R = 0 (not yet marked for refinement)
-            if edge.R != 0:
-                continue
-
-            # Check refinement criterion
-            if not refinement_criterion:
-                continue
-
-            # Find the 6 edges connecting the nodes
-            nodes = edge.nodes
-            edges_found = []
-
-            for i in range(6):
-                node1 = nodes[i]
-                node2 = nodes[(i + 1) % 6]
-                found_edge = graph.get_edge_between(node1, node2)
-                if found_edge is None:
-                    break
-                edges_found.append(found_edge)
+        # Check refinement criterion
+        if not refinement_criterion:
+            return False, None
 
-            if len(edges_found) == 6:
-                return True, {
-                    'hyperedge': edge,
-                    'nodes': nodes,
-                    'edges': edges_found
-                }
+        return self._first_match(graph, hyperedge)
 
-        return False, None
+    def write_set(self, matched_elements):
+        # Only the R flag of the hyperedge is changed
+        return {matched_elements['hyperedge']}
 
     def apply(self, graph, matched_elements):
         """Apply P9 to mark the hexagon for refinement."""
@@ -0,0 +1,52 @@
+"""Parallel rewriting: apply many non-overlapping matches of a production in one step.
+
+Two matches are independent when neither writes an element the other one
+reads or writes. Independent matches stay valid whatever order they are
+applied in, so a single matching pass is enough for the whole step.
+
+Reads and writes are taken from Production.footprint() and
+Production.write_set(). The default write set is the whole footprint, so
+matches of a production that does not narrow it are independent only when
+they share no element at all.
+"""
+
+
+def independent_matches(production, matches):
+    """Select a maximal set of pairwise independent matches.
+
+    Matches are taken greedily in the given order, so the result is
+    deterministic and always contains the first match.
+
+    Args:
+        production: Production the matches belong to
+        matches: Iterable of matched elements dictionaries
+
+    Returns:
+        list: Selected matches, in the given order
+    """
+    selected = []
+    read = set()
+    written = set()
+    for matched in matches:
+        footprint = production.footprint(matched)
+        writes = production.write_set(matched)
+        if writes & (read | written) or footprint & written:
+            continue
+        selected.append(matched)
+        read |= footprint
+        written |= writes
+    return selected
+
+
+def apply_parallel(production, graph):
+    """Apply production at every independent match found in one pass.
+
+    Args:
+        production: Production to apply
+        graph: HyperGraph instance
+
+    Returns:
+        list: Results of production.apply(), one per applied match
+    """
+    matches = independent_matches(production, production.find_all_matches(graph))
+    return [production.apply(graph, matched) for matched in matches]
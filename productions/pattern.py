@@ -0,0 +1,217 @@
+"""Declarative description of a production's left-hand side.
+
+A Pattern says what the LHS looks like around its anchor element (the
+hyperedge, or the edge the production acts on). It is compiled once into a
+MatchPlan, an ordered list of checks that starts from the graph's
+(label, arity, R) index and runs the cheap attribute checks before any
+lookup in the neighbourhood.
+
+The sides of an anchor are its consecutive node pairs: (n0, n1), (n1, n2),
+..., (nk, n0) for a hyperedge, and the single pair (n0, n1) for an edge.
+"""
+
+EPSILON = 1e-6
+
+
+class Pattern:
+    """LHS of a production, described relative to its anchor element."""
+
+    def __init__(self, label, arity, R=None, border=None, ring=False, ring_label=None,
+                 ring_R=None, split=False, split_R=None, midpoints=False, guards=()):
+        """Initialize pattern.
+
+        Args:
+            label: Label of the anchor (eg, "Q", "E")
+            arity: Number of nodes of the anchor
+            R: Required refinement flag of the anchor, or None for any
+            border: Required border flag of the anchor, or None for any
+            ring: Every side must be joined by an edge
+            ring_label: Required label of the ring edges, or None for any
+            ring_R: Required refinement flag of the ring edges, or None for any
+            split: Every side must be broken by a hanging node joined to both ends
+            split_R: Required refinement flag of both half-edges, or None for any
+            midpoints: Every side must have a node at its midpoint (no edges required)
+            guards: Extra conditions, called as guard(graph, anchor) -> bool
+        """
+        self.label = label
+        self.arity = arity
+        self.R = R
+        self.border = border
+        self.ring = ring
+        self.ring_label = ring_label
+        self.ring_R = ring_R
+        self.split = split
+        self.split_R = split_R
+        self.midpoints = midpoints
+        self.guards = tuple(guards)
+        self._plan = None
+
+    @property
+    def plan(self):
+        """The compiled MatchPlan, built on first use."""
+        if self._plan is None:
+            self._plan = MatchPlan(self)
+        return self._plan
+
+    def reads(self):
+        """Return the (label, R) keys of the elements a match is made of.
+
+        None stands for any label or any R. Guards are not included: they may
+        only reject matches that new elements would make invalid.
+
+        Returns:
+            set: Keys of the anchor and of the edges around it
+        """
+        keys = {(self.label, self.R)}
+        if self.ring:
+            keys.add((self.ring_label, self.ring_R))
+        if self.split:
+            keys.add((None, self.split_R))
+        if self.midpoints:
+            # The midpoint nodes come with edges of any kind
+            keys.add((None, None))
+        return keys
+
+    def __str__(self):
+        return f"Pattern({self.label}, arity={self.arity}, R={self.R})"
+
+
+class MatchPlan:
+    """Search plan compiled from a Pattern.
+
+    Steps run in order of increasing cost: anchor attributes, ring edges
+    (one pair-index lookup per side), hanging nodes (registry, then the
+    neighbours of one corner), midpoints, and finally the custom guards.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+        steps = []
+        if pattern.ring:
+            steps.append(self._match_ring)
+        if pattern.split:
+            steps.append(self._match_split)
+        if pattern.midpoints:
+            steps.append(self._match_midpoints)
+        if pattern.guards:
+            steps.append(self._match_guards)
+        self._steps = steps
+
+    def candidates(self, graph):
+        """Return the anchors worth trying, straight from the label index."""
+        pattern = self.pattern
+        return graph.edges_with(pattern.label, pattern.arity, R=pattern.R)
+
+    def match(self, graph, anchor):
+        """Match the pattern at anchor.
+
+        Returns:
+            dict or None: 'anchor', 'nodes' and, depending on the pattern,
+                          'ring' (side edges), 'hanging' (hanging nodes),
+                          'half_edges' (two per side) and 'midpoints'
+        """
+        pattern = self.pattern
+        if anchor.label != pattern.label or len(anchor.nodes) != pattern.arity:
+            return None
+        if pattern.R is not None and anchor.R != pattern.R:
+            return None
+        if pattern.border is not None and bool(anchor.is_border) != pattern.border:
+            return None
+
+        found = {'anchor': anchor, 'nodes': anchor.nodes}
+        for step in self._steps:
+            if not step(graph, anchor, found):
+                return None
+        return found
+
+    def _match_ring(self, graph, anchor, found):
+        pattern = self.pattern
+        ring = []
+        for node_1, node_2 in sides(anchor):
+            edge = graph.get_edge_between(node_1, node_2)
+            if edge is None:
+                return False
+            if pattern.ring_label is not None and edge.label != pattern.ring_label:
+                return False
+            if pattern.ring_R is not None and edge.R != pattern.ring_R:
+                return False
+            ring.append(edge)
+        found['ring'] = ring
+        return True
+
+    def _match_split(self, graph, anchor, found):
+        hanging = []
+        half_edges = []
+        for node_1, node_2 in sides(anchor):
+            split = find_split(graph, node_1, node_2, R=self.pattern.split_R)
+            if split is None:
+                return False
+            hanging.append(split[0])
+            half_edges.extend(split[1:])
+        found['hanging'] = hanging
+        found['half_edges'] = half_edges
+        return True
+
+    def _match_midpoints(self, graph, anchor, found):
+        midpoints = []
+        for node_1, node_2 in sides(anchor):
+            midpoint = find_midpoint(graph, node_1, node_2)
+            if midpoint is None:
+                return False
+            midpoints.append(midpoint)
+        found['midpoints'] = midpoints
+        return True
+
+    def _match_guards(self, graph, anchor, found):
+        return all(guard(graph, anchor) for guard in self.pattern.guards)
+
+
+def sides(anchor):
+    """Return the consecutive node pairs of anchor."""
+    nodes = anchor.nodes
+    if len(nodes) == 2:
+        return [(nodes[0], nodes[1])]
+    return [(nodes[i], nodes[(i + 1) % len(nodes)]) for i in range(len(nodes))]
+
+
+def find_split(graph, node_1, node_2, R=None):
+    """Find a hanging node C with edges node_1 - C and C - node_2.
+
+    The midpoint registry is tried first; otherwise the neighbours of node_1
+    are searched, which covers graphs built by hand.
+
+    Args:
+        R: Required refinement flag of both half-edges, or None for any
+
+    Returns:
+        tuple or None: (C, edge node_1 - C, edge C - node_2)
+    """
+    split = graph.get_split(node_1, node_2)
+    if split is not None and _half_edges_match(split[1], split[2], R):
+        return split
+
+    for node in graph.neighbors(node_1):
+        if node is node_2:
+            continue
+        edge_1 = graph.get_edge_between(node_1, node)
+        edge_2 = graph.get_edge_between(node, node_2)
+        if _half_edges_match(edge_1, edge_2, R):
+            return node, edge_1, edge_2
+    return None
+
+
+def find_midpoint(graph, node_1, node_2):
+    """Find the node at the midpoint of node_1 - node_2, connected or not."""
+    midpoint = graph.get_midpoint(node_1, node_2)
+    if midpoint is not None:
+        return midpoint
+
+    # Side not split by P3/P4: fall back to a coordinate search
+    return graph.find_node((node_1.x + node_2.x) / 2, (node_1.y + node_2.y) / 2, EPSILON)
+
+
+def _half_edges_match(edge_1, edge_2, R):
+    if edge_1 is None or edge_2 is None:
+        return False
+    return R is None or (edge_1.R == R and edge_2.R == R)
@@ -1,3 +1,7 @@
+from hypergraph.node import Node
+from hypergraph.edge import Edge
+
+
 class Production:
     """Base class for hypergraph grammar productions.
 
@@ -30,6 +34,180 @@ class Production:
         """
         raise NotImplementedError(f"Production {self.name} must implement can_apply()")
 
+    # LHS of the production as a productions.pattern.Pattern, if declared
+    pattern = None
+    # (label, R) keys of the edges and hyperedges apply() adds or marks, None if unknown
+    produces = None
+
+    def candidates(self, graph):
+        """Return the graph elements the LHS could be anchored at.
+
+        The anchor is the element the production is rooted at, usually its
+        hyperedge (eg, the Q hyperedge for P0) or the edge it acts on (P2-P4).
+        Productions declaring a pattern get this from its compiled plan.
+
+        Args:
+            graph: HyperGraph instance
+
+        Returns:
+            list: Candidate anchor elements, found through the graph indices
+        """
+        if self.pattern is None:
+            raise NotImplementedError(f"Production {self.name} must implement candidates()")
+        return self.pattern.plan.candidates(graph)
+
+    def match_at(self, graph, anchor):
+        """Match the LHS with its anchor mapped to the given element.
+
+        Only the neighbourhood of the anchor is inspected, so this is what the
+        incremental matcher calls when something near anchor changes.
+
+        Args:
+            graph: HyperGraph instance
+            anchor: Graph element (edge or hyperedge) to anchor the LHS at
+
+        Returns:
+            dict or None: Matched elements, as returned by can_apply(), or None
+        """
+        if self.pattern is None:
+            raise NotImplementedError(f"Production {self.name} must implement match_at()")
+        found = self.pattern.plan.match(graph, anchor)
+        if found is None:
+            return None
+        return self.matched_elements(found)
+
+    def matched_elements(self, found):
+        """Turn a pattern match into the dictionary passed to apply().
+
+        Args:
+            found: Dictionary returned by MatchPlan.match()
+
+        Returns:
+            dict: By default the anchor as 'hyperedge', its 'nodes' and the
+                  ring edges as 'edges'
+        """
+        return {
+            'hyperedge': found['anchor'],
+            'nodes': found['nodes'],
+            'edges': found.get('ring', [])
+        }
+
+    def find_all_matches(self, graph):
+        """Yield every match of the LHS in the graph, each exactly once.
+
+        Candidates are taken from the graph indices once and matched lazily,
+        so callers that rank or filter matches need a single pass. Anchors
+        removed from the graph while iterating are skipped.
+
+        Args:
+            graph: HyperGraph instance
+
+        Yields:
+            dict: Matched elements, as returned by can_apply()
+        """
+        for anchor in self.candidates(graph):
+            if anchor not in graph.edges:
+                continue
+            matched = self.match_at(graph, anchor)
+            if matched:
+                yield matched
+
+    def find_matches_near(self, graph, x, y):
+        """Yield the matches of the LHS ordered by distance from (x, y).
+
+        Anchors are taken from the graph's spatial index of edge centroids,
+        nearest first, so asking for the first match only matches the anchors
+        around (x, y). Only edges with the label and arity of the pattern are
+        tried, and nothing is looked at when the graph has none. The graph
+        must not be changed while iterating.
+
+        Args:
+            graph: HyperGraph instance
+            x, y: Target point
+
+        Yields:
+            dict: Matched elements, as returned by can_apply()
+        """
+        pattern = self.pattern
+        if pattern is None:
+            anchors = graph.edges_near(x, y)
+        else:
+            anchors = graph.edges_near(x, y, pattern.label, pattern.arity, pattern.R)
+        for anchor in anchors:
+            matched = self.match_at(graph, anchor)
+            if matched:
+                yield matched
+
+    def nearest_match(self, graph, x, y):
+        """Return the match anchored closest to (x, y), or None."""
+        return next(self.find_matches_near(graph, x, y), None)
+
+    def footprint(self, matched_elements):
+        """Return every node and edge appearing in matched_elements.
+
+        Args:
+            matched_elements: Dictionary of matched elements from can_apply()
+
+        Returns:
+            set: Nodes, edges and hyperedges referenced by the match
+        """
+        elements = set()
+        stack = list(matched_elements.values())
+        while stack:
+            value = stack.pop()
+            if isinstance(value, (list, tuple)):
+                stack.extend(value)
+            elif isinstance(value, (Node, Edge)):
+                elements.add(value)
+        return elements
+
+    def write_set(self, matched_elements):
+        """Return the matched elements that apply() modifies or removes.
+
+        The default assumes every matched element may be changed; productions
+        that only touch part of their match (eg, the marking ones) narrow it,
+        which lets more of their matches be applied together.
+
+        Args:
+            matched_elements: Dictionary of matched elements from can_apply()
+
+        Returns:
+            set: Elements written by apply()
+        """
+        return self.footprint(matched_elements)
+
+    def can_enable(self, other):
+        """Check if applying this production can create a new match of other.
+
+        A match can only appear when an element it is made of is added or has
+        its label or R changed, so this compares what this production produces
+        with what the pattern of other reads. Without that information the
+        answer is always True.
+
+        Args:
+            other: Production whose matches may be enabled
+
+        Returns:
+            bool: False only if no application of self can enable other
+        """
+        if self.produces is None or other.pattern is None:
+            return True
+        return any(
+            (label is None or label == produced_label) and (R is None or R == produced_R)
+            for produced_label, produced_R in self.produces
+            for label, R in other.pattern.reads()
+        )
+
+    def _first_match(self, graph, anchor=None):
+        """Return (True, matched) for anchor, or the first match in the graph."""
+        if anchor:
+            matched = self.match_at(graph, anchor)
+        else:
+            matched = next(self.find_all_matches(graph), None)
+        if matched:
+            return True, matched
+        return False, None
+
     def apply(self, graph, matched_elements):
         """Apply the production transformation to the graph.
 
@@ -0,0 +1,113 @@
+import time
+
+from productions.matcher import IncrementalMatcher
+
+
+class ProductionStats:
+    """Cost of one production over the runs of a Scheduler."""
+
+    def __init__(self, name):
+        self.name = name
+        self.visits = 0         # Times the production was taken off the worklist
+        self.applied = 0        # Times apply() was called
+        self.match_time = 0.0   # Seconds spent finding matches
+        self.apply_time = 0.0   # Seconds spent in apply()
+
+    def __str__(self):
+        return (f"{self.name}: applied {self.applied} times in {self.visits} visits, "
+                f"matching {self.match_time * 1000:.2f} ms, applying {self.apply_time * 1000:.2f} ms")
+
+
+class Scheduler:
+    """Applies a set of productions until none of them can be applied.
+
+    Productions are visited in the order given, and a visit applies the
+    production until it has no match left. A worklist holds the productions
+    that may have matches: all of them at first, then only those that can be
+    enabled by a production applied since their last visit (see
+    Production.can_enable). The run ends when the worklist is empty.
+
+    Matches are kept by an IncrementalMatcher, so each application only
+    causes its neighbourhood to be matched again, and only for the
+    productions it can enable.
+
+    Example:
+        scheduler = Scheduler(graph, [P1(), P4(), P3(), P2(), P5()])
+        scheduler.run()
+        print(scheduler.report())
+    """
+
+    def __init__(self, graph, productions):
+        """Initialize scheduler.
+
+        Args:
+            graph: HyperGraph instance to rewrite
+            productions: Productions to apply, in order of priority. Repeated
+                         productions (same name) are only kept once
+        """
+        self.graph = graph
+
+        unique = {}
+        for production in productions:
+            unique.setdefault(production.name, production)
+        self.productions = list(unique.values())
+
+        # production -> productions it can create new matches of
+        self.enables = {
+            producer: {consumer for consumer in self.productions if producer.can_enable(consumer)}
+            for producer in self.productions
+        }
+        self.stats = {production.name: ProductionStats(production.name) for production in self.productions}
+
+    def run(self, on_apply=None, log=None):
+        """Apply productions until none of them can be applied.
+
+        Args:
+            on_apply: Optional callback on_apply(production, matched, result),
+                      called after each application
+            log: Optional EventLog recording each application
+
+        Returns:
+            int: Number of productions applied
+        """
+        applied = 0
+        worklist = set(self.productions)
+
+        with IncrementalMatcher(self.graph, self.productions, enables=self.enables) as matcher:
+            while worklist:
+                for production in self.productions:
+                    if production not in worklist:
+                        continue
+                    worklist.discard(production)
+
+                    stats = self.stats[production.name]
+                    stats.visits += 1
+                    while True:
+                        start = time.perf_counter()
+                        matched = matcher.pop(production)
+                        stats.match_time += time.perf_counter() - start
+                        if matched is None:
+                            break
+
+                        start = time.perf_counter()
+                        with matcher.applying(production):
+                            if log is not None:
+                                result = log.apply(production, self.graph, matched)
+                            else:
+                                result = production.apply(self.graph, matched)
+                        stats.apply_time += time.perf_counter() - start
+                        stats.applied += 1
+                        applied += 1
+
+                        worklist.update(self.enables[production])
+                        if on_apply:
+                            on_apply(production, matched, result)
+
+                    # Its own matches were just exhausted
+                    worklist.discard(production)
+
+        return applied
+
+    def report(self):
+        """Return the cost of every production, one line each."""
+        return "\n".join(str(stats) for stats in self.stats.values())
@@ -0,0 +1,29 @@
+"""Graphs and helpers shared by the tests."""
+from productions import P0, P1, P2, P3, P4, P5
+from productions.scheduler import Scheduler
+
+
+def two_quads(graph):
+    """Add two unit quads sharing the edge (1, 0) - (1, 1) to graph.
+
+    The seven edges are added first, all of them border edges except the
+    shared one, then the two Q hyperedges.
+
+    Args:
+        graph: Empty HyperGraph, of either backend
+
+    Returns:
+        tuple: (nodes, [q1, q2]), q1 being the quad at the origin
+    """
+    nodes = [graph.add_node(x, y) for x, y in [(0, 0), (1, 0), (1, 1), (0, 1), (2, 0), (2, 1)]]
+    for a, b in [(0, 1), (1, 2), (2, 3), (3, 0), (1, 4), (4, 5), (5, 2)]:
+        graph.add_edge(nodes[a], nodes[b], is_border=(a, b) != (1, 2))
+    quads = [graph.add_hyperedge([nodes[i] for i in (0, 1, 2, 3)], label="Q"),
+             graph.add_hyperedge([nodes[i] for i in (1, 4, 5, 2)], label="Q")]
+    return nodes, quads
+
+
+def refine(graph, quad):
+    """Mark quad with P0 and run the refinement productions to a fixed point."""
+    P0().apply(graph, P0().can_apply(graph, quad)[1])
+    Scheduler(graph, [P1(), P4(), P3(), P2(), P5()]).run()
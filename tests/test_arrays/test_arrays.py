@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+import numpy as np
+from hypergraph.hypergraph import HyperGraph
+from tests.helpers import refine, two_quads
+
+
+class TestArrayBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph(backend="array")
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            HyperGraph(backend="sparse")
+
+    def test_views_are_stable(self):
+        """Test views keep their identity and compare by index."""
+        nodes, (q1, q2) = two_quads(self.graph)
+
+        self.assertIs(q1.nodes[0], nodes[0])
+        self.assertIs(self.graph.get_edge_between(nodes[1], nodes[2]),
+                      self.graph.get_edge_between(nodes[2], nodes[1]))
+        self.assertNotEqual(q1, q2)
+        self.assertEqual((q1.x, q1.y), (0.5, 0.5))
+
+        q1.R = 1
+        self.assertEqual(q1.R, 1)
+        self.assertEqual(self.graph.edges_with("Q", 4, R=1), [q1])
+
+    def test_refinement_matches_object_backend(self):
+        """Test a full refinement gives the same arrays with both backends."""
+        exports = []
+        for backend in ("object", "array"):
+            graph = HyperGraph(backend=backend)
+            _, (q1, _) = two_quads(graph)
+            refine(graph, q1)
+            exports.append(graph.export())
+
+        for key, value in exports[0].items():
+            np.testing.assert_array_equal(exports[1][key], value, err_msg=key)
+
+    def test_bulk_operations(self):
+        """Test bounding box, centroids and marking by criterion."""
+        _, (q1, q2) = two_quads(self.graph)
+
+        self.assertEqual(self.graph.bounding_box(), (0.0, 0.0, 2.0, 1.0))
+
+        hyperedges, centroids = self.graph.hyperedge_centroids()
+        self.assertEqual(hyperedges, [q1, q2])
+        np.testing.assert_allclose(centroids, [[0.5, 0.5], [1.5, 0.5]])
+
+        marked = self.graph.mark(lambda x, y: x > 1)
+        self.assertEqual(marked, [q2])
+        self.assertEqual((q1.R, q2.R), (0, 1))
+        self.assertEqual(self.graph.mark(lambda x, y: x > 1), [])
+
+    def test_export_drops_removed_edges(self):
+        """Test export is compact, with hyperedges in CSR form."""
+        nodes, (q1, q2) = two_quads(self.graph)
+        self.graph.remove_edge(q1)
+        self.graph.remove_edge(self.graph.get_edge_between(nodes[0], nodes[1]))
+
+        exported = self.graph.export()
+        self.assertEqual(len(exported["edge_nodes"]), 6)
+        self.assertEqual(exported["hyperedge_offsets"].tolist(), [0, 4])
+        self.assertEqual(exported["hyperedge_nodes"].tolist(), [1, 4, 5, 2])
+        self.assertEqual(exported["hyperedge_label"].tolist(), ["Q"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+import numpy as np
+from hypergraph import checkpoint
+from hypergraph.hypergraph import HyperGraph
+from tests.helpers import refine, two_quads
+
+
+def assert_same(test, graph, other):
+    exported, other_exported = graph.export(), other.export()
+    for name in exported:
+        np.testing.assert_array_equal(exported[name], other_exported[name], err_msg=name)
+    test.assertEqual([e.id for e in graph.edges], [e.id for e in other.edges])
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+        _, (self.q1, self.q2) = two_quads(self.graph)
+        refine(self.graph, self.q1)
+        self.path = os.path.join(tempfile.mkdtemp(), "graph.ckpt")
+        self.graph.save(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_load_restores_graph(self):
+        """Test a loaded graph equals the saved one, with either backend and with or without mmap."""
+        for backend in ("object", "array"):
+            for mmap in (True, False):
+                loaded = HyperGraph.load(self.path, backend=backend, mmap=mmap)
+                assert_same(self, loaded, self.graph)
+                self.assertEqual(loaded.add_node(5, 5).id, len(self.graph.nodes))
+
+    def test_loaded_graph_refines_like_original(self):
+        """Test refining a loaded graph gives the same result as refining the saved one."""
+        loaded = HyperGraph.load(self.path, backend="array")
+        refine(loaded, loaded.edge(self.q2.id))
+        refine(self.graph, self.q2)
+        assert_same(self, loaded, self.graph)
+
+    def test_mmap_loads_lazily(self):
+        """Test the array backend keeps the mapped columns and builds indices on first use."""
+        loaded = HyperGraph.load(self.path, backend="array")
+        self.assertIsInstance(loaded._storage.node_xyz.data, np.memmap)
+        self.assertNotIn("_label_index", vars(loaded))
+        self.assertEqual(loaded.bounding_box(), self.graph.bounding_box())
+
+        loaded.edge(self.q2.id).R = 1
+        self.assertIn("_label_index", vars(loaded))
+        self.assertEqual(HyperGraph.load(self.path).edge(self.q2.id).R, 0)
+
+    def test_rejects_other_files(self):
+        """Test loading a file that is not a checkpoint raises ValueError."""
+        with open(self.path, "wb") as file:
+            file.write(b"not a graph")
+        with self.assertRaises(ValueError):
+            HyperGraph.load(self.path)
+
+    def test_write_leaves_arrays_untouched(self):
+        """Test write() stores non-contiguous arrays without replacing them in the caller's dict."""
+        column = np.arange(6).reshape(2, 3).T
+        arrays = {"column": column}
+        checkpoint.write(self.path, arrays, {})
+        self.assertIs(arrays["column"], column)
+        np.testing.assert_array_equal(checkpoint.read(self.path)[1]["column"], column)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+import numpy as np
+from hypergraph.hypergraph import HyperGraph
+from productions import P0, P1, P2, P3, P4, P5
+from productions.event_log import EventLog, read_events, replay
+from productions.scheduler import Scheduler
+from tests.helpers import two_quads
+
+
+class TestEventLog(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+        two_quads(self.graph)
+        self.path = os.path.join(tempfile.mkdtemp(), "events.jsonl")
+        scheduler = Scheduler(self.graph, [P1(), P4(), P3(), P2(), P5()])
+        self.applied = 0
+        with EventLog(self.path) as log:
+            for quad in list(self.graph.edges_with("Q", 4)):
+                log.apply(P0(), self.graph, P0().can_apply(self.graph, quad)[1])
+                self.applied += 1 + scheduler.run(log=log)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_records_every_application(self):
+        """Test each applied production is one event with its matched and created ids."""
+        events = list(read_events(self.path))
+        self.assertEqual(events[0]["production"], "P0")
+        self.assertEqual(events[0]["matched"]["hyperedge"], {"e": 7})
+        self.assertEqual(events[0]["created"], {"nodes": [], "edges": []})
+        self.assertEqual(len(events), self.applied)
+        self.assertTrue(any(event["created"]["nodes"] for event in events))
+
+    def test_replay_reproduces_run(self):
+        """Test replaying the log on the initial graph gives the same graph."""
+        for backend in ("object", "array"):
+            graph = HyperGraph(backend)
+            two_quads(graph)
+            self.assertEqual(replay(self.path, graph), len(list(read_events(self.path))))
+            exported, expected = graph.export(), self.graph.export()
+            for name in expected:
+                np.testing.assert_array_equal(exported[name], expected[name], err_msg=name)
+
+    def test_replay_detects_other_start(self):
+        """Test replaying on a graph in another state raises ValueError."""
+        graph = HyperGraph()
+        graph.add_node(5, 5)
+        two_quads(graph)
+        with self.assertRaises((ValueError, KeyError)):
+            replay(self.path, graph)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,300 @@
+import unittest
+import os
+import random
+import subprocess
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from hypergraph.hypergraph import HyperGraph
+
+
+class TestHyperGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+
+    def test_get_edge_between_is_unordered(self):
+        """Test edge lookup ignores the order of the node pair."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(1, 0)
+        e = self.graph.add_edge(n1, n2)
+
+        self.assertIs(self.graph.get_edge_between(n1, n2), e)
+        self.assertIs(self.graph.get_edge_between(n2, n1), e)
+
+    def test_get_edge_between_ignores_hyperedges(self):
+        """Test hyperedges are never returned as the edge between two nodes."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(1, 0)
+        n3 = self.graph.add_node(1, 1)
+        self.graph.add_hyperedge([n1, n2, n3], label="T")
+
+        self.assertIsNone(self.graph.get_edge_between(n1, n2))
+
+    def test_get_edge_between_two_node_hyperedge(self):
+        """Test 2-node edges created with add_hyperedge (as in P4) are indexed."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(1, 0)
+        e = self.graph.add_hyperedge([n1, n2], label="E")
+
+        self.assertIs(self.graph.get_edge_between(n1, n2), e)
+
+    def test_get_edge_between_after_remove(self):
+        """Test removed edges disappear from the lookup."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(1, 0)
+        e = self.graph.add_edge(n1, n2)
+        self.graph.remove_edge(e)
+
+        self.assertIsNone(self.graph.get_edge_between(n1, n2))
+
+    def test_get_edge_between_parallel_edges(self):
+        """Test the first inserted edge wins and the next one takes over after removal."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(1, 0)
+        e1 = self.graph.add_edge(n1, n2)
+        e2 = self.graph.add_edge(n2, n1)
+
+        self.assertIs(self.graph.get_edge_between(n1, n2), e1)
+        self.graph.remove_edge(e1)
+        self.assertIs(self.graph.get_edge_between(n1, n2), e2)
+
+    def test_incidence_tracks_edges_and_hyperedges(self):
+        """Test incident edges, hyperedges and degrees follow add/remove."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(1, 0)
+        n3 = self.graph.add_node(1, 1)
+        e12 = self.graph.add_edge(n1, n2)
+        e13 = self.graph.add_edge(n1, n3)
+        h = self.graph.add_hyperedge([n1, n2, n3], label="T")
+
+        self.assertEqual(self.graph.incident_edges(n1), [e12, e13])
+        self.assertEqual(self.graph.incident_hyperedges(n1), [h])
+        self.assertEqual(self.graph.degree(n1), 2)
+        self.assertEqual(self.graph.hyperdegree(n2), 1)
+        self.assertEqual(set(self.graph.neighbors(n1)), {n2, n3})
+
+        self.graph.remove_edge(e12)
+        self.graph.remove_edge(h)
+
+        self.assertEqual(self.graph.incident_edges(n1), [e13])
+        self.assertEqual(self.graph.incident_edges(n2), [])
+        self.assertEqual(self.graph.hyperdegree(n1), 0)
+        self.assertEqual(self.graph.neighbors(n2), [])
+
+    def test_midpoint_registry(self):
+        """Test split nodes are found for either node order and outlive the parent edge."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(2, 0)
+        parent = self.graph.add_edge(n1, n2)
+        mid = self.graph.add_node(1, 0)
+        e1 = self.graph.add_edge(n1, mid)
+        e2 = self.graph.add_edge(mid, n2)
+        self.graph.register_midpoint(n1, n2, mid)
+        self.graph.remove_edge(parent)
+
+        self.assertIs(self.graph.get_midpoint(n2, n1), mid)
+        self.assertEqual(self.graph.get_split(n1, n2), (mid, e1, e2))
+        self.assertEqual(self.graph.get_split(n2, n1), (mid, e2, e1))
+        self.assertIsNone(self.graph.get_split(n1, mid))
+
+    def test_edges_keep_insertion_order_after_removal(self):
+        """Test removing an edge keeps the remaining edges in insertion order."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(1, 0)
+        n3 = self.graph.add_node(1, 1)
+        e12 = self.graph.add_edge(n1, n2)
+        e23 = self.graph.add_edge(n2, n3)
+        e31 = self.graph.add_edge(n3, n1)
+
+        self.graph.remove_edge(e23)
+        self.graph.remove_edge(e23)
+
+        self.assertEqual(list(self.graph.edges), [e12, e31])
+        self.assertEqual(len(self.graph.edges), 2)
+        self.assertNotIn(e23, self.graph.edges)
+
+    def test_edges_with_follows_label_and_flag_changes(self):
+        """Test the label/arity index is updated when R or label change."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(1, 0)
+        n3 = self.graph.add_node(1, 1)
+        n4 = self.graph.add_node(0, 1)
+        e = self.graph.add_edge(n1, n2)
+        q = self.graph.add_hyperedge([n1, n2, n3, n4], label="Q")
+
+        self.assertEqual(self.graph.edges_with("Q", 4, R=0), [q])
+        self.assertEqual(self.graph.edges_with("Q", 4, R=1), [])
+
+        q.R = 1
+        self.assertEqual(self.graph.edges_with("Q", 4, R=0), [])
+        self.assertEqual(self.graph.edges_with("Q", 4, R=1), [q])
+        self.assertEqual(self.graph.edges_with("Q", 4), [q])
+
+        q.label = "P"
+        self.assertEqual(self.graph.edges_with("Q", 4), [])
+        self.assertEqual(self.graph.edges_with("P", 4, R=1), [q])
+        self.assertEqual(self.graph.edges_with("E", 2, R=0), [e])
+
+        self.graph.remove_edge(q)
+        q.R = 0
+        self.assertEqual(self.graph.edges_with("P", 4), [])
+
+
+    def _grid_of_nodes(self, size):
+        return {(i, j): self.graph.add_node(i * 0.1, j * 0.1) for i in range(size) for j in range(size)}
+
+    def test_find_node_within_tolerance(self):
+        """Test position lookup returns the closest node within tolerance."""
+        nodes = self._grid_of_nodes(30)
+
+        self.assertIs(self.graph.find_node(0.5, 0.7), nodes[(5, 7)])
+        self.assertIs(self.graph.find_node(0.52, 0.7, tolerance=0.03), nodes[(5, 7)])
+        self.assertIsNone(self.graph.find_node(0.55, 0.75, tolerance=0.03))
+        self.assertIsNone(self.graph.find_node(-5, -5, tolerance=1))
+
+    def test_nearest_nodes(self):
+        """Test k-nearest matches a brute force search."""
+        self._grid_of_nodes(30)
+        x, y = 1.234, 2.071
+        expected = sorted(self.graph.nodes, key=lambda n: (n.x - x) ** 2 + (n.y - y) ** 2)[:5]
+
+        self.assertEqual(self.graph.nearest_nodes(x, y, k=5), expected)
+        self.assertEqual(len(self.graph.nearest_nodes(-100, -100, k=3)), 3)
+        self.assertEqual(len(self.graph.nearest_nodes(0, 0, k=10000)), 900)
+
+    def test_nearest_nodes_far_from_sparse_nodes(self):
+        """Test nearest nodes to points far from two distant nodes, which resize the cells."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(3000, 0)
+
+        self.assertEqual(self.graph.nearest_nodes(1400, 1500, k=2), [n1, n2])
+        self.assertEqual(self.graph.nearest_nodes(30000, 0), [n2])
+        self.assertEqual(self.graph.nearest_nodes(-1e6, 1e6), [n1])
+        self.assertGreater(self.graph._grid.cell_size, 100)
+
+    def test_nearest_nodes_in_sparse_mesh_with_large_coordinates(self):
+        """Test queries on a few nodes spread far from the origin match a brute force search."""
+        rng = random.Random(0)
+        xy = [(1e6 + rng.uniform(0, 5e5), -2e6 + rng.uniform(0, 5e5)) for _ in range(200)]
+        self.graph.add_nodes(xy)
+
+        for x, y in [(1.2e6, -1.8e6), (0, 0), (1e6, -2e6), (5e6, 5e6)]:
+            expected = sorted(self.graph.nodes, key=lambda n: (n.x - x) ** 2 + (n.y - y) ** 2)[:3]
+            self.assertEqual(self.graph.nearest_nodes(x, y, k=3), expected)
+        node = self.graph.nodes[17]
+        self.assertIs(self.graph.find_node(node.x, node.y), node)
+        self.assertIn(node, self.graph.nodes_in_box(node.x - 1, node.y - 1, node.x + 1, node.y + 1))
+
+    def test_nodes_in_box(self):
+        """Test box query includes nodes on the border."""
+        nodes = self._grid_of_nodes(30)
+        found = self.graph.nodes_in_box(0.2, 0.3, 0.4, 0.45)
+
+        self.assertEqual(set(found), {nodes[(i, j)] for i in range(2, 5) for j in range(3, 5)})
+
+
+    def test_edges_near_follows_changes(self):
+        """Test edge centroids are indexed on add and dropped on remove."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(4, 0)
+        n3 = self.graph.add_node(4, 4)
+        far = self.graph.add_edge(n2, n3)
+        near = self.graph.add_edge(n1, n2)
+        tri = self.graph.add_hyperedge([n1, n2, n3], label="T")
+
+        self.assertEqual(list(self.graph.edges_near(0, 0)), [near, tri, far])
+        self.graph.remove_edge(near)
+        self.assertEqual(list(self.graph.edges_near(0, 0)), [tri, far])
+
+    def test_edges_near_with_label(self):
+        """Test edges_near() only yields edges with the label, arity and R asked for."""
+        nodes = [self.graph.add_node(x, y) for x in range(6) for y in range(6)]
+        for a, b in zip(nodes, nodes[1:]):
+            self.graph.add_edge(a, b)
+        far = self.graph.add_hyperedge(nodes[-3:], label="T")
+        near = self.graph.add_hyperedge(nodes[:3], label="T")
+        marked = self.graph.add_hyperedge(nodes[6:9], label="T")
+        marked.R = 1
+
+        self.assertEqual(list(self.graph.edges_near(0, 0, "T", 3)), [near, marked, far])
+        self.assertEqual(list(self.graph.edges_near(0, 0, "T", 3, R=0)), [near, far])
+        self.assertEqual(list(self.graph.edges_near(0, 0, "T", 4)), [])
+        self.assertEqual(list(self.graph.edges_near(0, 0, "Q", 3)), [])
+
+        # Most edges are E edges, so these come from the grid walk
+        edges = list(self.graph.edges_near(0, 0, "E", 2))
+        self.assertEqual(edges, [edge for edge in self.graph.edges_near(0, 0) if edge.label == "E"])
+
+
+    def test_ids_and_lookup(self):
+        """Test ids increase with every element and removed edges are not found."""
+        for backend in ("object", "array"):
+            graph = HyperGraph(backend=backend)
+            n1 = graph.add_node(0, 0)
+            n2 = graph.add_node(1, 0)
+            n3 = graph.add_node(1, 1)
+            e = graph.add_edge(n1, n2)
+            t = graph.add_hyperedge([n1, n2, n3], label="T")
+
+            self.assertEqual([n.id for n in (n1, n2, n3)], [0, 1, 2])
+            self.assertEqual((e.id, t.id), (0, 1))
+            self.assertIs(graph.node(2), n3)
+            self.assertIs(graph.edge(1), t)
+
+            graph.remove_edge(e)
+            with self.assertRaises(KeyError):
+                graph.edge(0)
+            with self.assertRaises(KeyError):
+                graph.node(3)
+            self.assertEqual(graph.add_edge(n2, n3).id, 2)
+
+    def test_bulk_construction_matches_single_calls(self):
+        """Test add_nodes/add_edges/add_hyperedges build the same graph as one call per element."""
+        xy = [(0, 0), (1, 0), (1, 1), (0, 1), (2, 0), (2, 1)]
+        pairs = [(0, 1), (1, 2), (2, 3), (3, 0), (1, 4), (4, 5), (5, 2)]
+        border = [True, False, True, True, True, True, True]
+        offsets, indices = [0, 4, 8, 11], [0, 1, 2, 3, 1, 4, 5, 2, 0, 1, 2]
+        for backend in ("object", "array"):
+            single = HyperGraph(backend=backend)
+            nodes = [single.add_node(x, y) for x, y in xy]
+            for (a, b), is_border in zip(pairs, border):
+                single.add_edge(nodes[a], nodes[b], is_border=is_border)
+            for label, start, end in zip("QQT", offsets, offsets[1:]):
+                single.add_hyperedge([nodes[i] for i in indices[start:end]], label=label)
+
+            bulk = HyperGraph(backend=backend)
+            bulk.add_nodes(xy)
+            bulk.add_edges(pairs, border)
+            triangle = bulk.add_hyperedges(offsets, indices, labels=["Q", "Q", "T"])[2]
+
+            for key, value in single.export().items():
+                self.assertEqual(value.tolist(), bulk.export()[key].tolist(), key)
+            self.assertEqual(bulk.edges_with("T", 3), [triangle])
+            self.assertEqual((triangle.x, triangle.y), (2 / 3, 1 / 3))
+            self.assertIs(bulk.get_edge_between(bulk.node(2), bulk.node(1)), bulk.edge(1))
+            self.assertEqual([e.id for e in bulk.edges_near(2, 1)][:2], [5, 6])
+
+    def test_bulk_hyperedges_agree_across_backends(self):
+        """Test both backends accept empty bulk input and reject 2-node hyperedges alike."""
+        for backend in ("object", "array"):
+            graph = HyperGraph(backend=backend)
+            self.assertEqual(graph.add_nodes([]), [])
+            self.assertEqual(graph.add_edges([]), [])
+            self.assertEqual(graph.add_hyperedges([], []), [])
+            graph.add_nodes([(0, 0), (1, 0), (1, 1)])
+            with self.assertRaises(ValueError):
+                graph.add_hyperedges([0, 3, 5], [0, 1, 2, 0, 1])
+            self.assertEqual(len(graph.edges), 0)
+            triangle, = graph.add_hyperedges([0, 3], [0, 1, 2])
+            self.assertTrue(triangle.is_hyperedge())
+
+    def test_import_does_not_load_matplotlib(self):
+        """Test importing the graph and productions leaves matplotlib to visualize()."""
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
+        code = "import sys, hypergraph.hypergraph, productions; print('matplotlib' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from hypergraph.hypergraph import HyperGraph
+from productions import P0, P1, P3, P4, IncrementalMatcher
+from tests.helpers import two_quads
+
+
+class TestIncrementalMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+
+    def test_initial_matches_equal_full_scan(self):
+        """Test the matcher starts with every match of a full scan."""
+        _, (q1, q2) = two_quads(self.graph)
+        p0 = P0()
+        with IncrementalMatcher(self.graph, [p0]) as matcher:
+            anchors = [m['hyperedge'] for m in matcher.matches(p0)]
+        self.assertEqual(anchors, [q1, q2])
+
+    def test_match_follows_flag_change(self):
+        """Test marking an element moves its match from P0 to P1."""
+        _, (q1, q2) = two_quads(self.graph)
+        p0, p1 = P0(), P1()
+        with IncrementalMatcher(self.graph, [p0, p1]) as matcher:
+            matched = matcher.pop(p0)
+            self.assertIs(matched['hyperedge'], q1)
+            p0.apply(self.graph, matched)
+
+            self.assertEqual([m['hyperedge'] for m in matcher.matches(p0)], [q2])
+            self.assertEqual([m['hyperedge'] for m in matcher.matches(p1)], [q1])
+
+    def test_split_edges_create_and_remove_matches(self):
+        """Test P1 marking edges enables P3/P4, which disappear once applied."""
+        _, (q1, q2) = two_quads(self.graph)
+        q1.R = 1
+        p1, p3, p4 = P1(), P3(), P4()
+        with IncrementalMatcher(self.graph, [p1, p3, p4]) as matcher:
+            p1.apply(self.graph, matcher.pop(p1))
+            self.assertEqual(len(matcher.matches(p3)), 1)
+            self.assertEqual(len(matcher.matches(p4)), 3)
+
+            production, matched = matcher.pop_any()
+            while production:
+                production.apply(self.graph, matched)
+                production, matched = matcher.pop_any()
+
+            for production in (p1, p3, p4):
+                can_apply, _ = production.can_apply(self.graph)
+                self.assertFalse(can_apply)
+
+    def test_close_stops_tracking(self):
+        """Test a closed matcher no longer reacts to changes."""
+        _, (q1, q2) = two_quads(self.graph)
+        p0 = P0()
+        matcher = IncrementalMatcher(self.graph, [p0])
+        matcher.close()
+        q1.R = 1
+        self.assertEqual(len(matcher.matches(p0)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -4,6 +4,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from hypergraph.hypergraph import HyperGraph
 from productions import P0
+from tests.helpers import two_quads
 
 
 class TestP0(unittest.TestCase):
@@ -223,6 +224,58 @@ class TestP0(unittest.TestCase):
         can_apply, matched = self.production.can_apply(self.graph)
         self.assertTrue(can_apply, "Should find at least one quadrilateral")
 
+        # Both are found in a single pass, each exactly once
+        matches = list(self.production.find_all_matches(self.graph))
+        self.assertEqual([m['hyperedge'] for m in matches], [q1, q2])
+
+    def test_find_all_matches_skips_invalid_elements(self):
+        """Test find_all_matches yields nothing for marked or incomplete quadrilaterals."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(1, 0)
+        n3 = self.graph.add_node(1, 1)
+        n4 = self.graph.add_node(0, 1)
+
+        self.graph.add_edge(n1, n2, is_border=True)
+        self.graph.add_edge(n2, n3, is_border=True)
+        self.graph.add_edge(n3, n4, is_border=True)
+
+        self.graph.add_hyperedge([n1, n2, n3, n4], label="Q")
+        self.assertEqual(list(self.production.find_all_matches(self.graph)), [])
+
+        self.graph.add_edge(n4, n1, is_border=True)
+        q = self.graph.add_hyperedge([n1, n2, n3, n4], label="Q")
+        q.R = 1
+        self.assertEqual(len(list(self.production.find_all_matches(self.graph))), 1)
+
+
+    def test_find_matches_near_orders_by_distance(self):
+        """Test matches come nearest first and already marked elements are skipped."""
+        _, (q1, q2) = two_quads(self.graph)
+
+        matches = list(self.production.find_matches_near(self.graph, 2.0, 1.0))
+        self.assertEqual([m['hyperedge'] for m in matches], [q2, q1])
+
+        q2.R = 1
+        self.assertIs(self.production.nearest_match(self.graph, 2.0, 1.0)['hyperedge'], q1)
+        q1.R = 1
+        self.assertIsNone(self.production.nearest_match(self.graph, 2.0, 1.0))
+
+    def test_find_matches_near_only_tries_candidates(self):
+        """Test only unmarked Q hyperedges are matched, and none when there are none."""
+        nodes = [self.graph.add_node(x, y) for x, y in [(0, 0), (1, 0), (1, 1), (0, 1)]]
+        for a, b in zip(nodes, nodes[1:] + nodes[:1]):
+            self.graph.add_edge(a, b, is_border=True)
+        tried = []
+        match_at = self.production.match_at
+        self.production.match_at = lambda graph, anchor: tried.append(anchor) or match_at(graph, anchor)
+
+        self.assertIsNone(self.production.nearest_match(self.graph, 0.5, 0.5))
+        self.assertEqual(tried, [])
+
+        q = self.graph.add_hyperedge(nodes, label="Q")
+        self.assertIs(self.production.nearest_match(self.graph, 0.5, 0.5)['hyperedge'], q)
+        self.assertEqual(tried, [q])
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -148,5 +148,27 @@ class TestP4(unittest.TestCase):
         self.assertIn(boundary_edges[1], self.graph.edges)
         self.assertIn(boundary_edges[3], self.graph.edges)
 
+    def test_apply_reuses_registered_midpoint(self):
+        """Test P4 reuses an existing split node instead of creating a duplicate."""
+        n1 = self.graph.add_node(0, 0)
+        n2 = self.graph.add_node(2, 0)
+        mid = self.graph.add_node(1, 0)
+        half = self.graph.add_edge(n1, mid, is_border=True)
+        self.graph.register_midpoint(n1, n2, mid)
+
+        e = self.graph.add_hyperedge([n1, n2], label="E")
+        e.R = 1
+        e.is_border = True
+        node_count = len(self.graph.nodes)
+
+        can_apply, matched = self.production.can_apply(self.graph)
+        self.assertTrue(can_apply)
+        result = self.production.apply(self.graph, matched)
+
+        self.assertIs(result['new_node'], mid)
+        self.assertIs(result['new_edges'][0], half)
+        self.assertEqual(len(self.graph.nodes), node_count)
+        self.assertIs(self.graph.get_midpoint(n1, n2), mid)
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import unittest
+import math
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from hypergraph.hypergraph import HyperGraph
+from productions import P8
+
+
+class TestP8(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+        self.production = P8()
+
+    def _create_broken_pentagon(self, r_value=1, label="P", broken_sides=5):
+        nodes = []
+        for i in range(5):
+            angle = 2 * math.pi * i / 5
+            nodes.append(self.graph.add_node(math.cos(angle), math.sin(angle)))
+
+        for i in range(5):
+            a, b = nodes[i], nodes[(i + 1) % 5]
+            if i < broken_sides:
+                mid = self.graph.add_node((a.x + b.x) / 2, (a.y + b.y) / 2)
+                self.graph.add_edge(a, mid, is_border=True)
+                self.graph.add_edge(mid, b, is_border=True)
+                self.graph.register_midpoint(a, b, mid)
+            else:
+                self.graph.add_edge(a, b, is_border=True)
+
+        hyperedge = self.graph.add_hyperedge(nodes, label=label)
+        hyperedge.R = r_value
+        return nodes, hyperedge
+
+    def test_can_apply_broken_marked_pentagon(self):
+        """Test P8 matches a marked pentagon with all 5 sides broken."""
+        nodes, hyperedge = self._create_broken_pentagon()
+
+        can_apply, matched = self.production.can_apply(self.graph)
+
+        self.assertTrue(can_apply)
+        self.assertIs(matched['pentagon_hyperedge'], hyperedge)
+        self.assertEqual(len(matched['midpoints']), 5)
+        self.assertEqual(len(matched['edges']), 10)
+
+    def test_cannot_apply_unmarked_pentagon(self):
+        """Test P8 cannot be applied when R=0."""
+        self._create_broken_pentagon(r_value=0)
+
+        can_apply, matched = self.production.can_apply(self.graph)
+
+        self.assertFalse(can_apply)
+        self.assertIsNone(matched)
+
+    def test_cannot_apply_with_unbroken_side(self):
+        """Test P8 cannot be applied when a side has no hanging node."""
+        self._create_broken_pentagon(broken_sides=4)
+
+        can_apply, matched = self.production.can_apply(self.graph)
+
+        self.assertFalse(can_apply)
+        self.assertIsNone(matched)
+
+    def test_apply_creates_five_quadrilaterals(self):
+        """Test applying P8 replaces the pentagon with 5 quadrilaterals around a centre node."""
+        nodes, hyperedge = self._create_broken_pentagon()
+
+        can_apply, matched = self.production.can_apply(self.graph)
+        result = self.production.apply(self.graph, matched)
+
+        self.assertNotIn(hyperedge, self.graph.edges)
+        quads = result['new_quadrilaterals']
+        self.assertEqual(len(quads), 5)
+        centroid = result['centroid']
+        for i, quad in enumerate(quads):
+            self.assertEqual(quad.label, "Q")
+            self.assertIn(centroid, quad.nodes)
+            self.assertIn(nodes[i], quad.nodes)
+            self.assertIsNotNone(self.graph.get_edge_between(centroid, quad.nodes[1]))
+            self.assertIsNotNone(self.graph.get_edge_between(quad.nodes[0], quad.nodes[1]))
+            self.assertIsNotNone(self.graph.get_edge_between(quad.nodes[3], quad.nodes[0]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,43 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from hypergraph.hypergraph import HyperGraph
+from productions import P0, P1, P4, independent_matches, apply_parallel
+from tests.helpers import two_quads
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+
+    def test_adjacent_markings_are_independent(self):
+        """Test P0 marks both quads in one step although they share an edge."""
+        _, (q1, q2) = two_quads(self.graph)
+        results = apply_parallel(P0(), self.graph)
+        self.assertEqual(len(results), 2)
+        self.assertEqual((q1.R, q2.R), (1, 1))
+
+    def test_shared_edge_writes_conflict(self):
+        """Test P1 is not applied to two quads marking the same edge."""
+        _, (q1, q2) = two_quads(self.graph)
+        q1.R = 1
+        q2.R = 1
+        p1 = P1()
+        selected = independent_matches(p1, p1.find_all_matches(self.graph))
+        self.assertEqual([m['hyperedge'] for m in selected], [q1])
+
+    def test_disjoint_border_edges_broken_together(self):
+        """Test P4 breaks every marked border edge of a quad in one step."""
+        _, (q1, _) = two_quads(self.graph)
+        q1.R = 1
+        P1().apply(self.graph, P1().can_apply(self.graph)[1])
+        # P4 only reads and removes its own edge, so a shared corner is no conflict
+        results = apply_parallel(P4(), self.graph)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(list(P4().find_all_matches(self.graph)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from hypergraph.hypergraph import HyperGraph
+from productions.pattern import Pattern
+
+
+class TestPattern(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+        self.n1 = self.graph.add_node(0, 0)
+        self.n2 = self.graph.add_node(2, 0)
+        self.n3 = self.graph.add_node(2, 2)
+        self.n4 = self.graph.add_node(0, 2)
+        self.corners = [self.n1, self.n2, self.n3, self.n4]
+
+    def _ring(self):
+        return [self.graph.add_edge(self.corners[i], self.corners[(i + 1) % 4])
+                for i in range(4)]
+
+    def test_candidates_come_from_label_index(self):
+        """Test only anchors with the pattern's label, arity and R are candidates."""
+        q = self.graph.add_hyperedge(self.corners, label="Q")
+        self.graph.add_hyperedge(self.corners, label="P")
+        pattern = Pattern("Q", 4, R=1)
+
+        self.assertEqual(pattern.plan.candidates(self.graph), [])
+        q.R = 1
+        self.assertEqual(pattern.plan.candidates(self.graph), [q])
+
+    def test_ring_match_and_guards(self):
+        """Test ring edges are returned in side order and ring guards are applied."""
+        ring = self._ring()
+        q = self.graph.add_hyperedge(self.corners, label="Q")
+
+        found = Pattern("Q", 4, ring=True).plan.match(self.graph, q)
+        self.assertEqual(found['ring'], ring)
+
+        ring[2].R = 1
+        self.assertIsNone(Pattern("Q", 4, ring=True, ring_R=0).plan.match(self.graph, q))
+        self.assertIsNone(Pattern("Q", 4, ring=True, ring_label="F").plan.match(self.graph, q))
+
+    def test_split_sides(self):
+        """Test every side needs a hanging node joined to both corners."""
+        q = self.graph.add_hyperedge(self.corners, label="Q")
+        hanging = []
+        for i in range(4):
+            a, b = self.corners[i], self.corners[(i + 1) % 4]
+            mid = self.graph.add_node((a.x + b.x) / 2, (a.y + b.y) / 2)
+            self.graph.add_edge(a, mid)
+            if i < 3:
+                self.graph.add_edge(mid, b)
+            hanging.append(mid)
+
+        pattern = Pattern("Q", 4, split=True)
+        self.assertIsNone(pattern.plan.match(self.graph, q))
+
+        self.graph.add_edge(hanging[3], self.n1)
+        found = pattern.plan.match(self.graph, q)
+        self.assertEqual(found['hanging'], hanging)
+        self.assertEqual(len(found['half_edges']), 8)
+
+    def test_custom_guard(self):
+        """Test guards are evaluated against the anchor."""
+        e = self.graph.add_edge(self.n1, self.n2)
+        pattern = Pattern("E", 2, guards=[lambda graph, edge: edge.nodes[0].x > 0])
+
+        self.assertIsNone(pattern.plan.match(self.graph, e))
+        self.assertIsNotNone(Pattern("E", 2).plan.match(self.graph, e))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
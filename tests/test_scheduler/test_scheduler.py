@@ -0,0 +1,49 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from hypergraph.hypergraph import HyperGraph
+from productions import P0, P1, P2, P3, P4, P5
+from productions.scheduler import Scheduler
+from tests.helpers import two_quads
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+
+    def test_runs_to_fixed_point(self):
+        """Test refining one marked quad leaves nothing to apply."""
+        _, (q1, _) = two_quads(self.graph)
+        q1.R = 1
+        productions = [P1(), P4(), P3(), P2(), P5()]
+        scheduler = Scheduler(self.graph, productions)
+
+        applied = []
+        count = scheduler.run(on_apply=lambda production, matched, result: applied.append(production.name))
+
+        self.assertEqual(count, len(applied))
+        self.assertEqual(applied.count("P5"), 1)
+        self.assertNotIn(q1, self.graph.edges)
+        for production in productions:
+            self.assertEqual(list(production.find_all_matches(self.graph)), [])
+
+        self.assertEqual(scheduler.stats["P5"].applied, 1)
+        self.assertEqual(scheduler.stats["P1"].applied, 1)
+
+    def test_repeated_productions_kept_once(self):
+        """Test a production listed twice is only scheduled once."""
+        scheduler = Scheduler(self.graph, [P4(), P3(), P4(), P3()])
+        self.assertEqual([p.name for p in scheduler.productions], ["P4", "P3"])
+
+    def test_enabling_relation(self):
+        """Test which productions can create matches of which."""
+        self.assertTrue(P1().can_enable(P3()))
+        self.assertTrue(P4().can_enable(P5()))
+        self.assertFalse(P0().can_enable(P3()))
+        self.assertFalse(P3().can_enable(P4()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from hypergraph.hypergraph import HyperGraph
+from productions import P0
+from tests.helpers import refine, two_quads
+
+
+def state(graph):
+    return (
+        [(n.x, n.y) for n in graph.nodes],
+        [(e.id, e.label, e.R, e.B) for e in graph.edges],
+        [[e.id for e in graph.incident_edges(n) + graph.incident_hyperedges(n)] for n in graph.nodes],
+    )
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+        _, (self.q1, self.q2) = two_quads(self.graph)
+
+    def test_snapshot_is_equal_copy(self):
+        """Test a snapshot starts with the same elements and ids."""
+        copy = self.graph.snapshot()
+        self.assertEqual(state(copy), state(self.graph))
+        self.assertEqual(copy.add_node(5, 5).id, self.graph.add_node(5, 5).id)
+
+    def test_changes_to_snapshot_stay_in_snapshot(self):
+        """Test refining a snapshot leaves the parent untouched."""
+        before = state(self.graph)
+        copy = self.graph.snapshot()
+        refine(copy, copy.edge(self.q1.id))
+
+        self.assertEqual(state(self.graph), before)
+        self.assertEqual(self.q1.R, 0)
+        self.assertIn(self.q1, self.graph.edges)
+        self.assertGreater(len(copy.nodes), len(self.graph.nodes))
+
+    def test_changes_to_parent_stay_in_parent(self):
+        """Test refining the parent after a snapshot leaves the snapshot untouched."""
+        copy = self.graph.snapshot()
+        before = state(copy)
+        refine(self.graph, self.q1)
+        self.assertEqual(state(copy), before)
+        self.assertEqual(copy.edge(self.q1.id).R, 0)
+
+    def test_branches_match_independent_graphs(self):
+        """Test two branches refined differently equal graphs built separately."""
+        left = self.graph.snapshot()
+        right = self.graph.snapshot()
+        refine(left, left.edge(self.q1.id))
+        refine(right, right.edge(self.q2.id))
+
+        for branch, quad in ((left, 0), (right, 1)):
+            expected = HyperGraph()
+            refine(expected, two_quads(expected)[1][quad])
+            self.assertEqual(state(branch), state(expected))
+
+    def test_parent_keeps_its_edge_objects(self):
+        """Test the parent hands out the same objects before and after a snapshot."""
+        copy = self.graph.snapshot()
+        self.assertIs(self.graph.edge(self.q1.id), self.q1)
+        self.assertIsNot(copy.edge(self.q1.id), self.q1)
+        self.assertIs(copy.edge(self.q1.id), copy.edge(self.q1.id))
+
+    def test_edges_of_other_graphs_are_left_alone(self):
+        """Test an edge of an unrelated graph with the same id is not this graph's edge."""
+        other = HyperGraph()
+        _, (o1, o2) = two_quads(other)
+        before, other_before = state(self.graph), state(other)
+
+        self.assertEqual(o1.id, self.q1.id)
+        self.assertNotEqual(o1, self.q1)
+        self.assertNotIn(o1, self.graph.edges)
+        self.graph.remove_edge(o1)
+
+        self.assertEqual(state(self.graph), before)
+        self.assertEqual(state(other), other_before)
+        self.assertIs(o1._graph, other)
+        other.remove_edge(o1)
+        self.assertNotIn(o1, other.edges)
+        self.assertIn(self.q1, self.graph.edges)
+
+    def test_remove_edge_handed_out_by_other_branch(self):
+        """Test removing the parent's edge from a snapshot only changes the snapshot."""
+        copy = self.graph.snapshot()
+        added = copy.add_hyperedge(self.q1.nodes, label="T")
+        self.assertNotEqual(added, self.graph.add_hyperedge(self.q1.nodes, label="T"))
+
+        copy.remove_edge(self.q1)
+        self.assertNotIn(self.q1, copy.edges)
+        self.assertIn(self.q1, self.graph.edges)
+        self.assertIs(self.q1._graph, self.graph)
+        self.assertEqual(self.graph.incident_hyperedges(self.q1.nodes[0])[0], self.q1)
+
+    def test_edges_near_reads_snapshot_state(self):
+        """Test a snapshot filters the edges near a point on its own values, not the parent's."""
+        copy = self.graph.snapshot()
+        self.q1.R = 1
+
+        self.assertEqual([e.id for e in copy.edges_near(0.5, 0.5, "Q", 4, R=0)], [self.q1.id, self.q2.id])
+        self.assertEqual(P0().nearest_match(copy, 0.5, 0.5)['hyperedge'], copy.edge(self.q1.id))
+        self.assertEqual(list(self.graph.edges_near(0.5, 0.5, "Q", 4, R=0)), [self.q2])
+
+    def test_rollback_in_snapshot_restores_copied_edges(self):
+        """Test removing and changing a snapshot's copies can be rolled back."""
+        copy = self.graph.snapshot()
+        before = state(copy)
+        q1 = copy.edge(self.q1.id)
+        with copy.transaction():
+            copy.remove_edge(copy.edge(self.q2.id))
+            q1.R = 1
+            self.assertNotIn(q1, copy.edges_with("Q", 4, R=0))
+            copy.rollback()
+
+        self.assertEqual(state(copy), before)
+        self.assertIn(q1, copy.edges)
+        self.assertEqual(copy.edges_with("Q", 4, R=0), [q1, copy.edge(self.q2.id)])
+        self.assertEqual(self.q1.R, 0)
+
+    def test_snapshot_rejected_inside_transaction(self):
+        """Test snapshot() raises while a transaction is open."""
+        with self.graph.transaction():
+            with self.assertRaises(RuntimeError):
+                self.graph.snapshot()
+
+
+if __name__ == '__main__':
+    unittest.main()
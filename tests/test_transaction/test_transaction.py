@@ -0,0 +1,85 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from hypergraph.hypergraph import HyperGraph
+from tests.helpers import refine, two_quads
+
+
+class TestTransaction(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+        self.nodes, (self.q1, self.q2) = two_quads(self.graph)
+
+    def _state(self):
+        g = self.graph
+        return (
+            list(g.nodes),
+            [(e, e.label, e.R, e.B) for e in g.edges],
+            {key: list(edges) for key, edges in g._label_index.items() if edges},
+            [g.incident_edges(n) + g.incident_hyperedges(n) for n in g.nodes],
+            dict(g._midpoints),
+        )
+
+    def test_rollback_restores_graph(self):
+        """Test rolling back a refinement restores elements, order and ids."""
+        before = self._state()
+        with self.graph.transaction():
+            refine(self.graph, self.q1)
+            self.assertGreater(len(self.graph.nodes), 6)
+            self.graph.rollback()
+
+        self.assertEqual(self._state(), before)
+        self.assertEqual(self.graph.add_node(5, 5).id, 6)
+        self.assertEqual(self.graph.add_edge(self.nodes[0], self.nodes[4]).id, 9)
+
+    def test_rollback_then_redo_is_identical(self):
+        """Test replaying the same changes after a rollback gives the same graph."""
+        with self.graph.transaction():
+            refine(self.graph, self.q1)
+            after = [(e.id, e.label, e.R) for e in self.graph.edges]
+            self.graph.rollback()
+            refine(self.graph, self.q1)
+        self.assertEqual([(e.id, e.label, e.R) for e in self.graph.edges], after)
+
+    def test_exception_rolls_back(self):
+        """Test an exception inside the block undoes its changes."""
+        before = self._state()
+        with self.assertRaises(ZeroDivisionError):
+            with self.graph.transaction():
+                self.q2.R = 1
+                self.graph.remove_edge(self.q1)
+                1 / 0
+        self.assertEqual(self._state(), before)
+
+    def test_nested_rollback(self):
+        """Test rollback only undoes the innermost transaction."""
+        with self.graph.transaction():
+            self.q1.R = 1
+            with self.graph.transaction():
+                self.q2.R = 1
+                self.graph.rollback()
+            self.assertEqual((self.q1.R, self.q2.R), (1, False))
+        self.assertEqual(self.q1.R, 1)
+
+    def test_rollback_restores_grid_cells(self):
+        """Test rolling back additions that made the spatial grid resize its cells restores the old cells."""
+        grid = self.graph._grid
+        cells = {key: list(bucket) for key, bucket in grid._cells.items()}
+        with self.graph.transaction():
+            for i in range(200):
+                self.graph.add_node(1000 + i, 0)
+            self.graph.add_nodes([(0.001 * i, 0.5) for i in range(200)])
+            self.graph.rollback()
+
+        self.assertEqual({key: list(bucket) for key, bucket in grid._cells.items()}, cells)
+        self.assertEqual(self.graph.nearest_nodes(0.9, 0.3, k=2), [self.nodes[1], self.nodes[2]])
+
+    def test_rollback_outside_transaction(self):
+        with self.assertRaises(RuntimeError):
+            self.graph.rollback()
+
+
+if __name__ == '__main__':
+    unittest.main()
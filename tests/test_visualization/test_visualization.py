@@ -0,0 +1,127 @@
+import unittest
+import os
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+import numpy as np
+from hypergraph.hypergraph import HyperGraph
+from hypergraph.frame import Frame
+from hypergraph.renderers import LevelOfDetail, NullRenderer, SvgRenderer, get_renderer
+from hypergraph.render_pipeline import RenderPipeline
+
+
+def build(graph):
+    nodes = [graph.add_node(x, y) for x, y in [(0, 0), (2, 0), (2, 2), (0, 2)]]
+    for a, b in [(0, 1), (1, 2), (2, 3), (3, 0)]:
+        graph.add_edge(nodes[a], nodes[b], is_border=True)
+    return graph.add_hyperedge(nodes, label="Q")
+
+
+class TestVisualization(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = HyperGraph()
+        self.quad = build(self.graph)
+
+    def test_frame_gathers_drawable_state(self):
+        """Test a frame holds segments, centroids and flags of every element."""
+        self.quad.R = 1
+        frame = Frame.from_graph(self.graph)
+
+        self.assertEqual(frame.edge_segments.shape, (4, 2, 2))
+        np.testing.assert_array_equal(frame.edge_centroids[0], [1, 0])
+        self.assertTrue(frame.edge_B.all())
+        np.testing.assert_array_equal(frame.hyperedge_centroids, [[1, 1]])
+        self.assertEqual(frame.hyperedge_labels, ["Q"])
+        self.assertEqual(frame.spoke_segments.shape, (4, 2, 2))
+        np.testing.assert_array_equal(frame.spoke_R, [1, 1, 1, 1])
+        self.assertEqual(frame.bounds(), (0.0, 0.0, 2.0, 2.0))
+
+    def test_frame_is_independent_of_graph(self):
+        """Test changing the graph after taking a frame leaves the frame as it was."""
+        frame = Frame.from_graph(self.graph)
+        self.quad.R = 1
+        self.graph.add_node(5, 5)
+        self.assertEqual(len(frame.node_xy), 4)
+        np.testing.assert_array_equal(frame.hyperedge_R, [0])
+
+    def test_visualize_writes_image(self):
+        """Test visualize() saves a figure in either style and rejects other styles."""
+        path = os.path.join(tempfile.mkdtemp(), "graph.png")
+        for style in ("full", "mesh"):
+            self.graph.visualize(path, style=style, renderer="matplotlib")
+            self.assertGreater(os.path.getsize(path), 0)
+            os.remove(path)
+        with self.assertRaises(ValueError):
+            self.graph.visualize(path, style="wire", renderer="matplotlib")
+
+    def test_level_of_detail_drops_details_in_order(self):
+        """Test each threshold passed drops one more detail, and None never drops."""
+        detail = LevelOfDetail(labels=10, markers=100, spokes=1000)
+        self.assertEqual([detail.level(n) for n in (10, 11, 101, 1001)], [0, 1, 2, 3])
+        self.assertEqual(LevelOfDetail(labels=10, markers=None, spokes=0).level(50), 1)
+
+    def test_pipeline_renders_frames_in_order(self):
+        """Test the pipeline writes each frame as the graph was when submitted, in order."""
+        directory = tempfile.mkdtemp()
+        paths = [os.path.join(directory, f"{i}.png") for i in range(3)]
+        with RenderPipeline(workers=1, queue_size=1, renderer="matplotlib") as pipeline:
+            pipeline.submit(self.graph, paths[0])
+            self.quad.R = 1
+            pipeline.submit(self.graph, paths[1])
+            self.graph.add_node(5, 5)
+            pipeline.submit(self.graph, paths[2])
+        self.assertEqual(pipeline.rendered, paths)
+
+        expected = os.path.join(directory, "expected.png")
+        self.graph.visualize(expected, renderer="matplotlib")
+        with open(expected, "rb") as file, open(paths[2], "rb") as last, open(paths[1], "rb") as previous:
+            image = file.read()
+            self.assertEqual(last.read(), image)
+            self.assertNotEqual(previous.read(), image)
+
+    def test_renderer_is_chosen_by_name_or_environment(self):
+        """Test renderers are looked up by name, default to $HYPERGRAPH_RENDERER, and unknown names fail."""
+        self.assertIsInstance(get_renderer("svg"), SvgRenderer)
+        renderer = SvgRenderer(width=100)
+        self.assertIs(get_renderer(renderer), renderer)
+        with mock.patch.dict(os.environ, {"HYPERGRAPH_RENDERER": "null"}):
+            self.assertIsInstance(get_renderer(), NullRenderer)
+        with self.assertRaises(ValueError):
+            get_renderer("opengl")
+
+    def test_null_renderer_writes_nothing(self):
+        """Test the null renderer creates no file but still rejects unknown styles."""
+        path = os.path.join(tempfile.mkdtemp(), "graph.png")
+        self.graph.visualize(path, renderer="null")
+        self.assertFalse(os.path.exists(path))
+        with self.assertRaises(ValueError):
+            self.graph.visualize(path, style="wire", renderer="null")
+
+    def test_svg_renderer_writes_elements(self):
+        """Test the SVG renderer writes edges, markers and labels, or outlines in the mesh style."""
+        self.quad.R = 1
+        path = os.path.join(tempfile.mkdtemp(), "graph.svg")
+        ns = {"svg": "http://www.w3.org/2000/svg"}
+
+        self.graph.visualize(path, renderer="svg")
+        root = ET.parse(path).getroot()
+        self.assertEqual(len(root.findall(".//svg:circle", ns)), 4)
+        self.assertEqual(len(root.findall(".//svg:rect[@class='edge-marker']", ns)), 4)
+        self.assertEqual(len(root.findall(".//svg:rect[@class='hyperedge-marker R']", ns)), 1)
+        texts = [text.text for text in root.findall(".//svg:text", ns)]
+        self.assertIn("Q", texts)
+        self.assertIn("R=1", texts)
+        # Border edges: one path of four segments
+        self.assertEqual(root.find(".//svg:path", ns).get("d").count("M"), 4)
+
+        self.graph.visualize(path, style="mesh", renderer="svg")
+        polygons = ET.parse(path).getroot().findall(".//svg:polygon", ns)
+        self.assertEqual([polygon.get("class") for polygon in polygons], ["element R"])
+        self.assertEqual(len(polygons[0].get("points").split()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()